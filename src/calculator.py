@@ -3,189 +3,1144 @@ Calculator Module - Basic arithmetic operations with history tracking
 Students will extend this with more functions
 """
 
-from datetime import datetime
-from typing import Any
+import math
+import operator
+import sys
+import threading
+from collections import OrderedDict
+from collections.abc import Callable, Iterator, Sequence
+from contextlib import contextmanager
+from decimal import Context, Decimal, DivisionByZero, InvalidOperation, Overflow
+from fractions import Fraction
+from typing import Any, TextIO
+
+from src.history import (
+    CalculatorHistory,
+    NullHistory,
+    RingBufferHistory,
+    format_history_lines,
+)
+from src.instrumentation import LogSink, OperationStatsCollector, StdoutSink
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - numpy is an optional accelerator
+    np = None
+
+# How a session computes int and float operands; see Calculator.set_precision
+PRECISION_MODES = ("float", "fraction", "decimal")
+
+
+class Calculator:
+    """A calculator session with its own history and configuration.
+
+    Sessions are independent: each records into its own history and logs to
+    its own sink, so a service can keep one per user or request. The
+    module-level functions (``add``, ``divide`` ...) use a default session.
+    Integer power limits and the result cache remain process-wide.
+
+    Int and float operands are computed as plain Python numbers unless the
+    session's precision says otherwise (see ``set_precision``); Fraction and
+    Decimal operands are always computed exactly or in the session's
+    ``decimal_context``.
+    """
+
+    def __init__(  # noqa: PLR0913 - each setting is a separate keyword
+        self,
+        history: CalculatorHistory | None = None,
+        *,
+        record_history: bool = True,
+        history_limit: int | None = None,
+        log_sink: LogSink | None = None,
+        precision: str = "float",
+        decimal_digits: int = 28,
+    ):
+        """Initialize a session.
+
+        Args:
+            history: History backend to record into (a new
+                ``CalculatorHistory`` by default)
+            record_history: False to discard calculations (``NullHistory``)
+            history_limit: Keep only this many of the newest calculations
+                (``RingBufferHistory``)
+            log_sink: Sink multiply/divide log to; None disables logging
+            precision: How int and float operands are computed, one of
+                ``PRECISION_MODES`` (see ``set_precision``)
+            decimal_digits: Significant digits of Decimal results
+        """
+        if history is None:
+            if not record_history:
+                history = NullHistory()
+            elif history_limit is not None:
+                history = RingBufferHistory(max_size=history_limit)
+            else:
+                history = CalculatorHistory()
+        elif history_limit is not None or not record_history:
+            raise ValueError(
+                "history cannot be combined with record_history or history_limit"
+            )
+        self.history = history
+        self.log_sink = log_sink
+        self.set_precision(precision, decimal_digits)
+        # Settings reset() restores before the session is reused
+        self._initial_settings = (log_sink, precision, self.decimal_context.copy())
+
+    def set_precision(self, precision: str, decimal_digits: int | None = None) -> None:
+        """Choose how int and float operands are computed.
+
+        ``"float"`` computes with ints and floats as they are, so division
+        and sqrt return floats. ``"fraction"`` keeps ints exact: division
+        returns a ``Fraction``, a negative power of an int returns a
+        ``Fraction`` and the sqrt of a perfect square returns an int (via
+        ``math.isqrt``); floats stay floats. ``"decimal"`` converts every
+        operand to ``Decimal`` (floats by their shortest repr, so ``0.1``
+        becomes ``Decimal("0.1")``) and computes in ``decimal_context``.
+
+        Args:
+            precision: One of ``PRECISION_MODES``
+            decimal_digits: Significant digits of Decimal results; None
+                keeps the current ``decimal_context``, which may also be
+                replaced with any ``decimal.Context``
+        """
+        if precision not in PRECISION_MODES:
+            raise ValueError(
+                f"precision must be one of {', '.join(PRECISION_MODES)}, "
+                f"not {precision!r}"
+            )
+        if decimal_digits is not None:
+            if decimal_digits < 1:
+                raise ValueError("decimal_digits must be positive")
+            self.decimal_context = Context(
+                prec=decimal_digits, traps=[InvalidOperation, DivisionByZero, Overflow]
+            )
+        self.precision = precision
+        # Checked before the float fast path of every operation
+        self._precise = precision != "float"
+
+    def add(self, a, b):
+        """Add two numbers together"""
+        if (
+            self._precise
+            or not isinstance(a, (int, float))
+            or not isinstance(b, (int, float))
+        ):
+            return self._precise_call("add", a, b)
+        result = a + b
+        self.history.add_entry("add", [a, b], result)
+        return result
+
+    def subtract(self, a, b):
+        """Subtract b from a"""
+        if (
+            self._precise
+            or not isinstance(a, (int, float))
+            or not isinstance(b, (int, float))
+        ):
+            return self._precise_call("subtract", a, b)
+        result = a - b
+        self.history.add_entry("subtract", [a, b], result)
+        return result
+
+    def multiply(self, a, b):
+        """Multiply two numbers with input validation and logging."""
+        if (
+            self._precise
+            or not isinstance(a, (int, float))
+            or not isinstance(b, (int, float))
+        ):
+            return self._precise_call("multiply", a, b)
+
+        sink = self.log_sink
+        log = sink is not None and sink.sample()
+        if log:
+            sink.emit(f"Multiplying {a} x {b}")  # Added logging
+        result = a * b
+        if log:
+            sink.emit(f"Result: {result}")
+        self.history.add_entry("multiply", [a, b], result)
+        return result
+
+    def divide(self, a, b):
+        """Divide a by b with enhanced error handling."""
+        if (
+            self._precise
+            or not isinstance(a, (int, float))
+            or not isinstance(b, (int, float))
+        ):
+            return self._precise_call("divide", a, b)
+        if b == 0:
+            raise ValueError(
+                f"Cannot divide {a} by zero - division by zero is undefined"
+            )
+
+        sink = self.log_sink
+        log = sink is not None and sink.sample()
+        if log:
+            sink.emit(f"Dividing {a} ÷ {b}")  # Added logging
+        result = a / b
+        if log:
+            sink.emit(f"Result: {result}")
+        self.history.add_entry("divide", [a, b], result)
+        return result
+
+    def power(self, a, b, modulus=None):
+        """Raise a to the power of b, optionally modulo ``modulus``.
+
+        Integer results are checked against the limits from
+        ``set_power_limits`` before they are computed, so oversized requests
+        fail fast. With a modulus, huge exponents are cheap
+        (``pow(a, b, modulus)``).
+        """
+        if modulus is None and (
+            self._precise
+            or not isinstance(a, (int, float))
+            or not isinstance(b, (int, float))
+        ):
+            return self._precise_call("power", a, b)
+        if not isinstance(a, (int, float)) or not isinstance(b, (int, float)):
+            raise TypeError("Both arguments must be numbers")
+        if modulus is not None:
+            if not all(isinstance(x, int) for x in (a, b, modulus)):
+                raise TypeError("Modular exponentiation requires integer arguments")
+            if modulus == 0:
+                raise ValueError("Modulus cannot be zero")
+
+        args = (a, b) if modulus is None else (a, b, modulus)
+        if _result_cache is None:
+            result = _checked_power(*args)
+        else:
+            result = _result_cache.call(_checked_power, "power", *args)
+        self.history.add_entry("power", list(args), result)
+        return result
+
+    def sqrt(self, a):
+        """Return the square root of a"""
+        if self._precise or not isinstance(a, (int, float)):
+            return self._precise_call("sqrt", a)
+        if a < 0:
+            raise ValueError("Cannot compute square root of negative number")
+        if _result_cache is None:
+            result = a**0.5
+        else:
+            result = _result_cache.call(_sqrt_value, "sqrt", a)
+        self.history.add_entry("sqrt", [a], result)
+        return result
+
+    def _precise_call(self, operation: str, *args):
+        """Compute and record an operation off the float fast path.
+
+        Reached when the session's precision is not ``"float"`` or an operand
+        is not an int or float. Results are not cached.
+        """
+        result = _precise_value(operation, args, self.precision, self.decimal_context)
+        sink = self.log_sink
+        message = _LOG_MESSAGES.get(operation)
+        if message is not None and sink is not None and sink.sample():
+            sink.emit(message.format(*args))
+            sink.emit(f"Result: {result}")
+        self.history.add_entry(operation, list(args), result)
+        return result
+
+    def add_many(self, a_values: Sequence, b_values: Sequence, errors: str = "raise"):
+        """Add two sequences element-wise. See the module-level ``add_many``."""
+        batch = _binary_batch("add", a_values, b_values, errors)
+        return self._record_batch("add", batch)
+
+    def subtract_many(
+        self, a_values: Sequence, b_values: Sequence, errors: str = "raise"
+    ):
+        """Subtract b_values from a_values element-wise."""
+        batch = _binary_batch("subtract", a_values, b_values, errors)
+        return self._record_batch("subtract", batch)
+
+    def multiply_many(
+        self, a_values: Sequence, b_values: Sequence, errors: str = "raise"
+    ):
+        """Multiply two sequences element-wise."""
+        batch = _binary_batch("multiply", a_values, b_values, errors)
+        return self._record_batch("multiply", batch)
+
+    def divide_many(
+        self, a_values: Sequence, b_values: Sequence, errors: str = "raise"
+    ):
+        """Divide a_values by b_values element-wise."""
+        batch = _binary_batch("divide", a_values, b_values, errors)
+        return self._record_batch("divide", batch)
+
+    def power_many(self, a_values: Sequence, b_values: Sequence, errors: str = "raise"):
+        """Raise a_values to b_values element-wise."""
+        batch = _binary_batch("power", a_values, b_values, errors)
+        return self._record_batch("power", batch)
+
+    def sqrt_many(self, values: Sequence, errors: str = "raise"):
+        """Square root of every element."""
+        return self._record_batch("sqrt", _sqrt_batch(values, errors))
+
+    def _record_batch(self, operation: str, batch: tuple[Any, int]):
+        """Record a batch as one history entry and return its results."""
+        results, computed = batch
+        self.history.add_entry(f"{operation}_many", [len(results)], computed)
+        return results
+
+    def reset(self) -> None:
+        """Clear history and restore the settings the session was created with.
+
+        Precision, decimal context and log sink changes made by one user of
+        a pooled session do not carry over to the next.
+        """
+        self.history.clear_history()
+        log_sink, precision, decimal_context = self._initial_settings
+        self.log_sink = log_sink
+        self.set_precision(precision)
+        self.decimal_context = decimal_context.copy()
 
 
-class CalculatorHistory:
-    """Manages calculation history for the calculator."""
+class SessionPool:
+    """Thread-safe pool of reusable ``Calculator`` sessions.
 
-    def __init__(self):
-        """Initialize empty history."""
-        self._history: list[dict[str, Any]] = []
+    ``acquire`` hands out an idle session (or creates one) and ``release``
+    resets it and keeps it for the next caller, so a server does not build
+    a new session and history for every request.
+    """
 
-    def add_entry(
+    def __init__(
         self,
-        operation: str,
-        operands: list[float],
-        result: float,
-        timestamp: datetime | None = None,
-    ) -> None:
-        """Add a calculation entry to history.
+        factory: Callable[[], Calculator] = Calculator,
+        max_idle: int = 64,
+    ):
+        """Initialize an empty pool.
 
         Args:
-            operation: The operation performed (e.g., 'add', 'multiply')
-            operands: List of operands used in the calculation
-            result: The result of the calculation
-            timestamp: When the calculation was performed (defaults to now)
+            factory: Creates a new session when none are idle
+            max_idle: Most idle sessions kept; extra released ones are dropped
         """
-        if timestamp is None:
-            timestamp = datetime.now()
-
-        entry = {
-            "operation": operation,
-            "operands": operands.copy(),
-            "result": result,
-            "timestamp": timestamp,
-            "expression": self._format_expression(operation, operands, result),
-        }
-        self._history.append(entry)
-
-    def _format_expression(
-        self, operation: str, operands: list[float], result: float
-    ) -> str:
-        """Format the calculation as a readable expression."""
-        # Use a dictionary to reduce the number of return statements
-        formatters = {
-            "add": lambda ops, res: f"{ops[0]} + {ops[1]} = {res}",
-            "subtract": lambda ops, res: f"{ops[0]} - {ops[1]} = {res}",
-            "multiply": lambda ops, res: f"{ops[0]} x {ops[1]} = {res}",
-            "divide": lambda ops, res: f"{ops[0]} ÷ {ops[1]} = {res}",
-            "power": lambda ops, res: f"{ops[0]} ^ {ops[1]} = {res}",
-            "sqrt": lambda ops, res: f"√{ops[0]} = {res}",
+        if max_idle < 0:
+            raise ValueError("max_idle cannot be negative")
+        self.max_idle = max_idle
+        self._factory = factory
+        self._idle: list[Calculator] = []
+        self._lock = threading.Lock()
+        self._created = 0
+        self._reused = 0
+
+    def acquire(self) -> Calculator:
+        """Take an idle session, creating one if the pool is empty."""
+        with self._lock:
+            if self._idle:
+                self._reused += 1
+                return self._idle.pop()
+            self._created += 1
+        return self._factory()
+
+    def release(self, session: Calculator) -> None:
+        """Reset a session and return it to the pool."""
+        session.reset()
+        with self._lock:
+            if len(self._idle) < self.max_idle:
+                self._idle.append(session)
+
+    @contextmanager
+    def session(self) -> Iterator[Calculator]:
+        """Borrow a session for the duration of a ``with`` block."""
+        session = self.acquire()
+        try:
+            yield session
+        finally:
+            self.release(session)
+
+    def stats(self) -> dict[str, int]:
+        """Get counts of sessions created, reused and currently idle."""
+        return {
+            "created": self._created,
+            "reused": self._reused,
+            "idle": len(self._idle),
+            "max_idle": self.max_idle,
         }
 
-        if operation in formatters:
-            return formatters[operation](operands, result)
 
-        return f"{operation}({', '.join(map(str, operands))}) = {result}"
+# History of the default session, which the module-level functions use
+_calculator_history: CalculatorHistory = CalculatorHistory()
+_default_session = Calculator(_calculator_history, log_sink=StdoutSink())
 
-    def get_history(self, limit: int | None = None) -> list[dict[str, Any]]:
-        """Get calculation history.
 
-        Args:
-            limit: Maximum number of entries to return (newest first)
+def get_default_session() -> Calculator:
+    """Return the session the module-level functions delegate to."""
+    return _default_session
+
+
+def get_history_backend() -> CalculatorHistory:
+    """Return the history object the module-level functions record into."""
+    return _default_session.history
+
+
+def set_history_backend(history: CalculatorHistory) -> CalculatorHistory:
+    """Replace the history object used by the module-level functions.
+
+    Args:
+        history: A ``CalculatorHistory`` (or compatible backend such as
+            ``ColumnarHistory``) to record into from now on
+
+    Returns:
+        The previously installed history object
+    """
+    global _calculator_history  # noqa: PLW0603
+    previous = _default_session.history
+    _default_session.history = _calculator_history = history
+    return previous
+
+
+def get_log_sink() -> LogSink | None:
+    """Return the sink operations log to, or None if logging is disabled."""
+    return _default_session.log_sink
+
+
+def set_log_sink(sink: LogSink | None) -> LogSink | None:
+    """Replace the sink multiply/divide log to.
+
+    Args:
+        sink: A ``LogSink`` such as ``StdoutSink()`` (the default),
+            ``LoggingSink()``, ``BufferSink()`` or any of them with
+            ``every=N`` for 1-in-N sampling; None disables logging
+
+    Returns:
+        The previously installed sink
+    """
+    previous = _default_session.log_sink
+    _default_session.log_sink = sink
+    return previous
 
-        Returns:
-            List of history entries
-        """
-        history = self._history.copy()
-        history.reverse()  # Most recent first
-        if limit is not None:
-            history = history[:limit]
-        return history
-
-    def get_last_result(self) -> float | None:
-        """Get the result of the last calculation."""
-        if not self._history:
-            return None
-        return self._history[-1]["result"]
-
-    def clear_history(self) -> int:
-        """Clear all history entries.
-
-        Returns:
-            Number of entries that were cleared
-        """
-        count = len(self._history)
-        self._history.clear()
-        return count
 
-    def get_history_count(self) -> int:
-        """Get the total number of calculations in history."""
-        return len(self._history)
+def get_precision() -> str:
+    """Return the precision mode of the module-level functions."""
+    return _default_session.precision
 
 
-# Global history instance
-_calculator_history = CalculatorHistory()
+def set_precision(precision: str, decimal_digits: int | None = None) -> str:
+    """Change how the module-level functions compute int and float operands.
+
+    Args:
+        precision: ``"float"`` (the default), ``"fraction"`` or ``"decimal"``;
+            see ``Calculator.set_precision``
+        decimal_digits: Significant digits of Decimal results (unchanged if
+            None)
+
+    Returns:
+        The previous precision mode
+    """
+    previous = _default_session.precision
+    _default_session.set_precision(precision, decimal_digits)
+    return previous
 
 
 def add(a, b):
     """Add two numbers together"""
-    if not isinstance(a, (int, float)) or not isinstance(b, (int, float)):
-        raise TypeError("Both arguments must be numbers")
-    result = a + b
-    _calculator_history.add_entry("add", [a, b], result)
-    return result
+    return _default_session.add(a, b)
 
 
 def subtract(a, b):
     """Subtract b from a"""
-    if not isinstance(a, (int, float)) or not isinstance(b, (int, float)):
-        raise TypeError("Both arguments must be numbers")
-    result = a - b
-    _calculator_history.add_entry("subtract", [a, b], result)
-    return result
+    return _default_session.subtract(a, b)
 
 
 def multiply(a, b):
     """Multiply two numbers with input validation and logging."""
-    if not isinstance(a, (int, float)) or not isinstance(b, (int, float)):
-        raise TypeError("Both arguments must be numbers")
-
-    print(f"Multiplying {a} x {b}")  # Added logging
-    result = a * b
-    print(f"Result: {result}")
-    _calculator_history.add_entry("multiply", [a, b], result)
-    return result
+    return _default_session.multiply(a, b)
 
 
 def divide(a, b):
     """Divide a by b with enhanced error handling."""
-    if not isinstance(a, (int, float)) or not isinstance(b, (int, float)):
-        raise TypeError("Division requires numeric inputs")
-    if b == 0:
-        raise ValueError(f"Cannot divide {a} by zero - division by zero is undefined")
-
-    print(f"Dividing {a} ÷ {b}")  # Added logging
-    result = a / b
-    print(f"Result: {result}")
-    _calculator_history.add_entry("divide", [a, b], result)
-    return result
+    return _default_session.divide(a, b)
 
 
 # TODO: Students will add multiply, divide, power, sqrt functions
 
 
-def power(a, b):
-    """Raise a to the power of b"""
-    if not isinstance(a, (int, float)) or not isinstance(b, (int, float)):
-        raise TypeError("Both arguments must be numbers")
+class ResultCache:
+    """Bounded LRU cache of results for pure operations (power, sqrt).
+
+    Keys include operand types as well as values, so ``power(2, 3)`` and
+    ``power(2.0, 3)`` are cached separately and return ``8`` and ``8.0``.
+    Only successful results are cached; errors are raised every time.
+    """
+
+    def __init__(self, max_size: int = 1024):
+        """Initialize an empty cache.
+
+        Args:
+            max_size: Maximum number of cached results
+        """
+        if max_size < 1:
+            raise ValueError("max_size must be positive")
+        self.max_size = max_size
+        self._results: OrderedDict[tuple, Any] = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    def call(self, func: Callable[..., Any], operation: str, *args: Any) -> Any:
+        """Return func(*args), reusing a cached result when available."""
+        key = (operation, *((type(arg), arg) for arg in args))
+        with self._lock:
+            if key in self._results:
+                self._hits += 1
+                self._results.move_to_end(key)
+                return self._results[key]
+            self._misses += 1
+
+        result = func(*args)
+        with self._lock:
+            self._results[key] = result
+            if len(self._results) > self.max_size:
+                self._results.popitem(last=False)
+                self._evictions += 1
+        return result
+
+    def stats(self) -> dict[str, Any]:
+        """Get hit/miss/eviction counters, size and hit rate."""
+        lookups = self._hits + self._misses
+        return {
+            "hits": self._hits,
+            "misses": self._misses,
+            "evictions": self._evictions,
+            "size": len(self._results),
+            "max_size": self.max_size,
+            "hit_rate": self._hits / lookups if lookups else 0.0,
+        }
+
+    def clear(self) -> None:
+        """Drop every cached result and reset the counters."""
+        with self._lock:
+            self._results.clear()
+            self._hits = self._misses = self._evictions = 0
+
+
+# Result cache for power/sqrt; None means caching is disabled
+_result_cache: ResultCache | None = None
+
+
+def enable_result_cache(max_size: int = 1024) -> ResultCache:
+    """Turn on memoization of power and sqrt results.
+
+    Cached results are still recorded in history exactly like computed ones.
+
+    Args:
+        max_size: Maximum number of cached results (LRU eviction)
+
+    Returns:
+        The new cache
+    """
+    global _result_cache  # noqa: PLW0603
+    _result_cache = ResultCache(max_size)
+    return _result_cache
+
+
+def disable_result_cache() -> None:
+    """Turn off memoization of power and sqrt results."""
+    global _result_cache  # noqa: PLW0603
+    _result_cache = None
+
+
+def get_result_cache_stats() -> dict[str, Any] | None:
+    """Get result cache counters, or None if caching is disabled."""
+    return None if _result_cache is None else _result_cache.stats()
+
+
+def clear_result_cache() -> None:
+    """Empty the result cache and reset its counters."""
+    if _result_cache is not None:
+        _result_cache.clear()
+
+
+# Size limits for integer power results; None disables a limit. The digit
+# limit defaults to the interpreter's int-to-str limit so results can always
+# be displayed in history.
+_power_max_digits: int | None = sys.get_int_max_str_digits() or None
+_power_max_bits: int | None = None
+
+_LOG2_10 = math.log2(10)
+
+
+def get_power_limits() -> tuple[int | None, int | None]:
+    """Return the ``(max_digits, max_bits)`` limits for integer powers."""
+    return _power_max_digits, _power_max_bits
+
+
+def set_power_limits(
+    max_digits: int | None, max_bits: int | None = None
+) -> tuple[int | None, int | None]:
+    """Set the largest integer power result accepted before OverflowError.
+
+    Raising ``max_digits`` above ``sys.get_int_max_str_digits()`` also
+    requires raising that limit, or the result cannot be displayed.
+    Changing the limits empties the result cache, whose powers were checked
+    against the old ones.
+
+    Args:
+        max_digits: Maximum decimal digits (None for no limit)
+        max_bits: Maximum bit length (None for no limit)
+
+    Returns:
+        The previous ``(max_digits, max_bits)``
+    """
+    global _power_max_digits, _power_max_bits
+    previous = (_power_max_digits, _power_max_bits)
+    _power_max_digits, _power_max_bits = max_digits, max_bits
+    if previous != (max_digits, max_bits):
+        clear_result_cache()
+    return previous
+
 
-    # Check for potentially problematic cases that would result in very large numbers
-    # Rough heuristic: if b is very large, it's likely to cause overflow
-    if isinstance(a, int) and isinstance(b, int) and b > 0 and b > 10000:
+def estimate_power_size(a: int, b: int) -> tuple[int, int]:
+    """Estimate ``(decimal digits, bits)`` of ``a**b`` for ints with b >= 0.
+
+    Uses logarithms of the operands, so it costs O(1) arithmetic regardless
+    of how large the result would be. The estimate can be off by one near
+    exact powers of two or ten.
+    """
+    magnitude = abs(a)
+    if magnitude <= 1 or b == 0:
+        return 1, 1
+    log2_magnitude = math.log2(magnitude)
+    try:
+        bits = b * log2_magnitude
+        return math.floor(bits / _LOG2_10) + 1, math.floor(bits) + 1
+    except OverflowError:
+        pass
+    # Past the float range: multiply b by fixed-point logarithms instead
+    scale = 1 << 52
+    bits = b * round(log2_magnitude * scale) // scale
+    digits = b * round(log2_magnitude / _LOG2_10 * scale) // scale
+    return digits + 1, bits + 1
+
+
+def _integer_power(a: int, b: int) -> int:
+    """Compute a**b for ints with b >= 0, enforcing the size limits."""
+    digits, bits = estimate_power_size(a, b)
+    max_digits, max_bits = _power_max_digits, _power_max_bits
+    if (max_digits is not None and digits > max_digits + 1) or (
+        max_bits is not None and bits > max_bits + 1
+    ):
+        raise OverflowError("Result too large to represent")
+
+    result = a**b
+    # Settle estimates that landed within one of a limit exactly
+    if max_bits is not None and bits >= max_bits and result.bit_length() > max_bits:
+        raise OverflowError("Result too large to represent")
+    if (
+        max_digits is not None
+        and digits >= max_digits
+        and abs(result) >= 10**max_digits
+    ):
         raise OverflowError("Result too large to represent")
+    return result
+
+
+def _checked_power(a, b, modulus=None):
+    """Compute a**b (mod modulus), raising OverflowError when too large."""
+    if modulus is not None:
+        return pow(a, b, modulus)
+    if isinstance(a, int) and isinstance(b, int) and b >= 0:
+        return _integer_power(a, b)
 
     try:
         result = a**b
         if result == float("inf") or result == float("-inf"):
             raise OverflowError("Result too large to represent")
-
-        # Try to convert to string to detect if it's too large for representation
-        try:
-            str(result)
-        except ValueError as str_e:
-            if "Exceeds the limit" in str(str_e) and "integer string conversion" in str(
-                str_e
-            ):
-                raise OverflowError("Result too large to represent") from None
     except OverflowError:
         raise OverflowError("Result too large to represent") from None
-    else:
-        _calculator_history.add_entry("power", [a, b], result)
-        return result
+    return result
+
+
+def power(a, b, modulus=None):
+    """Raise a to the power of b, optionally modulo ``modulus``.
+
+    Integer results are checked against the limits from ``set_power_limits``
+    before they are computed, so oversized requests fail fast. With a
+    modulus, huge exponents are cheap (``pow(a, b, modulus)``).
+    """
+    return _default_session.power(a, b, modulus)
 
 
 def sqrt(a):
     """Return the square root of a"""
-    if not isinstance(a, (int, float)):
-        raise TypeError("Argument must be a number")
+    return _default_session.sqrt(a)
+
+
+# Scalar operations by name, for callers that dispatch on operation strings
+OPERATIONS: dict[str, Callable[..., Any]] = {
+    "add": add,
+    "subtract": subtract,
+    "multiply": multiply,
+    "divide": divide,
+    "power": power,
+    "sqrt": sqrt,
+}
+
+
+# Batch operations
+#
+# The ``*_many`` functions apply an operation element-wise over two equally
+# sized sequences (or one, for sqrt) in a single call.  NumPy arrays are
+# evaluated in one vectorized pass; plain sequences fall back to a tight
+# Python loop.  Either way the whole batch is recorded as a single history
+# entry whose operands hold the batch size and whose result is the number of
+# elements that were computed successfully.
+
+_BATCH_ERROR_MODES = ("raise", "mask")
+
+_BATCH_TYPE_ERRORS = {
+    "add": "Both arguments must be numbers",
+    "subtract": "Both arguments must be numbers",
+    "multiply": "Both arguments must be numbers",
+    "divide": "Division requires numeric inputs",
+    "power": "Both arguments must be numbers",
+    "sqrt": "Argument must be a number",
+}
+
+
+def _divide_value(a, b):
+    """Divide a by b without logging or history."""
+    if b == 0:
+        raise ValueError(f"Cannot divide {a} by zero - division by zero is undefined")
+    return a / b
+
+
+def _sqrt_value(a):
+    """Square root of a without history."""
     if a < 0:
         raise ValueError("Cannot compute square root of negative number")
-    result = a**0.5
-    _calculator_history.add_entry("sqrt", [a], result)
-    return result
+    return a**0.5
+
+
+_PYTHON_KERNELS: dict[str, Callable[..., Any]] = {
+    "add": operator.add,
+    "subtract": operator.sub,
+    "multiply": operator.mul,
+    "divide": _divide_value,
+    "power": _checked_power,
+    "sqrt": _sqrt_value,
+}
+
+# Operations whose Python kernel can never raise for numeric inputs
+_INFALLIBLE_OPERATIONS = frozenset({"add", "subtract", "multiply"})
+
+
+# Precision modes
+#
+# Operations on two ints or floats in a "float" session never get here; every
+# other call is dispatched on operand types. A Decimal operand (or a
+# "decimal" session) converts all operands to Decimal and computes in the
+# session's context. Otherwise ints and Fractions are computed exactly and
+# floats take over as usual in Python's numeric tower.
+
+_LOG_MESSAGES = {"multiply": "Multiplying {} x {}", "divide": "Dividing {} ÷ {}"}
+
+
+def exact_sqrt(value: int | Fraction) -> int | Fraction | None:
+    """Return the exact square root of a non-negative int or Fraction.
+
+    Uses ``math.isqrt``, so it works for ints far too large for a float.
+    Returns None when the value is not a perfect square.
+    """
+    if isinstance(value, int):
+        root = math.isqrt(value)
+        return root if root * root == value else None
+    numerator = math.isqrt(value.numerator)
+    denominator = math.isqrt(value.denominator)
+    if (
+        numerator * numerator == value.numerator
+        and denominator * denominator == value.denominator
+    ):
+        return Fraction(numerator, denominator)
+    return None
+
+
+def _fraction_divide(a, b):
+    """Divide exactly unless an operand is a float."""
+    if b == 0:
+        raise ValueError(f"Cannot divide {a} by zero - division by zero is undefined")
+    if isinstance(a, float) or isinstance(b, float):
+        return a / b
+    return Fraction(a, b)
+
+
+def _fraction_power(a, b):
+    """Raise to an integer power exactly, within the integer power limits."""
+    if isinstance(b, Fraction) and b.denominator == 1:
+        b = b.numerator
+    if isinstance(a, float) or not isinstance(b, int):
+        return _checked_power(a, b)
+    if isinstance(a, int):
+        if b >= 0:
+            return _integer_power(a, b)
+        if a == 0:
+            raise ZeroDivisionError("0 cannot be raised to a negative power")
+        return Fraction(1, _integer_power(a, -b))
+    if b < 0:
+        if a == 0:
+            raise ZeroDivisionError("0 cannot be raised to a negative power")
+        a, b = 1 / a, -b
+    return Fraction(_integer_power(a.numerator, b), _integer_power(a.denominator, b))
+
+
+def _fraction_sqrt(a):
+    """Exact root of a perfect square, else the float root."""
+    if a < 0:
+        raise ValueError("Cannot compute square root of negative number")
+    if not isinstance(a, float):
+        root = exact_sqrt(a)
+        if root is not None:
+            return root
+    return a**0.5
+
+
+def _decimal_divide(context: Context, a: Decimal, b: Decimal) -> Decimal:
+    """Divide in a decimal context."""
+    if b == 0:
+        raise ValueError(f"Cannot divide {a} by zero - division by zero is undefined")
+    return context.divide(a, b)
+
+
+def _decimal_sqrt(context: Context, a: Decimal) -> Decimal:
+    """Square root in a decimal context."""
+    if a < 0:
+        raise ValueError("Cannot compute square root of negative number")
+    return context.sqrt(a)
+
+
+_FRACTION_KERNELS: dict[str, Callable[..., Any]] = {
+    "add": operator.add,
+    "subtract": operator.sub,
+    "multiply": operator.mul,
+    "divide": _fraction_divide,
+    "power": _fraction_power,
+    "sqrt": _fraction_sqrt,
+}
+
+# Unbound Context methods take the context as their first argument
+_DECIMAL_KERNELS: dict[str, Callable[..., Any]] = {
+    "add": Context.add,
+    "subtract": Context.subtract,
+    "multiply": Context.multiply,
+    "divide": _decimal_divide,
+    "power": Context.power,
+    "sqrt": _decimal_sqrt,
+}
+
+_PRECISE_TYPES = (int, float, Fraction, Decimal)
+
+
+def _to_decimal(value, context: Context) -> Decimal:
+    """Convert an operand to Decimal; floats by their shortest repr."""
+    if isinstance(value, Decimal):
+        return value
+    if isinstance(value, Fraction):
+        return context.divide(Decimal(value.numerator), Decimal(value.denominator))
+    if isinstance(value, float):
+        return Decimal(repr(value))
+    return Decimal(value)
+
+
+def _precise_value(operation: str, args: tuple, precision: str, context: Context):
+    """Compute an operation with the fraction or decimal kernels."""
+    if not all(isinstance(arg, _PRECISE_TYPES) for arg in args):
+        raise TypeError(_BATCH_TYPE_ERRORS[operation])
+    if precision != "decimal" and not any(isinstance(a, Decimal) for a in args):
+        return _FRACTION_KERNELS[operation](*args)
+
+    operands = [_to_decimal(arg, context) for arg in args]
+    try:
+        return _DECIMAL_KERNELS[operation](context, *operands)
+    except Overflow:
+        raise OverflowError("Result too large to represent") from None
+    except InvalidOperation:
+        shown = ", ".join(map(str, operands))
+        raise ValueError(f"Invalid decimal {operation} of {shown}") from None
+
+
+def _uses_numpy(*values) -> bool:
+    """Return True if any of the batch operands is a NumPy array."""
+    return np is not None and any(isinstance(v, np.ndarray) for v in values)
+
+
+def _as_numeric_array(values, message: str):
+    """Convert values to a NumPy array, rejecting non-numeric dtypes."""
+    array = np.asarray(values)
+    if array.dtype.kind not in "biuf":
+        raise TypeError(message)
+    return array
+
+
+def _batch_error(operation: str, a, b=None) -> Exception:
+    """Build the exception the scalar operation would raise for one element."""
+    if operation == "divide":
+        return ValueError(f"Cannot divide {a} by zero - division by zero is undefined")
+    if operation == "sqrt":
+        return ValueError("Cannot compute square root of negative number")
+    if a == 0 and b < 0:
+        return ZeroDivisionError("0.0 cannot be raised to a negative power")
+    return OverflowError("Result too large to represent")
+
+
+def _integer_overflow(kernel, a_arr, b_arr, estimate):
+    """Flag elements whose integer result does not fit the arrays' dtype.
+
+    ``estimate`` is the result computed in floats. Near the dtype's bounds
+    it is not exact, so those elements are checked by applying ``kernel``
+    to the operands as Python ints.
+    """
+    info = np.iinfo(np.result_type(a_arr, b_arr))
+    overflow = ~((estimate < info.max * 0.999) & (estimate >= info.min * 0.999))
+    border = (estimate <= info.max * 1.001) & (estimate >= info.min * 1.001)
+    for index in np.flatnonzero(overflow & border):
+        exact = kernel(a_arr.flat[index].item(), b_arr.flat[index].item())
+        overflow.flat[index] = not info.min <= exact <= info.max
+    return overflow
+
+
+def _wrapped(operation: str, a_arr, b_arr, results):
+    """Flag integer results of add, subtract or multiply that wrapped around."""
+    a_arr, b_arr = a_arr.astype(results.dtype), b_arr.astype(results.dtype)
+    if operation == "multiply":
+        estimate = a_arr.astype(float) * b_arr.astype(float)
+        return _integer_overflow(operator.mul, a_arr, b_arr, estimate)
+    if results.dtype.kind == "u":
+        return results < a_arr if operation == "add" else a_arr < b_arr
+    # Signed overflow gives a result whose sign no operand would allow
+    if operation == "add":
+        return ((a_arr ^ results) & (b_arr ^ results)) < 0
+    return ((a_arr ^ b_arr) & (a_arr ^ results)) < 0
+
+
+def _numpy_exact(operation: str, a_arr, b_arr):
+    """Add, subtract or multiply arrays; integers never wrap around.
+
+    If any integer result overflows the dtype, the batch is computed with
+    Python ints in an object array instead, which gives the exact results
+    the scalar operations return.
+    """
+    kernel = _PYTHON_KERNELS[operation]
+    results = kernel(a_arr, b_arr)
+    if results.dtype.kind in "iu" and _wrapped(operation, a_arr, b_arr, results).any():
+        results = kernel(a_arr.astype(object), b_arr.astype(object))
+    return results
+
+
+def _numpy_power(a_arr, b_arr):
+    """Vectorized power that flags overflowing elements instead of wrapping."""
+    if a_arr.dtype.kind in "biu" and b_arr.dtype.kind in "biu":
+        if (b_arr < 0).any():
+            # Integer arrays cannot hold negative powers; switch to floats
+            a_arr = a_arr.astype(float)
+        else:
+            estimate = np.power(a_arr.astype(float), b_arr)
+            invalid = _integer_overflow(operator.pow, a_arr, b_arr, estimate)
+            safe_b = np.where(invalid, 0, b_arr)
+            return np.power(a_arr, safe_b), invalid
+    results = np.power(a_arr, b_arr)
+    # NumPy gives NaN for a negative base with a fractional exponent, where
+    # the scalar power returns a complex number; compute those with it
+    complex_roots = (a_arr < 0) & (np.floor(b_arr) != b_arr)
+    if complex_roots.any():
+        results = results.astype(complex)
+        results[complex_roots] = [
+            _checked_power(a, b)
+            for a, b in zip(
+                a_arr[complex_roots].tolist(),
+                b_arr[complex_roots].tolist(),
+                strict=True,
+            )
+        ]
+    return results, np.isinf(results) | ((a_arr == 0) & (b_arr < 0))
+
+
+def _numpy_binary(operation: str, a_arr, b_arr):
+    """Evaluate a binary operation over arrays, returning (results, invalid)."""
+    if operation in _INFALLIBLE_OPERATIONS:
+        return _numpy_exact(operation, a_arr, b_arr), None
+    if operation == "divide":
+        invalid = b_arr == 0
+        return np.true_divide(a_arr, np.where(invalid, 1, b_arr)), invalid
+    return _numpy_power(a_arr, b_arr)
+
+
+def _finish_numpy_batch(operation, errors, results, invalid, *arrays):
+    """Raise or mask invalid elements of a vectorized batch result."""
+    if invalid is None or not invalid.any():
+        return results, results.size
+    if errors == "raise":
+        index = int(np.flatnonzero(invalid)[0])
+        raise _batch_error(operation, *(arr.flat[index].item() for arr in arrays))
+    if results.dtype.kind != "c":
+        results = results.astype(float)
+    results[invalid] = np.nan
+    return results, results.size - int(invalid.sum())
+
+
+def _check_error_mode(errors: str) -> None:
+    """Validate the ``errors`` argument of a batch function."""
+    if errors not in _BATCH_ERROR_MODES:
+        raise ValueError(f"errors must be one of {_BATCH_ERROR_MODES}, got {errors!r}")
+
+
+def _check_batch_args(operation: str, *sequences) -> None:
+    """Validate element types and lengths of a Python batch."""
+    message = _BATCH_TYPE_ERRORS[operation]
+    for values in sequences:
+        if not all(isinstance(v, (int, float)) for v in values):
+            raise TypeError(message)
+    if len({len(values) for values in sequences}) > 1:
+        raise ValueError("Batch operands must have the same length")
+
+
+def _python_batch(operation: str, errors: str, *sequences) -> tuple[list, int]:
+    """Evaluate a batch element by element with the scalar kernels."""
+    kernel = _PYTHON_KERNELS[operation]
+    if operation in _INFALLIBLE_OPERATIONS:
+        results = list(map(kernel, *sequences))
+        return results, len(results)
+
+    results = []
+    failures = 0
+    for args in zip(*sequences, strict=True):
+        try:
+            results.append(kernel(*args))
+        except (ValueError, OverflowError, ZeroDivisionError):
+            if errors == "raise":
+                raise
+            results.append(math.nan)
+            failures += 1
+    return results, len(results) - failures
+
+
+def _binary_batch(operation: str, a_values, b_values, errors: str):
+    """Evaluate a binary batch, returning ``(results, computed count)``."""
+    _check_error_mode(errors)
+    if _uses_numpy(a_values, b_values):
+        message = _BATCH_TYPE_ERRORS[operation]
+        a_arr = _as_numeric_array(a_values, message)
+        b_arr = _as_numeric_array(b_values, message)
+        if a_arr.shape != b_arr.shape:
+            raise ValueError("Batch operands must have the same length")
+        with np.errstate(all="ignore"):
+            results, invalid = _numpy_binary(operation, a_arr, b_arr)
+        return _finish_numpy_batch(operation, errors, results, invalid, a_arr, b_arr)
+    _check_batch_args(operation, a_values, b_values)
+    return _python_batch(operation, errors, a_values, b_values)
+
+
+def _sqrt_batch(values, errors: str):
+    """Evaluate a sqrt batch, returning ``(results, computed count)``."""
+    _check_error_mode(errors)
+    if _uses_numpy(values):
+        array = _as_numeric_array(values, _BATCH_TYPE_ERRORS["sqrt"])
+        invalid = array < 0
+        with np.errstate(all="ignore"):
+            results = np.sqrt(array.astype(float))
+        return _finish_numpy_batch("sqrt", errors, results, invalid, array)
+    _check_batch_args("sqrt", values)
+    return _python_batch("sqrt", errors, values)
+
+
+def add_many(a_values: Sequence, b_values: Sequence, errors: str = "raise"):
+    """Add two sequences element-wise.
+
+    Args:
+        a_values: First operands (sequence or NumPy array)
+        b_values: Second operands, same length as ``a_values``
+        errors: ``"raise"`` to raise the scalar error for the first invalid
+            element, or ``"mask"`` to put NaN in its place
+
+    Returns:
+        A NumPy array if either input is an array, otherwise a list. Integer
+        arrays whose results overflow their dtype give an object array of
+        exact Python ints.
+    """
+    return _default_session.add_many(a_values, b_values, errors)
+
+
+def subtract_many(a_values: Sequence, b_values: Sequence, errors: str = "raise"):
+    """Subtract b_values from a_values element-wise. See ``add_many``."""
+    return _default_session.subtract_many(a_values, b_values, errors)
+
+
+def multiply_many(a_values: Sequence, b_values: Sequence, errors: str = "raise"):
+    """Multiply two sequences element-wise. See ``add_many``."""
+    return _default_session.multiply_many(a_values, b_values, errors)
+
+
+def divide_many(a_values: Sequence, b_values: Sequence, errors: str = "raise"):
+    """Divide a_values by b_values element-wise.
+
+    Zero divisors raise ``ValueError`` or are masked with NaN. See ``add_many``.
+    """
+    return _default_session.divide_many(a_values, b_values, errors)
+
+
+def power_many(a_values: Sequence, b_values: Sequence, errors: str = "raise"):
+    """Raise a_values to b_values element-wise.
+
+    Overflow is detected per element and raises ``OverflowError`` or is masked
+    with NaN. Integer arrays are checked against their dtype's range instead
+    of silently wrapping. See ``add_many``.
+    """
+    return _default_session.power_many(a_values, b_values, errors)
+
+
+def sqrt_many(values: Sequence, errors: str = "raise"):
+    """Square root of every element.
+
+    Negative inputs raise ``ValueError`` or are masked with NaN. See
+    ``add_many``.
+    """
+    return _default_session.sqrt_many(values, errors)
+
+
+# Operation statistics
+
+
+_operation_stats = OperationStatsCollector()
+
+
+def _instrumented_operations() -> dict[str, Callable[..., Any]]:
+    """Operations observed by the statistics collector.
+
+    The session methods are instrumented, so calls through any session and
+    through the module-level functions are all counted.
+    """
+    names = (*OPERATIONS, *(f"{name}_many" for name in OPERATIONS))
+    return {name: getattr(Calculator, name) for name in names}
+
+
+def enable_operation_stats() -> None:
+    """Start counting calls, errors and latency for every operation.
+
+    Instrumentation is off by default; while off, operations run with no
+    added cost at all.
+    """
+    _operation_stats.attach(_instrumented_operations())
+
+
+def disable_operation_stats() -> None:
+    """Stop collecting operation statistics (collected values are kept)."""
+    _operation_stats.detach()
+
+
+def get_operation_stats() -> dict[str, dict[str, Any]]:
+    """Get per-operation statistics.
+
+    Returns:
+        For each operation called while enabled: ``calls``, ``errors``
+        (count per exception type name) and ``latency_ns`` (count, min, max,
+        mean, p50, p90, p99 from a log-linear histogram)
+    """
+    return _operation_stats.snapshot()
+
+
+def reset_operation_stats() -> None:
+    """Zero all operation statistics."""
+    _operation_stats.reset()
 
 
 # History management functions
@@ -200,25 +1155,36 @@ def get_calculation_history(limit: int | None = None) -> list[dict[str, Any]]:
     Returns:
         List of history entries with calculation details
     """
-    return _calculator_history.get_history(limit)
+    return _default_session.history.get_history(limit)
 
 
-def print_history(limit: int | None = None) -> None:
+# Entries formatted per write() when printing history
+_PRINT_CHUNK = 1024
+
+
+def print_history(limit: int | None = None, file: TextIO | None = None) -> None:
     """Print the calculation history in a readable format.
 
+    Entries are read through a view of the history rather than a copy (or,
+    with a limit, as the newest ``limit`` entries, which every backend
+    reads without merging or decoding the rest) and written in chunks, one
+    ``write`` per chunk.
+
     Args:
         limit: Maximum number of entries to display (newest first)
+        file: Text stream to write to (defaults to ``sys.stdout``)
     """
-    history = _calculator_history.get_history(limit)
-    if not history:
-        print("No calculations in history.")
+    out = sys.stdout if file is None else file
+    history = _default_session.history
+    entries = history.view() if limit is None else history.get_history(limit)
+    if not entries:
+        out.write("No calculations in history.\n")
         return
 
-    print(f"\n📊 Calculation History ({len(history)} entries):")
-    print("-" * 50)
-    for i, entry in enumerate(history, 1):
-        timestamp = entry["timestamp"].strftime("%H:%M:%S")
-        print(f"{i:2d}. [{timestamp}] {entry['expression']}")
+    out.write(f"\n📊 Calculation History ({len(entries)} entries):\n{'-' * 50}\n")
+    for start in range(0, len(entries), _PRINT_CHUNK):
+        chunk = entries[start : start + _PRINT_CHUNK]
+        out.write("".join(format_history_lines(chunk, start + 1)))
 
 
 def get_last_calculation_result() -> float | None:
@@ -227,7 +1193,7 @@ def get_last_calculation_result() -> float | None:
     Returns:
         The result of the last calculation, or None if no calculations
     """
-    return _calculator_history.get_last_result()
+    return _default_session.history.get_last_result()
 
 
 def clear_calculation_history() -> int:
@@ -236,7 +1202,7 @@ def clear_calculation_history() -> int:
     Returns:
         Number of entries that were cleared
     """
-    return _calculator_history.clear_history()
+    return _default_session.history.clear_history()
 
 
 def get_history_count() -> int:
@@ -245,37 +1211,18 @@ def get_history_count() -> int:
     Returns:
         Number of calculations performed
     """
-    return _calculator_history.get_history_count()
+    return _default_session.history.get_history_count()
 
 
 def get_history_summary() -> dict[str, Any]:
     """Get a summary of the calculation history.
 
     Returns:
-        Dictionary with history statistics
+        Dictionary with history statistics. Besides ``operation_counts`` it
+        includes ``operation_stats`` with the count and min/max/mean result
+        of each operation.
     """
-    history = _calculator_history.get_history()
-    if not history:
-        return {
-            "total_calculations": 0,
-            "operations_used": [],
-            "most_recent": None,
-            "first_calculation": None,
-        }
-
-    # Count operations
-    operations = {}
-    for entry in history:
-        op = entry["operation"]
-        operations[op] = operations.get(op, 0) + 1
-
-    return {
-        "total_calculations": len(history),
-        "operations_used": list(operations.keys()),
-        "operation_counts": operations,
-        "most_recent": history[0]["expression"],
-        "first_calculation": history[-1]["expression"],
-    }
+    return _default_session.history.get_summary()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,196 @@
+"""
+Command-line pipeline - stream operation records through the calculator
+
+Reads records such as ``divide,10,2`` (CSV) or ``["divide", 10, 2]`` /
+``{"op": "divide", "args": [10, 2]}`` (JSON lines) from files or stdin,
+evaluates each one and writes results in buffered chunks. Every stage is a
+generator, so memory use does not depend on the size of the input. Failed
+records are reported on stderr with their line number and the stream
+continues.
+
+    python -m src.cli operations.csv
+    cat operations.jsonl | python -m src.cli --output-format jsonl --no-history
+"""
+
+import json
+import sys
+from collections.abc import Iterable, Iterator
+from typing import Any, TextIO
+
+import click
+
+from src.calculator import (
+    OPERATIONS,
+    get_history_summary,
+    set_history_backend,
+    set_log_sink,
+)
+from src.history import NullHistory, RingBufferHistory
+
+# (line number, operation, operands) or (line number, None, error message)
+Record = tuple[int, str | None, Any]
+
+
+def read_lines(inputs: Iterable[TextIO]) -> Iterator[tuple[int, str]]:
+    """Yield ``(line number, text)`` for every non-blank, non-comment line."""
+    number = 0
+    for stream in inputs:
+        for line in stream:
+            number += 1
+            text = line.strip()
+            if text and not text.startswith("#"):
+                yield number, text
+
+
+def parse_number(text: str) -> int | float:
+    """Parse an operand, keeping integers as ints."""
+    text = text.strip()
+    try:
+        return int(text)
+    except ValueError:
+        return float(text)
+
+
+def parse_record(text: str, input_format: str) -> tuple[str, list[Any]]:
+    """Parse one CSV or JSON record into an operation name and operands."""
+    if input_format == "jsonl" or (input_format == "auto" and text[0] in "[{"):
+        data = json.loads(text)
+        if isinstance(data, dict):
+            name, args = data["op"], list(data.get("args", []))
+        else:
+            name, *args = data
+        if not isinstance(name, str):
+            raise TypeError(f"operation name must be a string, got {name!r}")
+        return name, args
+    name, *args = text.split(",")
+    return name.strip(), [parse_number(arg) for arg in args]
+
+
+def parse_records(
+    lines: Iterable[tuple[int, str]], input_format: str
+) -> Iterator[Record]:
+    """Parse lines into records, turning malformed lines into errors."""
+    for number, text in lines:
+        try:
+            name, args = parse_record(text, input_format)
+        except (ValueError, KeyError, TypeError) as error:
+            yield number, None, f"Invalid record: {error}"
+        else:
+            yield number, name, args
+
+
+def evaluate_records(records: Iterable[Record]) -> Iterator[tuple[int, str, Any]]:
+    """Evaluate records, yielding ``(line, operation, result or exception)``."""
+    for number, name, args in records:
+        if name is None:
+            yield number, "", ValueError(args)
+            continue
+        try:
+            func = OPERATIONS.get(name)
+            if func is None:
+                raise ValueError(f"Unknown operation {name!r}")
+            yield number, name, func(*args)
+        except (TypeError, ValueError, OverflowError, ZeroDivisionError) as error:
+            yield number, name, error
+
+
+def format_result(
+    number: int, name: str, result: Any, output_format: str
+) -> tuple[str, bool]:
+    """Format one result line; the flag is True for errors."""
+    if isinstance(result, Exception):
+        return f"line {number}: {type(result).__name__}: {result}\n", True
+    if output_format == "jsonl":
+        # Complex, Fraction and Decimal results are written as strings,
+        # like the server's responses
+        row = {"line": number, "op": name, "result": result}
+        return json.dumps(row, default=str) + "\n", False
+    if output_format == "csv":
+        return f"{number},{name},{result}\n", False
+    return f"{result}\n", False
+
+
+def write_chunked(
+    lines: Iterable[tuple[str, bool]], out: TextIO, err: TextIO, chunk_size: int
+) -> int:
+    """Write result lines in chunks of ``chunk_size``; return the error count."""
+    results: list[str] = []
+    errors = 0
+    for text, is_error in lines:
+        if is_error:
+            errors += 1
+            err.write(text)
+            continue
+        results.append(text)
+        if len(results) >= chunk_size:
+            out.write("".join(results))
+            results.clear()
+    if results:
+        out.write("".join(results))
+    out.flush()
+    return errors
+
+
+@click.command()
+@click.argument("inputs", nargs=-1, type=click.File("r"))
+@click.option(
+    "--format",
+    "input_format",
+    type=click.Choice(["auto", "csv", "jsonl"]),
+    default="auto",
+    show_default=True,
+    help="Input record format.",
+)
+@click.option(
+    "--output-format",
+    type=click.Choice(["plain", "csv", "jsonl"]),
+    default="plain",
+    show_default=True,
+    help="Output format for results.",
+)
+@click.option(
+    "--chunk-size",
+    type=click.IntRange(min=1),
+    default=1000,
+    show_default=True,
+    help="Result lines buffered per write.",
+)
+@click.option("--no-history", is_flag=True, help="Do not record calculations.")
+@click.option(
+    "--history-limit",
+    type=click.IntRange(min=1),
+    default=10_000,
+    show_default=True,
+    help="Most recent calculations kept in history.",
+)
+@click.option("--summary", is_flag=True, help="Print a history summary to stderr.")
+def main(  # noqa: PLR0913, PLR0917 - one parameter per CLI option
+    inputs: tuple[TextIO, ...],
+    input_format: str,
+    output_format: str,
+    chunk_size: int,
+    no_history: bool,
+    history_limit: int,
+    summary: bool,
+) -> None:
+    """Evaluate operation records from INPUTS (default: stdin)."""
+    set_log_sink(None)
+    set_history_backend(
+        NullHistory() if no_history else RingBufferHistory(max_size=history_limit)
+    )
+
+    records = parse_records(read_lines(inputs or (sys.stdin,)), input_format)
+    lines = (
+        format_result(number, name, result, output_format)
+        for number, name, result in evaluate_records(records)
+    )
+    errors = write_chunked(lines, sys.stdout, sys.stderr, chunk_size)
+
+    if summary:
+        sys.stderr.write(json.dumps(get_history_summary(), default=str) + "\n")
+    if errors:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,287 @@
+"""
+Expression engine - evaluate formulas such as "sqrt(16) + 2^3 * 4"
+
+Formulas are parsed into a small AST, compiled into nested closures that call
+the calculator operations (so every step is recorded in history), and kept in
+a bounded LRU cache keyed by the source text. Evaluating a formula that is
+already cached skips tokenizing and parsing entirely.
+"""
+
+import re
+from collections import OrderedDict
+from collections.abc import Callable, Mapping
+from typing import Any
+
+from src.calculator import add, divide, multiply, power, sqrt, subtract
+
+# Functions callable by name inside expressions, with their arity
+FUNCTIONS: dict[str, tuple[Callable[..., Any], int]] = {
+    "add": (add, 2),
+    "subtract": (subtract, 2),
+    "multiply": (multiply, 2),
+    "divide": (divide, 2),
+    "power": (power, 2),
+    "sqrt": (sqrt, 1),
+}
+
+_BINARY_OPERATORS = {
+    "+": "add",
+    "-": "subtract",
+    "*": "multiply",
+    "/": "divide",
+    "÷": "divide",
+    "^": "power",
+    "**": "power",
+}
+
+_TOKEN_PATTERN = re.compile(
+    r"""
+    \s*(?:
+        (?P<number>(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?)
+      | (?P<name>[A-Za-z_]\w*)
+      | (?P<op>\*\*|[-+*/÷^(),])
+    )
+    """,
+    re.VERBOSE,
+)
+
+Node = tuple
+CompiledExpression = Callable[[Mapping[str, Any]], Any]
+
+
+def tokenize(source: str) -> list[tuple[str, str]]:
+    """Split an expression into ``(kind, text)`` tokens."""
+    tokens = []
+    position = 0
+    source = source.rstrip()
+    while position < len(source):
+        match = _TOKEN_PATTERN.match(source, position)
+        if match is None:
+            raise ValueError(
+                f"Invalid expression: unexpected {source[position:].strip()[:1]!r}"
+                f" at position {position}"
+            )
+        kind = match.lastgroup
+        tokens.append((kind, match.group(kind)))
+        position = match.end()
+    return tokens
+
+
+class _Parser:
+    """Recursive-descent parser producing tuple-based AST nodes.
+
+    Grammar (lowest to highest precedence)::
+
+        expr  := term (("+" | "-") term)*
+        term  := unary (("*" | "/" | "÷") unary)*
+        unary := ("-" | "+") unary | power
+        power := atom (("^" | "**") unary)?
+        atom  := NUMBER | NAME | NAME "(" expr ("," expr)* ")" | "(" expr ")"
+    """
+
+    def __init__(self, tokens: list[tuple[str, str]]):
+        """Start parsing at the first token."""
+        self.tokens = tokens
+        self.position = 0
+
+    def peek(self) -> str | None:
+        """Text of the current token, or None at the end."""
+        if self.position < len(self.tokens):
+            return self.tokens[self.position][1]
+        return None
+
+    def take(self) -> tuple[str, str]:
+        """Consume and return the current token."""
+        if self.position >= len(self.tokens):
+            raise ValueError("Invalid expression: unexpected end of input")
+        token = self.tokens[self.position]
+        self.position += 1
+        return token
+
+    def expect(self, text: str) -> None:
+        """Consume a specific operator token."""
+        _, found = self.take()
+        if found != text:
+            raise ValueError(f"Invalid expression: expected {text!r}, got {found!r}")
+
+    def parse(self) -> Node:
+        """Parse a complete expression."""
+        node = self.expr()
+        if self.peek() is not None:
+            raise ValueError(f"Invalid expression: unexpected {self.peek()!r}")
+        return node
+
+    def expr(self) -> Node:
+        """Parse addition and subtraction."""
+        node = self.term()
+        while self.peek() in {"+", "-"}:
+            _, op = self.take()
+            node = ("call", _BINARY_OPERATORS[op], (node, self.term()))
+        return node
+
+    def term(self) -> Node:
+        """Parse multiplication and division."""
+        node = self.unary()
+        while self.peek() in {"*", "/", "÷"}:
+            _, op = self.take()
+            node = ("call", _BINARY_OPERATORS[op], (node, self.unary()))
+        return node
+
+    def unary(self) -> Node:
+        """Parse unary plus and minus."""
+        if self.peek() in {"-", "+"}:
+            _, op = self.take()
+            operand = self.unary()
+            return ("neg", operand) if op == "-" else operand
+        return self.power()
+
+    def power(self) -> Node:
+        """Parse right-associative exponentiation."""
+        node = self.atom()
+        if self.peek() in {"^", "**"}:
+            self.take()
+            node = ("call", "power", (node, self.unary()))
+        return node
+
+    def atom(self) -> Node:
+        """Parse numbers, variables, function calls and parentheses."""
+        kind, text = self.take()
+        if kind == "number":
+            is_float = any(c in text for c in ".eE")
+            return ("num", float(text) if is_float else int(text))
+        if kind == "name":
+            if self.peek() != "(":
+                return ("var", text)
+            return self.call(text)
+        if text == "(":
+            node = self.expr()
+            self.expect(")")
+            return node
+        raise ValueError(f"Invalid expression: unexpected {text!r}")
+
+    def call(self, name: str) -> Node:
+        """Parse the argument list of a function call."""
+        if name not in FUNCTIONS:
+            raise ValueError(f"Invalid expression: unknown function {name!r}")
+        self.expect("(")
+        args = [self.expr()]
+        while self.peek() == ",":
+            self.take()
+            args.append(self.expr())
+        self.expect(")")
+        arity = FUNCTIONS[name][1]
+        if len(args) != arity:
+            raise ValueError(
+                f"Invalid expression: {name}() takes {arity} argument(s), "
+                f"got {len(args)}"
+            )
+        return ("call", name, tuple(args))
+
+
+def parse(source: str) -> Node:
+    """Parse an expression into a tuple-based AST."""
+    return _Parser(tokenize(source)).parse()
+
+
+def compile_node(node: Node) -> CompiledExpression:
+    """Compile an AST node into a closure taking a variables mapping."""
+    kind = node[0]
+    if kind == "num":
+        value = node[1]
+        return lambda _variables: value
+    if kind == "var":
+        name = node[1]
+
+        def lookup(variables: Mapping[str, Any]) -> Any:
+            try:
+                return variables[name]
+            except KeyError:
+                raise ValueError(f"Undefined variable {name!r}") from None
+
+        return lookup
+    if kind == "neg":
+        operand = compile_node(node[1])
+        return lambda variables: -operand(variables)
+
+    func = FUNCTIONS[node[1]][0]
+    args = [compile_node(arg) for arg in node[2]]
+    if len(args) == 1:
+        (only,) = args
+        return lambda variables: func(only(variables))
+    left, right = args
+    return lambda variables: func(left(variables), right(variables))
+
+
+class ExpressionEngine:
+    """Evaluates expressions with a bounded LRU cache of compiled closures."""
+
+    def __init__(self, cache_size: int = 256):
+        """Initialize an empty cache.
+
+        Args:
+            cache_size: Maximum number of compiled expressions kept
+        """
+        if cache_size < 1:
+            raise ValueError("cache_size must be positive")
+        self.cache_size = cache_size
+        self._cache: OrderedDict[str, CompiledExpression] = OrderedDict()
+        self._hits = 0
+        self._misses = 0
+
+    def compile(self, source: str) -> CompiledExpression:
+        """Return the compiled closure for source, parsing it only once."""
+        compiled = self._cache.get(source)
+        if compiled is not None:
+            self._hits += 1
+            self._cache.move_to_end(source)
+            return compiled
+
+        self._misses += 1
+        compiled = compile_node(parse(source))
+        self._cache[source] = compiled
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+        return compiled
+
+    def evaluate(self, source: str, variables: Mapping[str, Any] | None = None):
+        """Evaluate an expression, recording each operation in history.
+
+        Args:
+            source: Expression text, e.g. ``"sqrt(16) + 2^3 * x"``
+            variables: Values for the names used in the expression
+
+        Returns:
+            The value of the expression
+        """
+        return self.compile(source)({} if variables is None else variables)
+
+    def cache_info(self) -> dict[str, int]:
+        """Get cache hit/miss counts and current size."""
+        return {
+            "hits": self._hits,
+            "misses": self._misses,
+            "size": len(self._cache),
+            "max_size": self.cache_size,
+        }
+
+    def clear_cache(self) -> None:
+        """Drop every compiled expression and reset the counters."""
+        self._cache.clear()
+        self._hits = 0
+        self._misses = 0
+
+
+_default_engine = ExpressionEngine()
+
+
+def evaluate(source: str, variables: Mapping[str, Any] | None = None):
+    """Evaluate an expression with the shared engine.
+
+    Args:
+        source: Expression text, e.g. ``"sqrt(16) + 2^3 * 4"``
+        variables: Values for the names used in the expression
+
+    Returns:
+        The value of the expression
+    """
+    return _default_engine.evaluate(source, variables)
@@ -0,0 +1,1798 @@
+"""
+History storage backends for the calculator
+"""
+
+import heapq
+import itertools
+import json
+import threading
+import time
+from array import array
+from bisect import bisect_left, insort
+from collections import deque
+from collections.abc import Callable, Iterable, Iterator, MutableSequence, Sequence
+from datetime import datetime, timedelta
+from fractions import Fraction
+from itertools import islice
+from operator import itemgetter
+from pathlib import Path
+from typing import Any, NamedTuple, TextIO
+
+# Built once at import time; looked up for every formatted expression
+_EXPRESSION_FORMATTERS: dict[str, Callable[[list[float], float], str]] = {
+    "add": lambda ops, res: f"{ops[0]} + {ops[1]} = {res}",
+    "subtract": lambda ops, res: f"{ops[0]} - {ops[1]} = {res}",
+    "multiply": lambda ops, res: f"{ops[0]} x {ops[1]} = {res}",
+    "divide": lambda ops, res: f"{ops[0]} ÷ {ops[1]} = {res}",
+    "power": lambda ops, res: (
+        f"{ops[0]} ^ {ops[1]} = {res}"
+        if len(ops) == 2
+        else f"{ops[0]} ^ {ops[1]} mod {ops[2]} = {res}"
+    ),
+    "sqrt": lambda ops, res: f"√{ops[0]} = {res}",
+}
+
+
+def format_expression(operation: str, operands: list[float], result: float) -> str:
+    """Format a calculation as a readable expression."""
+    formatter = _EXPRESSION_FORMATTERS.get(operation)
+    if formatter is not None:
+        return formatter(operands, result)
+    return f"{operation}({', '.join(map(str, operands))}) = {result}"
+
+
+# Both conversions go through float seconds, which resolve microseconds for
+# present-day times, and fall back to exact integer arithmetic (several times
+# slower, mostly in ``datetime.replace``) when the float was not precise enough.
+
+
+def datetime_from_ns(timestamp_ns: int) -> datetime:
+    """Convert epoch nanoseconds to a naive local datetime (floored to µs)."""
+    micros = timestamp_ns // 1000
+    timestamp = datetime.fromtimestamp(micros / 1_000_000)
+    if timestamp.microsecond == micros % 1_000_000:
+        return timestamp
+    seconds, micros = divmod(micros, 1_000_000)
+    return datetime.fromtimestamp(seconds).replace(microsecond=micros)
+
+
+def ns_from_datetime(timestamp: datetime) -> int:
+    """Convert a datetime (naive means local time) to epoch nanoseconds."""
+    micros = round(timestamp.timestamp() * 1_000_000)
+    if micros % 1_000_000 != timestamp.microsecond:
+        seconds = int(timestamp.replace(microsecond=0).timestamp())
+        micros = seconds * 1_000_000 + timestamp.microsecond
+    return micros * 1000
+
+
+class HistoryEntry(dict):
+    """A history entry whose ``expression`` and ``timestamp`` are built lazily.
+
+    Most entries are never displayed, so building the expression string for
+    every calculation is wasted work. The entry behaves like a plain dict
+    with an ``expression`` key; the string is computed from ``operation``,
+    ``operands`` and ``result`` the first time anything reads it and is then
+    cached in the dict. Entries created with ``stamped`` do the same for
+    ``timestamp``: only the integer ``time.time_ns()`` is stored when the
+    calculation is recorded, and the ``datetime`` is built on first read.
+    """
+
+    __slots__ = ("_timestamp_ns",)
+
+    @classmethod
+    def stamped(
+        cls, operation: str, operands: list[float], result: Any, timestamp_ns: int
+    ) -> "HistoryEntry":
+        """Create an entry recorded at ``timestamp_ns`` epoch nanoseconds."""
+        entry = cls(operation=operation, operands=operands, result=result)
+        entry._timestamp_ns = timestamp_ns
+        return entry
+
+    def timestamp_ns(self) -> int:
+        """When the entry was recorded, in epoch nanoseconds."""
+        try:
+            return self._timestamp_ns
+        except AttributeError:
+            return ns_from_datetime(self["timestamp"])
+
+    def __missing__(self, key: str) -> Any:
+        """Build the expression or timestamp when it is first looked up."""
+        if key == "expression":
+            if not dict.__contains__(self, "timestamp") and hasattr(
+                self, "_timestamp_ns"
+            ):
+                # Keep the key order of an eagerly built entry
+                self.__missing__("timestamp")
+            value = format_expression(
+                self["operation"], self["operands"], self["result"]
+            )
+        elif key == "timestamp" and hasattr(self, "_timestamp_ns"):
+            value = datetime_from_ns(self._timestamp_ns)
+        else:
+            raise KeyError(key)
+        self[key] = value
+        return value
+
+    def _materialize(self) -> None:
+        """Make sure the lazy fields are stored before whole-dict access."""
+        if not dict.__contains__(self, "expression"):
+            self.__missing__("expression")
+
+    def __contains__(self, key: object) -> bool:
+        """Report the lazy fields as present even before they are built."""
+        if key == "timestamp":
+            return dict.__contains__(self, key) or hasattr(self, "_timestamp_ns")
+        return key == "expression" or dict.__contains__(self, key)
+
+    def __iter__(self) -> Iterator[str]:
+        """Iterate over keys, including ``expression``."""
+        self._materialize()
+        return dict.__iter__(self)
+
+    def __len__(self) -> int:
+        """Number of keys, including ``expression``."""
+        self._materialize()
+        return dict.__len__(self)
+
+    def __eq__(self, other: object) -> bool:
+        """Compare as a plain dict, including ``expression``."""
+        self._materialize()
+        if isinstance(other, HistoryEntry):
+            other._materialize()
+        return dict.__eq__(self, other)
+
+    def __ne__(self, other: object) -> bool:
+        """Inverse of ``__eq__``."""
+        return not self == other
+
+    __hash__ = None  # type: ignore[assignment]
+
+    def __repr__(self) -> str:
+        """Represent as a plain dict, including ``expression``."""
+        self._materialize()
+        return dict.__repr__(self)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """Return the value for key, building the lazy fields on demand."""
+        if key == "expression" or (key == "timestamp" and key in self):
+            return self[key]
+        return dict.get(self, key, default)
+
+    def keys(self):
+        """Return a view of the keys, including ``expression``."""
+        self._materialize()
+        return dict.keys(self)
+
+    def values(self):
+        """Return a view of the values, including ``expression``."""
+        self._materialize()
+        return dict.values(self)
+
+    def items(self):
+        """Return a view of the items, including ``expression``."""
+        self._materialize()
+        return dict.items(self)
+
+    def copy(self) -> dict[str, Any]:
+        """Return a plain dict copy with the expression filled in."""
+        self._materialize()
+        return dict(dict.items(self))
+
+
+# Results that count towards min/max/mean; Decimals are counted but left out,
+# since they cannot be summed with floats
+_REAL_RESULT_TYPES = (int, float, Fraction)
+
+
+class OperationStats:
+    """Running count and min/max/mean of results for one operation."""
+
+    __slots__ = ("count", "maximum", "minimum", "real_count", "total")
+
+    def __init__(self):
+        """Initialize empty aggregates."""
+        self.count = 0
+        self.real_count = 0
+        self.total = 0
+        self.minimum: float | None = None
+        self.maximum: float | None = None
+
+    def record(self, result: Any) -> None:
+        """Fold one result into the aggregates."""
+        self.count += 1
+        if isinstance(result, _REAL_RESULT_TYPES):
+            self.real_count += 1
+            self.total += result
+            if self.minimum is None or result < self.minimum:
+                self.minimum = result
+            if self.maximum is None or result > self.maximum:
+                self.maximum = result
+
+    def merge(self, other: "OperationStats") -> None:
+        """Fold another set of aggregates for the same operation into this one."""
+        self.count += other.count
+        self.real_count += other.real_count
+        self.total += other.total
+        if other.minimum is not None and (
+            self.minimum is None or other.minimum < self.minimum
+        ):
+            self.minimum = other.minimum
+        if other.maximum is not None and (
+            self.maximum is None or other.maximum > self.maximum
+        ):
+            self.maximum = other.maximum
+
+    def as_rollup(self) -> dict[str, Any]:
+        """Return count, sum, min and max as a dictionary."""
+        return {
+            "count": self.count,
+            "sum": self.sum(),
+            "min": self.minimum,
+            "max": self.maximum,
+        }
+
+    def sum(self) -> Any:
+        """Sum of the real results."""
+        return self.total
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the aggregates as a summary dictionary."""
+        mean = self.sum() / self.real_count if self.real_count else None
+        return {
+            "count": self.count,
+            "min": self.minimum,
+            "max": self.maximum,
+            "mean": mean,
+        }
+
+
+class WindowedOperationStats(OperationStats):
+    """Aggregates over a window of results that leave oldest first.
+
+    Min and max candidates are kept in monotonic deques, so discarding the
+    oldest result is O(1) amortized even when it was an extreme. Float
+    results are summed with Neumaier compensation, and ints and Fractions
+    exactly, so results leaving the window do not make the mean drift.
+    """
+
+    __slots__ = ("float_count", "float_error", "float_total", "maxima", "minima")
+
+    def __init__(self):
+        """Initialize empty aggregates."""
+        super().__init__()
+        self.float_count = 0
+        self.float_total = 0.0
+        self.float_error = 0.0
+        self.minima: deque[Any] = deque()
+        self.maxima: deque[Any] = deque()
+
+    def record(self, result: Any) -> None:
+        """Fold the newest result into the aggregates."""
+        self.count += 1
+        if not isinstance(result, _REAL_RESULT_TYPES):
+            return
+        self.real_count += 1
+        if isinstance(result, float):
+            self.float_count += 1
+            self._add_float(result)
+        else:
+            self.total += result
+        minima, maxima = self.minima, self.maxima
+        while minima and minima[-1] > result:
+            minima.pop()
+        minima.append(result)
+        while maxima and maxima[-1] < result:
+            maxima.pop()
+        maxima.append(result)
+        self.minimum, self.maximum = minima[0], maxima[0]
+
+    def discard(self, result: Any) -> None:
+        """Remove the oldest result from the aggregates."""
+        self.count -= 1
+        if not isinstance(result, _REAL_RESULT_TYPES):
+            return
+        self.real_count -= 1
+        if isinstance(result, float):
+            self.float_count -= 1
+            if self.float_count:
+                self._add_float(-result)
+            else:
+                self.float_total = self.float_error = 0.0
+        else:
+            self.total -= result
+        minima, maxima = self.minima, self.maxima
+        # ``is`` first: a NaN result equals nothing, not even itself
+        if minima and (minima[0] is result or minima[0] == result):
+            minima.popleft()
+        if maxima and (maxima[0] is result or maxima[0] == result):
+            maxima.popleft()
+        self.minimum = minima[0] if minima else None
+        self.maximum = maxima[0] if maxima else None
+
+    def _add_float(self, value: float) -> None:
+        """Add to the float sum, carrying the rounding error separately."""
+        total = self.float_total
+        new_total = total + value
+        if abs(total) >= abs(value):
+            self.float_error += (total - new_total) + value
+        else:
+            self.float_error += (value - new_total) + total
+        self.float_total = new_total
+
+    def sum(self) -> Any:
+        """Sum of the real results."""
+        if not self.float_count:
+            return self.total
+        return self.total + (self.float_total + self.float_error)
+
+
+class HistoryStats:
+    """Per-operation aggregates maintained as entries are added and removed."""
+
+    def __init__(self, *, windowed: bool = False):
+        """Initialize with no operations.
+
+        Args:
+            windowed: Support ``discard()`` of the oldest entries, for
+                bounded histories
+        """
+        self.operations: dict[str, OperationStats] = {}
+        self._stats_type = WindowedOperationStats if windowed else OperationStats
+
+    def record(self, operation: str, result: Any) -> None:
+        """Account for a newly added entry."""
+        stats = self.operations.get(operation)
+        if stats is None:
+            stats = self.operations[operation] = self._stats_type()
+        stats.record(result)
+
+    def discard(self, operation: str, result: Any) -> None:
+        """Account for the oldest entry leaving a windowed history."""
+        stats = self.operations[operation]
+        stats.discard(result)
+        if stats.count == 0:
+            del self.operations[operation]
+
+    def merge(self, other: "HistoryStats") -> None:
+        """Fold another set of per-operation aggregates into this one."""
+        for operation, other_stats in list(other.operations.items()):
+            stats = self.operations.get(operation)
+            if stats is None:
+                stats = self.operations[operation] = OperationStats()
+            stats.merge(other_stats)
+
+    def clear(self) -> None:
+        """Forget all aggregates."""
+        self.operations.clear()
+
+
+class HistoryPage(NamedTuple):
+    """One page of query results."""
+
+    entries: list[dict[str, Any]]
+    next_cursor: int | None  # pass back as ``cursor``; None on the last page
+
+
+class EntriesView(Sequence):
+    """Read-only sequence of history entries that does not copy the history.
+
+    Entries are looked up by position on demand, and slicing returns another
+    view over a ``range`` of positions, so reading ``history.view()[:10]``
+    or ``[-10:]`` costs the same for any history size. A view covers the
+    entries present when it was created; use a new view after entries are
+    added or evicted.
+    """
+
+    __slots__ = ("_entries", "_positions")
+
+    def __init__(self, entries: Sequence[dict[str, Any]], positions: range):
+        """Create a view.
+
+        Args:
+            entries: The history's entries, oldest first
+            positions: Positions in ``entries`` to show, in order
+        """
+        self._entries = entries
+        self._positions = positions
+
+    def __len__(self) -> int:
+        """Number of entries in the view."""
+        return len(self._positions)
+
+    def __getitem__(self, index):
+        """Get an entry, or a view of a slice of the entries."""
+        if isinstance(index, slice):
+            return EntriesView(self._entries, self._positions[index])
+        return self._entries[self._positions[index]]
+
+    def __iter__(self) -> Iterator[dict[str, Any]]:
+        """Iterate over the entries in view order."""
+        return self._iterate(self._positions)
+
+    def __reversed__(self) -> Iterator[dict[str, Any]]:
+        """Iterate over the entries in reverse view order."""
+        return self._iterate(self._positions[::-1])
+
+    def _iterate(self, positions: range) -> Iterator[dict[str, Any]]:
+        """Iterate over positions, walking runs of a deque instead of indexing.
+
+        Indexing the middle of a deque is not O(1), so a run of consecutive
+        positions is read with the deque's own iterator when the run starts
+        at the end the iterator starts from; runs at the other end are
+        indexed, which is cheap near either end. Other containers index in
+        O(1), and iterating them would decode the skipped entries.
+        """
+        entries = self._entries
+        getitem = entries.__getitem__
+        if (
+            not isinstance(entries, deque)
+            or not positions
+            or positions.step not in {1, -1}
+        ):
+            return map(getitem, positions)
+        first, last = sorted((positions[0], positions[-1]))
+        after = len(entries) - 1 - last
+        if positions.step == 1 and first <= after:
+            return islice(entries, first, last + 1)
+        if positions.step == -1 and after <= first:
+            return islice(reversed(entries), after, after + len(positions))
+        return map(getitem, positions)
+
+    def __repr__(self) -> str:
+        """Show the number of entries, not the entries themselves."""
+        return f"<EntriesView of {len(self)} entries>"
+
+
+def format_history_lines(
+    entries: Iterable[dict[str, Any]], start: int = 1
+) -> Iterator[str]:
+    """Yield numbered lines as shown by ``print_history``.
+
+    Lines look like ``" 1. [14:32:15] 5 + 3 = 8\n"``. Lazily built fields
+    are formatted without being stored in the entries, so printing a large
+    history does not grow it, and the clock time is formatted once per
+    second of timestamps.
+
+    Args:
+        entries: Entries to format, in display order
+        start: Number of the first line
+    """
+    last_second = None
+    clock = ""
+    for number, entry in enumerate(entries, start):
+        timestamp_ns = getattr(entry, "_timestamp_ns", None)
+        if timestamp_ns is None or dict.__contains__(entry, "timestamp"):
+            clock = entry["timestamp"].strftime("%H:%M:%S")
+            last_second = None
+        else:
+            second = timestamp_ns // 1_000_000_000
+            if second != last_second:
+                clock = time.strftime("%H:%M:%S", time.localtime(second))
+                last_second = second
+        expression = dict.get(entry, "expression")
+        if expression is None:
+            expression = format_expression(
+                entry["operation"], entry["operands"], entry["result"]
+            )
+        yield f"{number:2d}. [{clock}] {expression}\n"
+
+
+# Evicted slots at the front of an index array are reclaimed once there are
+# at least this many of them and they make up half the array
+_COMPACT_AFTER = 1024
+
+
+class HistoryIndex:
+    """Operation and timestamp indexes used by ``CalculatorHistory.query``.
+
+    Entries are identified by sequence number: 0 for the first entry ever
+    added, never reused after eviction or clearing. Each operation keeps the
+    ascending sequence numbers of its entries in an ``array``, and timestamp
+    keys are kept in sequence order, so while timestamps arrive in order (the
+    usual case) a time range maps to a sequence range by bisection and a
+    query costs O(log n + k). Out-of-order timestamps switch time lookups to
+    a sorted copy that is rebuilt on demand.
+    """
+
+    def __init__(self, times: MutableSequence[Any] | None = None):
+        """Initialize an empty index.
+
+        Args:
+            times: Storage for timestamp keys (a list by default; owners with
+                integer keys can pass an ``array("q")``)
+        """
+        self.times: MutableSequence[Any] = [] if times is None else times
+        self.first = 0  # sequence number of the oldest indexed entry
+        self.end = 0  # sequence number the next entry will get
+        self._time_head = 0
+        self._operations: dict[str, array] = {}
+        self._heads: dict[str, int] = {}
+        self._ordered = True
+        # (first, end, sorted keys, their sequence numbers) when last sorted
+        self._by_time: tuple[int, int, list[Any], list[int]] | None = None
+
+    def add(self, operation: str, key: Any) -> None:
+        """Index a new entry by operation and timestamp key."""
+        times = self.times
+        if self._ordered and times and key < times[-1]:
+            self._ordered = False
+        positions = self._operations.get(operation)
+        if positions is None:
+            positions = self._operations[operation] = array("q")
+            self._heads[operation] = 0
+        positions.append(self.end)
+        self.end += 1
+        times.append(key)
+
+    def evict_oldest(self, operation: str) -> None:
+        """Drop the oldest entry, whose operation must be ``operation``."""
+        self.first += 1
+        self._time_head += 1
+        positions = self._operations[operation]
+        head = self._heads[operation] + 1
+        if head == len(positions):
+            del self._operations[operation], self._heads[operation]
+        elif head >= _COMPACT_AFTER and head * 2 >= len(positions):
+            del positions[:head]
+            self._heads[operation] = 0
+        else:
+            self._heads[operation] = head
+        if self._time_head >= _COMPACT_AFTER and self._time_head * 2 >= len(self.times):
+            del self.times[: self._time_head]
+            self._time_head = 0
+
+    def operations(self) -> list[str]:
+        """Operations with at least one indexed entry."""
+        return list(self._operations)
+
+    def clear(self) -> None:
+        """Drop every entry; sequence numbers continue from where they were."""
+        self.first = self.end
+        del self.times[:]
+        self._time_head = 0
+        self._operations.clear()
+        self._heads.clear()
+        self._ordered = True
+
+    def select(  # noqa: PLR0913 - each filter is a separate keyword
+        self,
+        operation: str | None = None,
+        start: Any = None,
+        end: Any = None,
+        *,
+        after: int | None = None,
+        before: int | None = None,
+        limit: int | None = None,
+        reverse: bool = False,
+    ) -> Sequence[int]:
+        """Sequence numbers of matching entries, ascending unless ``reverse``.
+
+        Args:
+            operation: Only entries of this operation
+            start: Only timestamp keys ``>= start``
+            end: Only timestamp keys ``< end``
+            after: Only sequence numbers greater than this
+            before: Only sequence numbers less than this
+            limit: Return at most this many, taken from the front of the
+                requested order
+            reverse: Newest first
+        """
+        lo = self.first if after is None else max(after + 1, self.first)
+        hi = self.end if before is None else min(before, self.end)
+        if (start is not None or end is not None) and not self._ordered:
+            return self._select_unordered(operation, start, end, lo, hi)[
+                slice(None, None, -1 if reverse else 1)
+            ][:limit]
+        if start is not None or end is not None:
+            times, head = self.times, self._time_head
+            offset = self.first - head
+            if start is not None:
+                lo = max(lo, bisect_left(times, start, head) + offset)
+            if end is not None:
+                hi = min(hi, bisect_left(times, end, head) + offset)
+
+        if operation is None:
+            selected = range(lo, max(lo, hi))
+            return (selected[::-1] if reverse else selected)[:limit]
+        positions = self._operations.get(operation)
+        if positions is None:
+            return []
+        i = bisect_left(positions, lo, self._heads[operation])
+        j = max(i, bisect_left(positions, hi, i))
+        slots = range(i, j)
+        return [positions[k] for k in (slots[::-1] if reverse else slots)[:limit]]
+
+    def _select_unordered(
+        self, operation: str | None, start: Any, end: Any, lo: int, hi: int
+    ) -> list[int]:
+        """Time-range selection by sorting, for out-of-order timestamps."""
+        cached = self._by_time
+        if cached is None or cached[:2] != (self.first, self.end):
+            live = self.times[self._time_head :]
+            keyed = sorted(zip(live, itertools.count(self.first)))
+            keys, seqs = [k for k, _ in keyed], [q for _, q in keyed]
+            self._by_time = cached = (self.first, self.end, keys, seqs)
+        keys, seqs = cached[2], cached[3]
+        i = 0 if start is None else bisect_left(keys, start)
+        j = len(keys) if end is None else bisect_left(keys, end)
+        matches = sorted(seq for seq in seqs[i:j] if lo <= seq < hi)
+        if operation is None:
+            return matches
+        positions = self._operations.get(operation)
+        if positions is None:
+            return []
+        members = set(positions[self._heads[operation] :])
+        return [seq for seq in matches if seq in members]
+
+
+class CalculatorHistory:
+    """Manages calculation history for the calculator."""
+
+    def __init__(self):
+        """Initialize empty history."""
+        self._history: list[dict[str, Any]] = []
+        self._stats = HistoryStats()
+        # Built by the first query, then kept up to date as entries change
+        self._index: HistoryIndex | None = None
+        # (state, view) of the last snapshot built by _snapshot_query_view
+        self._snapshot_view: tuple[Any, tuple] | None = None
+
+    def add_entry(
+        self,
+        operation: str,
+        operands: list[float],
+        result: float,
+        timestamp: datetime | None = None,
+    ) -> None:
+        """Add a calculation entry to history.
+
+        Args:
+            operation: The operation performed (e.g., 'add', 'multiply')
+            operands: List of operands used in the calculation
+            result: The result of the calculation
+            timestamp: When the calculation was performed (defaults to now)
+        """
+        self._append_entry(self._new_entry(operation, operands, result, timestamp))
+
+    @staticmethod
+    def _new_entry(
+        operation: str,
+        operands: list[float],
+        result: Any,
+        timestamp: datetime | None,
+    ) -> HistoryEntry:
+        """Build the entry for a new calculation, copying the operands."""
+        if timestamp is None:
+            # Stamp with an int; the datetime is built if the entry is read
+            return HistoryEntry.stamped(
+                operation, operands.copy(), result, time.time_ns()
+            )
+        return HistoryEntry(
+            operation=operation,
+            operands=operands.copy(),
+            result=result,
+            timestamp=timestamp,
+        )
+
+    def _append_entry(self, entry: HistoryEntry) -> None:
+        """Store a new entry and update the aggregates and query index."""
+        self._history.append(entry)
+        self._stats.record(entry["operation"], entry["result"])
+        index = self._index
+        if index is not None:
+            index.add(entry["operation"], entry.timestamp_ns())
+
+    def add_entries(
+        self, entries: Iterable[tuple[str, list[float], float, datetime | None]]
+    ) -> int:
+        """Add many calculation entries in one call.
+
+        Args:
+            entries: ``(operation, operands, result, timestamp)`` tuples,
+                oldest first
+
+        Returns:
+            Number of entries added
+        """
+        count = 0
+        add_entry = self.add_entry
+        for operation, operands, result, timestamp in entries:
+            add_entry(operation, operands, result, timestamp)
+            count += 1
+        return count
+
+    def _format_expression(
+        self, operation: str, operands: list[float], result: float
+    ) -> str:
+        """Format the calculation as a readable expression."""
+        return format_expression(operation, operands, result)
+
+    def get_history(self, limit: int | None = None) -> list[dict[str, Any]]:
+        """Get calculation history.
+
+        Args:
+            limit: Maximum number of entries to return (newest first)
+
+        Returns:
+            List of history entries
+        """
+        if limit is None:
+            return list(reversed(self._history))
+        self._check_limit(limit)
+        return list(self.view()[:limit])
+
+    @staticmethod
+    def _check_limit(limit: int) -> None:
+        """Reject a negative ``get_history`` limit, the same in every backend."""
+        if limit < 0:
+            raise ValueError(f"limit cannot be negative, got {limit}")
+
+    def view(self, *, oldest_first: bool = False) -> EntriesView:
+        """Get a read-only view of the entries without copying them.
+
+        Args:
+            oldest_first: Order the view oldest first instead of newest first
+
+        Returns:
+            A sequence supporting ``len``, indexing and slicing (slices are
+            views too)
+        """
+        entries = self._entry_sequence()
+        count = len(entries)
+        positions = range(count) if oldest_first else range(count - 1, -1, -1)
+        return EntriesView(entries, positions)
+
+    def _entry_sequence(self) -> Sequence[dict[str, Any]]:
+        """The entries as an indexable sequence, oldest first."""
+        return self._history
+
+    def get_last_result(self) -> float | None:
+        """Get the result of the last calculation."""
+        if not self._history:
+            return None
+        return self._history[-1]["result"]
+
+    def clear_history(self) -> int:
+        """Clear all history entries.
+
+        Returns:
+            Number of entries that were cleared
+        """
+        count = len(self._history)
+        self._history.clear()
+        self._stats.clear()
+        if self._index is not None:
+            self._index.clear()
+        return count
+
+    def get_history_count(self) -> int:
+        """Get the total number of calculations in history."""
+        return len(self._history)
+
+    def _first_entry(self) -> dict[str, Any] | None:
+        """Oldest entry in history, or None."""
+        return self._history[0] if self._history else None
+
+    def _last_entry(self) -> dict[str, Any] | None:
+        """Newest entry in history, or None."""
+        return self._history[-1] if self._history else None
+
+    def _iter_entries(self) -> Iterator[dict[str, Any]]:
+        """Iterate over all entries, oldest first."""
+        return iter(self._history)
+
+    def query(  # noqa: PLR0913 - each filter is a separate keyword
+        self,
+        operation: str | None = None,
+        since: datetime | None = None,
+        until: datetime | None = None,
+        where: Callable[[Any], bool] | None = None,
+        *,
+        limit: int = 100,
+        cursor: int | None = None,
+        oldest_first: bool = False,
+    ) -> HistoryPage:
+        """Get one page of the entries matching every given filter.
+
+        Operation and time filters use the history's indexes, so a page costs
+        O(log n + limit) however large the history is; ``where`` is checked
+        entry by entry on the indexed candidates.
+
+        Args:
+            operation: Only entries of this operation, e.g. ``"divide"``
+            since: Only entries recorded at or after this time
+            until: Only entries recorded before this time
+            where: Only entries whose result satisfies this predicate
+            limit: Maximum number of entries in the page
+            cursor: ``next_cursor`` of the previous page, to continue after it
+            oldest_first: Return entries oldest first instead of newest first
+
+        Returns:
+            A ``HistoryPage`` of entries and the cursor for the next page
+        """
+        if limit < 1:
+            raise ValueError("limit must be positive")
+        index, entry_at, result_at = self._query_view()
+        start = None if since is None else self._time_key(since)
+        end = None if until is None else self._time_key(until)
+        after = cursor if oldest_first else None
+        before = None if oldest_first else cursor
+
+        matches: list[int] = []
+        while len(matches) <= limit:
+            wanted = limit + 1 - len(matches)
+            candidates = index.select(
+                operation,
+                start,
+                end,
+                after=after,
+                before=before,
+                limit=wanted,
+                reverse=not oldest_first,
+            )
+            if where is None:
+                matches.extend(candidates)
+            else:
+                matches.extend(seq for seq in candidates if where(result_at(seq)))
+            if len(candidates) < wanted:
+                break
+            if oldest_first:
+                after = candidates[-1]
+            else:
+                before = candidates[-1]
+
+        next_cursor = matches[limit - 1] if len(matches) > limit else None
+        return HistoryPage([entry_at(seq) for seq in matches[:limit]], next_cursor)
+
+    def iter_query(  # noqa: PLR0913 - same filters as query
+        self,
+        operation: str | None = None,
+        since: datetime | None = None,
+        until: datetime | None = None,
+        where: Callable[[Any], bool] | None = None,
+        *,
+        oldest_first: bool = False,
+        page_size: int = 1024,
+    ) -> Iterator[dict[str, Any]]:
+        """Iterate over every matching entry, one ``query`` page at a time.
+
+        Arguments are as for ``query``. Only one page is held at a time, so
+        large histories can be walked without copying them.
+        """
+        cursor = None
+        while True:
+            page = self.query(
+                operation,
+                since,
+                until,
+                where,
+                limit=page_size,
+                cursor=cursor,
+                oldest_first=oldest_first,
+            )
+            yield from page.entries
+            if page.next_cursor is None:
+                return
+            cursor = page.next_cursor
+
+    def aggregate(
+        self,
+        operation: str | None = None,
+        since: datetime | None = None,
+        until: datetime | None = None,
+    ) -> dict[str, dict[str, Any]]:
+        """Count, sum, min and max of results per operation over a time range.
+
+        Uses the same indexes as ``query``, so only matching entries are read.
+
+        Args:
+            operation: Only entries of this operation
+            since: Only entries recorded at or after this time
+            until: Only entries recorded before this time
+
+        Returns:
+            ``{operation: {"count", "sum", "min", "max"}}`` for each operation
+            with matching entries
+        """
+        return {
+            op: stats.as_rollup()
+            for op, stats in self._aggregate_stats(operation, since, until).items()
+        }
+
+    def _aggregate_stats(
+        self, operation: str | None, since: datetime | None, until: datetime | None
+    ) -> dict[str, OperationStats]:
+        """Per-operation aggregates of the entries in a time range."""
+        index, _, result_at = self._query_view()
+        start = None if since is None else self._time_key(since)
+        end = None if until is None else self._time_key(until)
+        aggregates: dict[str, OperationStats] = {}
+        for op in index.operations() if operation is None else [operation]:
+            selected = index.select(op, start, end)
+            if selected:
+                stats = aggregates[op] = OperationStats()
+                for seq in selected:
+                    stats.record(result_at(seq))
+        return aggregates
+
+    def _time_key(self, timestamp: datetime) -> int:
+        """Index key for a timestamp: epoch nanoseconds."""
+        return ns_from_datetime(timestamp)
+
+    def _query_view(
+        self,
+    ) -> tuple[HistoryIndex, Callable[[int], dict[str, Any]], Callable[[int], Any]]:
+        """Index plus entry and result lookups by sequence number."""
+        index = self._index
+        if index is None:
+            index = self._index = HistoryIndex(times=array("q"))
+            for entry in self._history:
+                index.add(entry["operation"], entry.timestamp_ns())
+        history, first = self._history, index.first
+
+        def entry_at(seq: int) -> dict[str, Any]:
+            return history[seq - first]
+
+        return index, entry_at, lambda seq: entry_at(seq)["result"]
+
+    def _snapshot_query_view(
+        self, state: Any
+    ) -> tuple[HistoryIndex, Callable[[int], dict[str, Any]], Callable[[int], Any]]:
+        """Index a merged snapshot, for backends that keep no live index.
+
+        The snapshot is reused while ``state`` is unchanged, so walking a
+        query page by page builds it once instead of once per page. ``state``
+        must change whenever entries are added or cleared.
+        """
+        cached = self._snapshot_view
+        if cached is None or cached[0] != state:
+            entries = list(self._iter_entries())
+            index = HistoryIndex(times=array("q"))
+            for entry in entries:
+                index.add(entry["operation"], entry.timestamp_ns())
+            view = index, entries.__getitem__, lambda seq: entries[seq]["result"]
+            self._snapshot_view = cached = (state, view)
+        return cached[1]
+
+    def get_summary(self) -> dict[str, Any]:
+        """Get a summary of the history from running aggregates.
+
+        Counts and per-operation statistics are maintained as entries are
+        added, so this does not scan the history.
+
+        Returns:
+            Dictionary with history statistics
+        """
+        if not self.get_history_count():
+            return {
+                "total_calculations": 0,
+                "operations_used": [],
+                "most_recent": None,
+                "first_calculation": None,
+            }
+
+        operations = self._current_stats().operations
+        return {
+            "total_calculations": self.get_history_count(),
+            "operations_used": list(operations),
+            "operation_counts": {op: s.count for op, s in operations.items()},
+            "operation_stats": {op: s.as_dict() for op, s in operations.items()},
+            "most_recent": self._last_entry()["expression"],
+            "first_calculation": self._first_entry()["expression"],
+        }
+
+    def _current_stats(self) -> HistoryStats:
+        """Aggregates for the current entries."""
+        return self._stats
+
+
+class NullHistory(CalculatorHistory):
+    """History that records nothing, for bulk runs that do not need it."""
+
+    def add_entry(
+        self,
+        operation: str,
+        operands: list[float],
+        result: float,
+        timestamp: datetime | None = None,
+    ) -> None:
+        """Discard the calculation."""
+
+
+# Flags stored per row in ColumnarHistory._kinds
+_A_IS_INT = 1
+_B_IS_INT = 2
+_RESULT_IS_INT = 4
+
+# Largest integer magnitude a float64 column holds exactly
+_MAX_EXACT_INT = 2**53
+
+
+def _fits_column(value: Any) -> bool:
+    """Return True if value round-trips through a float64 column."""
+    value_type = type(value)
+    if value_type is float:
+        return True
+    return value_type is int and -_MAX_EXACT_INT <= value <= _MAX_EXACT_INT
+
+
+# Column names and array typecodes of ColumnarHistory, widest first so
+# columns laid out back to back stay aligned
+COLUMN_TYPECODES = {
+    "a": "d",
+    "b": "d",
+    "results": "d",
+    "timestamps": "q",
+    "ops": "H",
+    "arity": "B",
+    "kinds": "B",
+}
+
+
+class _DecodedRows(Sequence):
+    """Rows ``0 .. count - 1`` decoded into entries on access."""
+
+    __slots__ = ("_count", "_decode")
+
+    def __init__(self, decode: Callable[[int], dict[str, Any]], count: int):
+        """Wrap a row decoder."""
+        self._decode = decode
+        self._count = count
+
+    def __len__(self) -> int:
+        """Number of rows."""
+        return self._count
+
+    def __getitem__(self, row):
+        """Decode one row; negative rows count from the end."""
+        if isinstance(row, slice):
+            return [self._decode(i) for i in range(self._count)[row]]
+        return self._decode(range(self._count)[row])
+
+
+class ColumnarHistory(CalculatorHistory):
+    """Compact history that stores calculations in parallel typed arrays.
+
+    Each calculation costs a few dozen bytes spread over ``array`` columns
+    (operation code, operands, result, timestamp) instead of a dict per
+    entry. Dicts are only built when ``get_history`` is called. Values that
+    do not fit a float64 column exactly (big integers, complex results,
+    more than two operands, timezone-aware timestamps) are kept verbatim in a
+    small side table so every entry round-trips unchanged.
+    """
+
+    def __init__(self):
+        """Initialize empty columns."""
+        super().__init__()
+        self._index = HistoryIndex(times=array("q"))
+        self._op_codes: dict[str, int] = {}
+        self._op_names: list[str] = []
+        self._reset_columns()
+
+    def _reset_columns(self) -> None:
+        """Allocate empty columns and side table."""
+        self._ops = array("H")
+        self._arity = array("B")
+        self._kinds = array("B")
+        self._a = array("d")
+        self._b = array("d")
+        self._results = array("d")
+        self._index.clear()
+        self._timestamps = self._index.times
+        self._exact: dict[int, dict[str, Any]] = {}
+
+    def _op_code(self, operation: str) -> int:
+        """Return the numeric code for an operation name, registering it."""
+        code = self._op_codes.get(operation)
+        if code is None:
+            code = len(self._op_names)
+            self._op_codes[operation] = code
+            self._op_names.append(operation)
+        return code
+
+    def add_entry(
+        self,
+        operation: str,
+        operands: list[float],
+        result: float,
+        timestamp: datetime | None = None,
+    ) -> None:
+        """Add a calculation entry to history.
+
+        Args:
+            operation: The operation performed (e.g., 'add', 'multiply')
+            operands: List of operands used in the calculation
+            result: The result of the calculation
+            timestamp: When the calculation was performed (defaults to now)
+        """
+        row = len(self._ops)
+        exact: dict[str, Any] = {}
+
+        if timestamp is None:
+            timestamp_ns = time.time_ns()
+        else:
+            timestamp_ns = ns_from_datetime(timestamp)
+            if timestamp.tzinfo is not None:
+                exact["timestamp"] = timestamp
+
+        kinds = 0
+        a = b = 0.0
+        arity = len(operands)
+        if arity <= 2 and all(_fits_column(op) for op in operands):
+            if arity >= 1:
+                a = operands[0]
+                kinds |= _A_IS_INT if type(a) is int else 0
+            if arity == 2:
+                b = operands[1]
+                kinds |= _B_IS_INT if type(b) is int else 0
+        else:
+            exact["operands"] = operands.copy()
+
+        stored_result = 0.0
+        if _fits_column(result):
+            stored_result = result
+            kinds |= _RESULT_IS_INT if type(result) is int else 0
+        else:
+            exact["result"] = result
+
+        self._ops.append(self._op_code(operation))
+        self._arity.append(min(arity, 255))
+        self._kinds.append(kinds)
+        self._a.append(a)
+        self._b.append(b)
+        self._results.append(stored_result)
+        self._index.add(operation, timestamp_ns)
+        if exact:
+            self._exact[row] = exact
+        self._stats.record(operation, result)
+
+    def _result_at(self, row: int) -> Any:
+        """Decode the result stored in a row."""
+        exact = self._exact.get(row)
+        if exact is not None and "result" in exact:
+            return exact["result"]
+        value = self._results[row]
+        return int(value) if self._kinds[row] & _RESULT_IS_INT else value
+
+    def _entry_at(self, row: int) -> dict[str, Any]:
+        """Materialize a row as a history entry dict."""
+        exact = self._exact.get(row, {})
+        operation = self._op_names[self._ops[row]]
+
+        operands = exact.get("operands")
+        if operands is None:
+            kinds = self._kinds[row]
+            arity = self._arity[row]
+            operands = []
+            if arity >= 1:
+                a = self._a[row]
+                operands.append(int(a) if kinds & _A_IS_INT else a)
+            if arity == 2:
+                b = self._b[row]
+                operands.append(int(b) if kinds & _B_IS_INT else b)
+        else:
+            operands = operands.copy()
+
+        result = self._result_at(row)
+        timestamp = exact.get("timestamp")
+        if timestamp is None:
+            # The datetime is built if the entry's timestamp is read
+            return HistoryEntry.stamped(
+                operation, operands, result, self._timestamps[row]
+            )
+        return HistoryEntry(
+            operation=operation,
+            operands=operands,
+            result=result,
+            timestamp=timestamp,
+        )
+
+    def get_history(self, limit: int | None = None) -> list[dict[str, Any]]:
+        """Get calculation history.
+
+        Args:
+            limit: Maximum number of entries to return (newest first)
+
+        Returns:
+            List of history entries
+        """
+        total = len(self._ops)
+        if limit is not None:
+            self._check_limit(limit)
+        count = total if limit is None else min(limit, total)
+        return [self._entry_at(row) for row in range(total - 1, total - 1 - count, -1)]
+
+    def get_last_result(self) -> float | None:
+        """Get the result of the last calculation."""
+        if not self._ops:
+            return None
+        return self._result_at(len(self._ops) - 1)
+
+    def clear_history(self) -> int:
+        """Clear all history entries.
+
+        Returns:
+            Number of entries that were cleared
+        """
+        count = len(self._ops)
+        self._reset_columns()
+        self._stats.clear()
+        return count
+
+    def get_history_count(self) -> int:
+        """Get the total number of calculations in history."""
+        return len(self._ops)
+
+    def _first_entry(self) -> dict[str, Any] | None:
+        """Oldest entry in history, or None."""
+        return self._entry_at(0) if self._ops else None
+
+    def _last_entry(self) -> dict[str, Any] | None:
+        """Newest entry in history, or None."""
+        return self._entry_at(len(self._ops) - 1) if self._ops else None
+
+    def _iter_entries(self) -> Iterator[dict[str, Any]]:
+        """Iterate over all entries, oldest first."""
+        return map(self._entry_at, range(len(self._ops)))
+
+    def _entry_sequence(self) -> Sequence[dict[str, Any]]:
+        """Rows decoded into entries as they are read."""
+        return _DecodedRows(self._entry_at, len(self._ops))
+
+    def _query_view(
+        self,
+    ) -> tuple[HistoryIndex, Callable[[int], dict[str, Any]], Callable[[int], Any]]:
+        """Index plus row decoders by sequence number."""
+        first = self._index.first
+        return (
+            self._index,
+            lambda seq: self._entry_at(seq - first),
+            lambda seq: self._result_at(seq - first),
+        )
+
+    def export_columns(
+        self,
+    ) -> tuple[list[str], dict[str, array], dict[int, dict[str, Any]]]:
+        """Get the raw storage, e.g. to serialize it.
+
+        Returns:
+            Operation names (indexed by the ``ops`` column), the column
+            arrays by name (see ``COLUMN_TYPECODES``) and the side table of
+            values that did not fit a column, by row. These are the live
+            objects; treat them as read-only.
+        """
+        columns = {name: getattr(self, f"_{name}") for name in COLUMN_TYPECODES}
+        return self._op_names, columns, self._exact
+
+    def load_columns(
+        self,
+        operations: list[str],
+        columns: dict[str, Any],
+        exact: dict[int, dict[str, Any]],
+    ) -> None:
+        """Replace the history with previously exported storage.
+
+        Args:
+            operations: Operation names, indexed by the ``ops`` column
+            columns: Buffer of native-order column data per column name
+            exact: Side-table values by row
+        """
+        self._stats.clear()
+        self._op_names = list(operations)
+        self._op_codes = {name: code for code, name in enumerate(self._op_names)}
+        self._reset_columns()
+        for name in COLUMN_TYPECODES:
+            if name != "timestamps":
+                getattr(self, f"_{name}").frombytes(memoryview(columns[name]))
+        self._exact = dict(exact)
+        self._rebuild_derived(memoryview(columns["timestamps"]).cast("B").cast("q"))
+
+    def _rebuild_derived(self, timestamps: Iterable[int]) -> None:
+        """Rebuild aggregates and the index from the stored rows."""
+        names = self._op_names
+        add, record, result_at = self._index.add, self._stats.record, self._result_at
+        rows = zip(self._ops, timestamps, strict=True)
+        for row, (code, timestamp_ns) in enumerate(rows):
+            operation = names[code]
+            add(operation, timestamp_ns)
+            record(operation, result_at(row))
+
+    def nbytes(self) -> int:
+        """Approximate bytes held by the column buffers."""
+        columns = (
+            self._ops,
+            self._arity,
+            self._kinds,
+            self._a,
+            self._b,
+            self._results,
+            self._timestamps,
+        )
+        return sum(len(column) * column.itemsize for column in columns)
+
+
+EVICTION_POLICIES = ("drop_oldest", "spill")
+
+
+class RingBufferHistory(CalculatorHistory):
+    """History bounded to the newest ``max_size`` entries.
+
+    Entries live in a ``collections.deque`` ring, so appending, reading the
+    last result, counting and fetching the newest ``k`` entries cost O(1) or
+    O(k) no matter how many calculations have been performed. When the ring
+    is full the oldest entry is evicted: either dropped (``"drop_oldest"``)
+    or appended as a JSON line to ``spill_path`` (``"spill"``).
+    """
+
+    def __init__(
+        self,
+        max_size: int,
+        eviction: str = "drop_oldest",
+        spill_path: str | Path | None = None,
+    ):
+        """Initialize an empty ring.
+
+        Args:
+            max_size: Maximum number of entries kept in memory
+            eviction: ``"drop_oldest"`` or ``"spill"``
+            spill_path: File that evicted entries are appended to (required
+                for ``"spill"``)
+        """
+        if not isinstance(max_size, int) or max_size < 1:
+            raise ValueError("max_size must be a positive integer")
+        if eviction not in EVICTION_POLICIES:
+            raise ValueError(
+                f"eviction must be one of {EVICTION_POLICIES}, got {eviction!r}"
+            )
+        if eviction == "spill" and spill_path is None:
+            raise ValueError("spill eviction requires a spill_path")
+
+        super().__init__()
+        self._stats = HistoryStats(windowed=True)
+        self._history: deque[dict[str, Any]] = deque(maxlen=max_size)
+        self.max_size = max_size
+        self.eviction = eviction
+        self.spill_path = None if spill_path is None else Path(spill_path)
+        self._spill_file: TextIO | None = None
+        self._evicted = 0
+
+    def add_entry(
+        self,
+        operation: str,
+        operands: list[float],
+        result: float,
+        timestamp: datetime | None = None,
+    ) -> None:
+        """Add a calculation entry, evicting the oldest one if the ring is full.
+
+        Args:
+            operation: The operation performed (e.g., 'add', 'multiply')
+            operands: List of operands used in the calculation
+            result: The result of the calculation
+            timestamp: When the calculation was performed (defaults to now)
+        """
+        if len(self._history) == self.max_size:
+            evicted = self._history.popleft()
+            self._evicted += 1
+            if self._index is not None:
+                self._index.evict_oldest(evicted["operation"])
+            self._stats.discard(evicted["operation"], evicted["result"])
+            if self.eviction == "spill":
+                self._spill(evicted)
+        super().add_entry(operation, operands, result, timestamp)
+
+    def _spill(self, entry: dict[str, Any]) -> None:
+        """Append an evicted entry to the spill file as a JSON line."""
+        if self._spill_file is None:
+            self._spill_file = self.spill_path.open("a", encoding="utf-8")
+        record = {**entry, "timestamp": entry["timestamp"].isoformat()}
+        self._spill_file.write(json.dumps(record, default=str) + "\n")
+
+    def get_history(self, limit: int | None = None) -> list[dict[str, Any]]:
+        """Get the newest entries without copying the whole ring.
+
+        Args:
+            limit: Maximum number of entries to return (newest first)
+
+        Returns:
+            List of history entries
+        """
+        if limit is not None:
+            self._check_limit(limit)
+        return list(islice(reversed(self._history), limit))
+
+    def get_evicted_count(self) -> int:
+        """Get the number of entries evicted since creation."""
+        return self._evicted
+
+    def flush(self) -> None:
+        """Flush buffered spill writes to disk."""
+        if self._spill_file is not None:
+            self._spill_file.flush()
+
+    def close(self) -> None:
+        """Flush and close the spill file."""
+        if self._spill_file is not None:
+            self._spill_file.close()
+            self._spill_file = None
+
+    def iter_spilled(self) -> Iterator[dict[str, Any]]:
+        """Iterate over spilled entries, oldest first."""
+        self.flush()
+        if self.spill_path is None or not self.spill_path.exists():
+            return
+        with self.spill_path.open(encoding="utf-8") as spill_file:
+            for line in spill_file:
+                entry = json.loads(line)
+                entry["timestamp"] = datetime.fromisoformat(entry["timestamp"])
+                yield entry
+
+
+class RollupHistory(CalculatorHistory):
+    """History that keeps recent entries in full and rolls older ones up.
+
+    Entries older than ``detail_age`` are folded into per-operation
+    aggregates (count, sum, min and max of results) for each ``bucket`` of
+    time, aligned to the Unix epoch, and then dropped. Memory therefore grows
+    with the time horizon rather than with the number of calculations.
+    Compaction runs as entries are added (or on ``compact()``) and works from
+    the oldest entry forward, so an entry recorded out of time order waits
+    until the entries before it are folded.
+
+    ``get_summary`` and ``aggregate`` combine the rollups with the detailed
+    entries; a rolled-up entry counts as recorded at the start of its
+    bucket. ``query`` and ``get_history`` return detailed entries only.
+    """
+
+    def __init__(self, detail_age: timedelta, bucket: timedelta = timedelta(minutes=1)):
+        """Initialize an empty history.
+
+        Args:
+            detail_age: How long entries are kept in full detail
+            bucket: Width of the time buckets entries are rolled up into
+        """
+        if detail_age < timedelta(0):
+            raise ValueError("detail_age must not be negative")
+        if bucket <= timedelta(0):
+            raise ValueError("bucket must be positive")
+        super().__init__()
+        self._history: deque[dict[str, Any]] = deque()
+        self.detail_age = detail_age
+        self.bucket = bucket
+        self._detail_ns = detail_age // timedelta(microseconds=1) * 1000
+        self._bucket_ns = bucket // timedelta(microseconds=1) * 1000
+        # Per operation: aggregates by bucket number, and the sorted numbers
+        self._rollups: dict[str, dict[int, OperationStats]] = {}
+        self._bucket_keys: dict[str, list[int]] = {}
+        self._rolled_up = 0
+        # The next add_entry compacts once the clock reaches this
+        self._compact_at_ns = 0
+
+    def add_entry(
+        self,
+        operation: str,
+        operands: list[float],
+        result: float,
+        timestamp: datetime | None = None,
+    ) -> None:
+        """Add a calculation entry, rolling up entries that have aged out.
+
+        Args:
+            operation: The operation performed (e.g., 'add', 'multiply')
+            operands: List of operands used in the calculation
+            result: The result of the calculation
+            timestamp: When the calculation was performed (defaults to now)
+        """
+        super().add_entry(operation, operands, result, timestamp)
+        now_ns = time.time_ns()
+        if now_ns >= self._compact_at_ns:
+            self._compact(now_ns - self._detail_ns)
+
+    def compact(self, now: datetime | None = None) -> int:
+        """Roll up every entry older than ``detail_age``.
+
+        Args:
+            now: Time the age is measured from (defaults to now)
+
+        Returns:
+            Number of entries rolled up
+        """
+        now_ns = time.time_ns() if now is None else ns_from_datetime(now)
+        return self._compact(now_ns - self._detail_ns)
+
+    def _compact(self, cutoff_ns: int) -> int:
+        """Fold entries recorded before ``cutoff_ns`` off the front."""
+        history, index = self._history, self._index
+        folded = 0
+        while history:
+            timestamp_ns = history[0].timestamp_ns()
+            if timestamp_ns >= cutoff_ns:
+                self._compact_at_ns = timestamp_ns + self._detail_ns
+                break
+            entry = history.popleft()
+            operation = entry["operation"]
+            self._fold(operation, timestamp_ns // self._bucket_ns, entry["result"])
+            if index is not None:
+                index.evict_oldest(operation)
+            folded += 1
+        else:
+            self._compact_at_ns = 0
+        # Running stats keep every entry, rolled up or not
+        self._rolled_up += folded
+        return folded
+
+    def _fold(self, operation: str, key: int, result: Any) -> None:
+        """Add one result to the aggregates of its operation and bucket."""
+        buckets = self._rollups.get(operation)
+        if buckets is None:
+            buckets = self._rollups[operation] = {}
+            self._bucket_keys[operation] = []
+        stats = buckets.get(key)
+        if stats is None:
+            stats = buckets[key] = OperationStats()
+            keys = self._bucket_keys[operation]
+            if keys and key < keys[-1]:
+                insort(keys, key)
+            else:
+                keys.append(key)
+        stats.record(result)
+
+    def get_rolled_up_count(self) -> int:
+        """Get the number of entries folded into rollups."""
+        return self._rolled_up
+
+    def get_rollups(
+        self,
+        operation: str | None = None,
+        since: datetime | None = None,
+        until: datetime | None = None,
+    ) -> list[dict[str, Any]]:
+        """Get the rolled-up buckets whose start falls in a time range.
+
+        Args:
+            operation: Only buckets of this operation
+            since: Only buckets starting at or after this time
+            until: Only buckets starting before this time
+
+        Returns:
+            Dicts with ``operation``, ``bucket_start`` and the bucket's
+            ``count``, ``sum``, ``min`` and ``max``, oldest bucket first
+        """
+        rows = [
+            {
+                "operation": op,
+                "bucket_start": datetime_from_ns(key * self._bucket_ns),
+                **stats.as_rollup(),
+            }
+            for op, key, stats in self._select_buckets(operation, since, until)
+        ]
+        rows.sort(key=itemgetter("bucket_start"))
+        return rows
+
+    def _select_buckets(
+        self, operation: str | None, since: datetime | None, until: datetime | None
+    ) -> Iterator[tuple[str, int, OperationStats]]:
+        """``(operation, bucket number, aggregates)`` for buckets in range."""
+        bucket_ns = self._bucket_ns
+        # Bucket k starts at k * bucket_ns; keep since <= start < until
+        low = None if since is None else -(-self._time_key(since) // bucket_ns)
+        high = None if until is None else -(-self._time_key(until) // bucket_ns)
+        for op in self._rollups if operation is None else [operation]:
+            buckets = self._rollups.get(op)
+            if buckets is None:
+                continue
+            keys = self._bucket_keys[op]
+            i = 0 if low is None else bisect_left(keys, low)
+            j = len(keys) if high is None else bisect_left(keys, high)
+            for key in keys[i:j]:
+                yield op, key, buckets[key]
+
+    def _aggregate_stats(
+        self, operation: str | None, since: datetime | None, until: datetime | None
+    ) -> dict[str, OperationStats]:
+        """Aggregates of the detailed entries plus the rollups in range."""
+        aggregates = super()._aggregate_stats(operation, since, until)
+        for op, _, stats in self._select_buckets(operation, since, until):
+            combined = aggregates.get(op)
+            if combined is None:
+                combined = aggregates[op] = OperationStats()
+            combined.merge(stats)
+        return aggregates
+
+    def get_summary(self) -> dict[str, Any]:
+        """Get a summary of all calculations, rolled up or in detail.
+
+        Returns:
+            Dictionary with history statistics, plus the number of
+            ``rolled_up_calculations``
+        """
+        if not self._rolled_up:
+            return {**super().get_summary(), "rolled_up_calculations": 0}
+        operations = self._current_stats().operations
+        first, last = self._first_entry(), self._last_entry()
+        return {
+            "total_calculations": len(self._history) + self._rolled_up,
+            "operations_used": list(operations),
+            "operation_counts": {op: s.count for op, s in operations.items()},
+            "operation_stats": {op: s.as_dict() for op, s in operations.items()},
+            "most_recent": None if last is None else last["expression"],
+            "first_calculation": None if first is None else first["expression"],
+            "rolled_up_calculations": self._rolled_up,
+        }
+
+    def clear_history(self) -> int:
+        """Clear detailed entries and rollups.
+
+        Returns:
+            Number of calculations forgotten, rolled up or not
+        """
+        count = super().clear_history() + self._rolled_up
+        self._rollups.clear()
+        self._bucket_keys.clear()
+        self._rolled_up = 0
+        self._compact_at_ns = 0
+        return count
+
+
+class _ThreadBuffer:
+    """Entries and aggregates appended by a single thread."""
+
+    __slots__ = ("entries", "stats")
+
+    def __init__(self):
+        """Initialize an empty buffer."""
+        self.entries: list[tuple[int, HistoryEntry]] = []
+        self.stats = HistoryStats()
+
+
+class ConcurrentHistory(CalculatorHistory):
+    """History that many threads can record into without a shared lock.
+
+    Every thread appends to its own buffer, tagging each entry with a number
+    from a global sequence so the merged history keeps a stable order.
+    Reads merge the per-thread buffers by sequence number. The only lock is
+    taken when a thread records its first entry (or its first one after a
+    ``clear_history``), so the hot path never serializes on a single list.
+    """
+
+    def __init__(self):
+        """Initialize with no thread buffers."""
+        super().__init__()
+        self._local = threading.local()
+        self._registry_lock = threading.Lock()
+        self._buffers: list[_ThreadBuffer] = []
+        self._generation = 0
+        self._sequence = itertools.count()
+
+    def _thread_buffer(self) -> _ThreadBuffer:
+        """Return the calling thread's buffer, registering a new one if needed."""
+        local = self._local
+        if getattr(local, "generation", None) != self._generation:
+            buffer = _ThreadBuffer()
+            with self._registry_lock:
+                self._buffers.append(buffer)
+                local.generation = self._generation
+            local.buffer = buffer
+        return local.buffer
+
+    def add_entry(
+        self,
+        operation: str,
+        operands: list[float],
+        result: float,
+        timestamp: datetime | None = None,
+    ) -> None:
+        """Add a calculation entry to the calling thread's buffer.
+
+        Args:
+            operation: The operation performed (e.g., 'add', 'multiply')
+            operands: List of operands used in the calculation
+            result: The result of the calculation
+            timestamp: When the calculation was performed (defaults to now)
+        """
+        entry = self._new_entry(operation, operands, result, timestamp)
+        buffer = self._thread_buffer()
+        buffer.entries.append((next(self._sequence), entry))
+        buffer.stats.record(operation, result)
+
+    def _snapshot(self) -> list[list[tuple[int, HistoryEntry]]]:
+        """Copy every thread's entries (each copy is atomic under the GIL)."""
+        return [buffer.entries.copy() for buffer in self._buffers]
+
+    def get_sequenced_history(
+        self, limit: int | None = None
+    ) -> list[tuple[int, dict[str, Any]]]:
+        """Get ``(sequence, entry)`` pairs, newest first.
+
+        Args:
+            limit: Maximum number of entries to return
+
+        Returns:
+            List of pairs ordered by descending sequence number
+        """
+        buffers = self._buffers
+        if limit is not None:
+            self._check_limit(limit)
+            tails = [buffer.entries[-limit:] if limit > 0 else [] for buffer in buffers]
+            return heapq.nlargest(limit, itertools.chain(*tails), key=itemgetter(0))
+        merged = list(heapq.merge(*self._snapshot(), key=itemgetter(0)))
+        merged.reverse()
+        return merged
+
+    def get_history(self, limit: int | None = None) -> list[dict[str, Any]]:
+        """Get calculation history merged across threads.
+
+        Args:
+            limit: Maximum number of entries to return (newest first)
+
+        Returns:
+            List of history entries
+        """
+        return [entry for _, entry in self.get_sequenced_history(limit)]
+
+    def get_last_result(self) -> float | None:
+        """Get the result of the last calculation from any thread."""
+        last = self._last_entry()
+        return None if last is None else last["result"]
+
+    def clear_history(self) -> int:
+        """Clear all history entries.
+
+        Returns:
+            Number of entries that were cleared
+        """
+        with self._registry_lock:
+            count = sum(len(buffer.entries) for buffer in self._buffers)
+            self._buffers = []
+            self._generation += 1
+        return count
+
+    def get_history_count(self) -> int:
+        """Get the total number of calculations in history."""
+        return sum(len(buffer.entries) for buffer in self._buffers)
+
+    def _edge_entry(self, index: int, pick: Callable) -> dict[str, Any] | None:
+        """First or last entry across buffers, chosen by sequence number."""
+        edges = [buffer.entries[index] for buffer in self._buffers if buffer.entries]
+        return pick(edges, key=itemgetter(0))[1] if edges else None
+
+    def _first_entry(self) -> dict[str, Any] | None:
+        """Oldest entry in history, or None."""
+        return self._edge_entry(0, min)
+
+    def _last_entry(self) -> dict[str, Any] | None:
+        """Newest entry in history, or None."""
+        return self._edge_entry(-1, max)
+
+    def _iter_entries(self) -> Iterator[dict[str, Any]]:
+        """Iterate over all entries, oldest first."""
+        merged = heapq.merge(*self._snapshot(), key=itemgetter(0))
+        return (entry for _, entry in merged)
+
+    def _entry_sequence(self) -> Sequence[dict[str, Any]]:
+        """A merged list of the entries.
+
+        Per-thread buffers cannot be indexed in merged order in place, so
+        views of this history hold a list of references to the entries
+        (the entries themselves are not copied), and creating one costs
+        O(n); ``get_history(limit)`` reads only the newest entries.
+        """
+        return list(self._iter_entries())
+
+    def _query_view(
+        self,
+    ) -> tuple[HistoryIndex, Callable[[int], dict[str, Any]], Callable[[int], Any]]:
+        """Index a merged snapshot; per-thread buffers are not indexed.
+
+        Sequence numbers are positions in the merged history, which stay
+        stable as threads append, so cursors keep working until a clear.
+        The snapshot is rebuilt only after entries were added or cleared.
+        """
+        return self._snapshot_query_view((self._generation, self.get_history_count()))
+
+    def _current_stats(self) -> HistoryStats:
+        """Aggregates merged from every thread's buffer."""
+        merged = HistoryStats()
+        for buffer in self._buffers:
+            merged.merge(buffer.stats)
+        return merged
@@ -0,0 +1,298 @@
+"""
+Instrumentation for calculator operations - logging sinks and operation stats
+"""
+
+import itertools
+import logging
+import math
+import sys
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import deque
+from collections.abc import Callable
+from typing import Any
+
+
+class LogSink(ABC):
+    """Destination for operation log messages, optionally sampled 1-in-N.
+
+    Operations ask ``sample()`` once per call before formatting anything, so
+    calls that are sampled out pay only for a counter increment. Subclasses
+    implement ``emit``.
+    """
+
+    def __init__(self, every: int = 1):
+        """Initialize the sampler.
+
+        Args:
+            every: Log one call out of every ``every`` calls
+        """
+        if every < 1:
+            raise ValueError("every must be a positive integer")
+        self.every = every
+        self._calls = itertools.count()
+
+    def sample(self) -> bool:
+        """Return True if the current call should be logged."""
+        return self.every == 1 or next(self._calls) % self.every == 0
+
+    @abstractmethod
+    def emit(self, message: str) -> None:
+        """Write one log message."""
+
+
+class StdoutSink(LogSink):
+    """Print messages to standard output (the calculator's default)."""
+
+    def emit(self, message: str) -> None:
+        """Print the message."""
+        print(message, file=sys.stdout)
+
+
+class LoggingSink(LogSink):
+    """Route messages to the standard ``logging`` module."""
+
+    def __init__(
+        self,
+        logger: logging.Logger | None = None,
+        level: int = logging.INFO,
+        every: int = 1,
+    ):
+        """Initialize the sink.
+
+        Args:
+            logger: Logger to use (defaults to the ``src.calculator`` logger)
+            level: Level messages are logged at
+            every: Log one call out of every ``every`` calls
+        """
+        super().__init__(every)
+        self.logger = logger or logging.getLogger("src.calculator")
+        self.level = level
+
+    def emit(self, message: str) -> None:
+        """Log the message."""
+        self.logger.log(self.level, message)
+
+
+class BufferSink(LogSink):
+    """Keep messages in memory, e.g. for tests or later inspection."""
+
+    def __init__(self, max_size: int | None = None, every: int = 1):
+        """Initialize an empty buffer.
+
+        Args:
+            max_size: Keep only the newest ``max_size`` messages (None = all)
+            every: Log one call out of every ``every`` calls
+        """
+        super().__init__(every)
+        self.messages: deque[str] = deque(maxlen=max_size)
+
+    def emit(self, message: str) -> None:
+        """Append the message to the buffer."""
+        self.messages.append(message)
+
+
+# Latency histogram: values below 2 * _SUB_BUCKETS ns get exact buckets, larger
+# values keep their top 5 significant bits (16 sub-buckets per power of two,
+# about 6% relative precision), like an HDR histogram.
+_SUB_BUCKETS = 16
+_SUB_BITS = 5
+
+
+def bucket_index(value: int) -> int:
+    """Map a latency in nanoseconds to its histogram bucket."""
+    if value < 2 * _SUB_BUCKETS:
+        return max(value, 0)
+    shift = value.bit_length() - _SUB_BITS
+    return shift * _SUB_BUCKETS + (value >> shift)
+
+
+def bucket_upper_bound(index: int) -> int:
+    """Largest latency in nanoseconds that falls into a bucket."""
+    if index < 2 * _SUB_BUCKETS:
+        return index
+    shift = index // _SUB_BUCKETS - 1
+    top = index % _SUB_BUCKETS + _SUB_BUCKETS
+    return ((top + 1) << shift) - 1
+
+
+class LatencyHistogram:
+    """Log-linear latency histogram with constant-time recording."""
+
+    __slots__ = ("buckets", "count", "maximum", "minimum", "total")
+
+    def __init__(self):
+        """Initialize an empty histogram."""
+        self.buckets: dict[int, int] = {}
+        self.count = 0
+        self.total = 0
+        self.minimum: int | None = None
+        self.maximum: int | None = None
+
+    def record(self, value: int) -> None:
+        """Add one latency sample in nanoseconds."""
+        index = bucket_index(value)
+        self.buckets[index] = self.buckets.get(index, 0) + 1
+        self.count += 1
+        self.total += value
+        if self.minimum is None or value < self.minimum:
+            self.minimum = value
+        if self.maximum is None or value > self.maximum:
+            self.maximum = value
+
+    def percentile(self, fraction: float) -> int | None:
+        """Upper bound of the bucket holding the given fraction of samples."""
+        if not self.count:
+            return None
+        target = max(1, math.ceil(fraction * self.count))
+        seen = 0
+        for index in sorted(self.buckets):
+            seen += self.buckets[index]
+            if seen >= target:
+                return min(bucket_upper_bound(index), self.maximum)
+        return self.maximum
+
+    def summary(self) -> dict[str, Any]:
+        """Count, min/max/mean and p50/p90/p99 in nanoseconds."""
+        return {
+            "count": self.count,
+            "min": self.minimum,
+            "max": self.maximum,
+            "mean": self.total / self.count if self.count else None,
+            "p50": self.percentile(0.50),
+            "p90": self.percentile(0.90),
+            "p99": self.percentile(0.99),
+        }
+
+
+class _OperationCounters:
+    """Calls, errors by type and latencies for one operation."""
+
+    __slots__ = ("calls", "errors", "latency")
+
+    def __init__(self):
+        """Initialize zeroed counters."""
+        self.calls = 0
+        self.errors: dict[str, int] = {}
+        self.latency = LatencyHistogram()
+
+
+class OperationStatsCollector:
+    """Per-operation call/error counters and latency histograms.
+
+    Uses ``sys.monitoring`` (PEP 669) to observe entry and exit of the
+    attached functions, so the functions themselves are not wrapped or
+    modified. While detached no monitoring events are enabled and the
+    operations run exactly as uninstrumented code.
+    """
+
+    def __init__(self):
+        """Initialize with nothing attached."""
+        self._counters: dict[str, _OperationCounters] = {}
+        self._names: dict[Any, str] = {}
+        self._local = threading.local()
+        self._tool_id: int | None = None
+
+    @staticmethod
+    def _claim_tool_id() -> int:
+        """Reserve a free ``sys.monitoring`` tool id.
+
+        Only ids 3 and 4 are tried: the others are reserved for debuggers,
+        coverage tools, profilers (cProfile) and optimizers.
+        """
+        monitoring = sys.monitoring
+        for tool_id in (3, 4):
+            if monitoring.get_tool(tool_id) is None:
+                monitoring.use_tool_id(tool_id, "calculator-operation-stats")
+                return tool_id
+        raise RuntimeError("No free sys.monitoring tool id for operation stats")
+
+    def attach(self, functions: dict[str, Callable[..., Any]]) -> None:
+        """Start collecting statistics for the named functions."""
+        if self._tool_id is not None:
+            raise RuntimeError("Operation stats are already attached")
+        monitoring = sys.monitoring
+        events = monitoring.events
+        tool_id = self._claim_tool_id()
+        self._tool_id = tool_id
+        self._names = {func.__code__: name for name, func in functions.items()}
+        for name in functions:
+            self._counters.setdefault(name, _OperationCounters())
+
+        monitoring.register_callback(tool_id, events.PY_START, self._on_start)
+        monitoring.register_callback(tool_id, events.PY_RETURN, self._on_return)
+        monitoring.register_callback(tool_id, events.PY_UNWIND, self._on_unwind)
+        for code in self._names:
+            monitoring.set_local_events(
+                tool_id, code, events.PY_START | events.PY_RETURN
+            )
+        # Unwinding cannot be enabled per function; filtered in the callback
+        monitoring.set_events(tool_id, events.PY_UNWIND)
+
+    def detach(self) -> None:
+        """Stop collecting; counters are kept until ``reset``."""
+        tool_id = self._tool_id
+        if tool_id is None:
+            return
+        monitoring = sys.monitoring
+        events = monitoring.events
+        monitoring.set_events(tool_id, events.NO_EVENTS)
+        for code in self._names:
+            monitoring.set_local_events(tool_id, code, events.NO_EVENTS)
+        for event in (events.PY_START, events.PY_RETURN, events.PY_UNWIND):
+            monitoring.register_callback(tool_id, event, None)
+        monitoring.free_tool_id(tool_id)
+        self._tool_id = None
+
+    def _stack(self) -> list[int]:
+        """Start times of the calling thread's in-flight operations."""
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def _on_start(self, _code: Any, _offset: int) -> None:
+        """Remember when an operation started."""
+        self._stack().append(time.perf_counter_ns())
+
+    def _finish(self, code: Any) -> _OperationCounters | None:
+        """Record the latency of the operation that just exited."""
+        stack = self._stack()
+        if not stack:
+            # The call started before the collector was attached
+            return None
+        elapsed = time.perf_counter_ns() - stack.pop()
+        counters = self._counters[self._names[code]]
+        counters.calls += 1
+        counters.latency.record(elapsed)
+        return counters
+
+    def _on_return(self, code: Any, _offset: int, _retval: Any) -> None:
+        """Record a successful call."""
+        self._finish(code)
+
+    def _on_unwind(self, code: Any, _offset: int, exception: BaseException) -> None:
+        """Record a call that raised."""
+        if code in self._names:
+            counters = self._finish(code)
+            if counters is not None:
+                name = type(exception).__name__
+                counters.errors[name] = counters.errors.get(name, 0) + 1
+
+    def snapshot(self) -> dict[str, dict[str, Any]]:
+        """Current statistics for every operation that has been called."""
+        return {
+            name: {
+                "calls": counters.calls,
+                "errors": dict(counters.errors),
+                "latency_ns": counters.latency.summary(),
+            }
+            for name, counters in self._counters.items()
+            if counters.calls
+        }
+
+    def reset(self) -> None:
+        """Zero every counter and histogram."""
+        for name in self._counters:
+            self._counters[name] = _OperationCounters()
@@ -0,0 +1,177 @@
+"""
+Process-pool execution of CPU-heavy calculator batches
+"""
+
+import itertools
+import math
+import multiprocessing
+import os
+from collections.abc import Iterable, Sequence
+from concurrent.futures import Executor, ProcessPoolExecutor
+from decimal import Context
+from typing import Any
+
+from src.calculator import (
+    OPERATIONS,
+    Calculator,
+    get_default_session,
+    get_history_backend,
+    get_power_limits,
+    set_power_limits,
+)
+
+ERROR_MODES = ("raise", "return")
+
+# Chunks per worker when no chunk size is given; several per worker keeps
+# the pool busy when some chunks (big powers) are much slower than others
+_CHUNKS_PER_WORKER = 4
+
+
+# What a worker needs to compute like the parent's module-level functions:
+# precision mode, decimal context and integer power limits
+_Config = tuple[str, Context, tuple[int | None, int | None]]
+
+
+def _parent_config() -> _Config:
+    """Settings of the module-level functions, to apply in the workers."""
+    session = get_default_session()
+    return session.precision, session.decimal_context, get_power_limits()
+
+
+def _run_chunk(
+    requests: list[Sequence[Any]], config: _Config
+) -> tuple[list[Any], list[tuple]]:
+    """Evaluate a chunk of requests inside a worker process.
+
+    Each chunk runs in its own session (no logging) configured like the
+    parent's module-level functions. The power limits are restored
+    afterwards, leaving the worker's module-level state untouched.
+
+    Returns:
+        The results (exceptions in place of failed items) and the history
+        entries the calls produced, as compact tuples
+    """
+    precision, decimal_context, power_limits = config
+    session = Calculator(precision=precision)
+    session.decimal_context = decimal_context
+    previous_limits = set_power_limits(*power_limits)
+    results: list[Any] = []
+    try:
+        for request in requests:
+            try:
+                name, *args = request
+                if name not in OPERATIONS:
+                    raise ValueError(f"Unknown operation {name!r}")
+                results.append(getattr(session, name)(*args))
+            except (TypeError, ValueError, OverflowError, ZeroDivisionError) as error:
+                results.append(error)
+    finally:
+        set_power_limits(*previous_limits)
+
+    entries = [
+        (entry["operation"], entry["operands"], entry["result"], entry["timestamp"])
+        for entry in session.history.view(oldest_first=True)
+    ]
+    return results, entries
+
+
+class ParallelBatchExecutor:
+    """Runs operation requests such as ``("power", a, b)`` across processes.
+
+    Requests are split into chunks and evaluated by the scalar operations in
+    a ``ProcessPoolExecutor``, so per-item errors are exactly those the
+    scalar functions raise. Each chunk carries the precision mode, decimal
+    context and power limits the module-level functions have at ``run()``,
+    and returns its history entries with its results; the parent records
+    them all with one bulk append.
+    """
+
+    def __init__(
+        self,
+        max_workers: int | None = None,
+        chunk_size: int | None = None,
+        start_method: str | None = None,
+    ):
+        """Create the process pool.
+
+        Args:
+            max_workers: Worker processes (defaults to the CPU count)
+            chunk_size: Requests per task (defaults to an even split into a
+                few chunks per worker)
+            start_method: ``multiprocessing`` start method, e.g.
+                ``"forkserver"`` when the parent process runs threads
+        """
+        if chunk_size is not None and chunk_size < 1:
+            raise ValueError("chunk_size must be positive")
+        self.chunk_size = chunk_size
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self._pool: Executor = ProcessPoolExecutor(
+            max_workers=self.max_workers,
+            mp_context=multiprocessing.get_context(start_method),
+        )
+
+    def _chunks(self, requests: list[Sequence[Any]]) -> list[list[Sequence[Any]]]:
+        """Split requests into ordered chunks."""
+        size = self.chunk_size or max(
+            1, math.ceil(len(requests) / (self.max_workers * _CHUNKS_PER_WORKER))
+        )
+        return [requests[i : i + size] for i in range(0, len(requests), size)]
+
+    def run(
+        self, requests: Iterable[Sequence[Any]], errors: str = "raise"
+    ) -> list[Any]:
+        """Evaluate requests in parallel, returning results in request order.
+
+        Args:
+            requests: ``(operation, *operands)`` tuples
+            errors: ``"raise"`` to raise the first failing item's exception
+                (after recording the successful ones), or ``"return"`` to
+                put exception objects in place of failed results
+
+        Returns:
+            One result per request
+        """
+        if errors not in ERROR_MODES:
+            raise ValueError(f"errors must be one of {ERROR_MODES}, got {errors!r}")
+        requests = list(requests)
+        results: list[Any] = []
+        entries: list[tuple] = []
+        for chunk_results, chunk_entries in self._pool.map(
+            _run_chunk, self._chunks(requests), itertools.repeat(_parent_config())
+        ):
+            results.extend(chunk_results)
+            entries.extend(chunk_entries)
+
+        get_history_backend().add_entries(entries)
+        if errors == "raise":
+            for result in results:
+                if isinstance(result, Exception):
+                    raise result
+        return results
+
+    def shutdown(self) -> None:
+        """Stop the worker processes."""
+        self._pool.shutdown()
+
+    def __enter__(self) -> "ParallelBatchExecutor":
+        """Use the executor as a context manager."""
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        """Shut the pool down on exit."""
+        self.shutdown()
+
+
+def run_parallel(
+    requests: Iterable[Sequence[Any]],
+    max_workers: int | None = None,
+    chunk_size: int | None = None,
+    errors: str = "raise",
+) -> list[Any]:
+    """Evaluate requests with a temporary process pool.
+
+    See ``ParallelBatchExecutor.run``; reuse a ``ParallelBatchExecutor`` to
+    avoid starting processes for every batch.
+    """
+    with ParallelBatchExecutor(max_workers, chunk_size) as executor:
+        return executor.run(requests, errors)
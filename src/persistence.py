@@ -0,0 +1,562 @@
+"""
+Durable history storage for the calculator: an append-only log that is
+replayed on startup, and compact columnar snapshots for export and import
+"""
+
+import mmap
+import os
+import queue
+import struct
+import sys
+import threading
+from array import array
+from collections.abc import Callable
+from datetime import datetime
+from decimal import Decimal
+from fractions import Fraction
+from pathlib import Path
+from typing import Any
+
+from src.history import (
+    COLUMN_TYPECODES,
+    CalculatorHistory,
+    ColumnarHistory,
+    HistoryEntry,
+    HistoryIndex,
+    HistoryStats,
+    datetime_from_ns,
+    ns_from_datetime,
+)
+
+LOG_MAGIC = b"CALCLOG1"
+
+# Record layout: u32 payload length, then the payload
+_LENGTH = struct.Struct("<I")
+# Payload header: i64 timestamp (epoch ns), u8 operation name length,
+# u8 operand count; followed by the name, the operands and the result
+_RECORD_HEADER = struct.Struct("<qBB")
+_INT64 = struct.Struct("<q")
+_FLOAT64 = struct.Struct("<d")
+_COMPLEX = struct.Struct("<dd")
+_INT64_MIN = -(2**63)
+_INT64_MAX = 2**63 - 1
+
+_STOP = object()
+
+# Values stored as length-prefixed text, by tag
+_TEXT_TAGS: dict[bytes, Callable[[str], Any]] = {
+    b"s": str,
+    b"r": Fraction,
+    b"m": Decimal,
+}
+
+
+def encode_value(value: Any) -> bytes:
+    """Encode an operand or result as a tagged binary value."""
+    value_type = type(value)
+    if value_type is float:
+        return b"d" + _FLOAT64.pack(value)
+    if value_type is int or value_type is bool:
+        if _INT64_MIN <= value <= _INT64_MAX:
+            return b"q" + _INT64.pack(value)
+        size = (value.bit_length() + 8) // 8
+        raw = value.to_bytes(size, "little", signed=True)
+        return b"n" + _LENGTH.pack(size) + raw
+    if value_type is complex:
+        return b"c" + _COMPLEX.pack(value.real, value.imag)
+    if value_type is Fraction or value_type is Decimal:
+        # Exact text forms: "3/4" and "0.1"
+        text = str(value).encode()
+        tag = b"r" if value_type is Fraction else b"m"
+        return tag + _LENGTH.pack(len(text)) + text
+    text = repr(value).encode()
+    return b"s" + _LENGTH.pack(len(text)) + text
+
+
+def decode_value(buffer: Any, offset: int) -> tuple[Any, int]:
+    """Decode a tagged value, returning it and the offset after it."""
+    tag = buffer[offset : offset + 1]
+    offset += 1
+    if tag == b"d":
+        return _FLOAT64.unpack_from(buffer, offset)[0], offset + _FLOAT64.size
+    if tag == b"q":
+        return _INT64.unpack_from(buffer, offset)[0], offset + _INT64.size
+    if tag == b"c":
+        real, imag = _COMPLEX.unpack_from(buffer, offset)
+        return complex(real, imag), offset + _COMPLEX.size
+    (size,) = _LENGTH.unpack_from(buffer, offset)
+    start = offset + _LENGTH.size
+    raw = bytes(buffer[start : start + size])
+    if tag == b"n":
+        return int.from_bytes(raw, "little", signed=True), start + size
+    parse = _TEXT_TAGS.get(tag)
+    if parse is None:
+        raise ValueError(f"Unknown value tag {tag!r} in history log")
+    return parse(raw.decode()), start + size
+
+
+def encode_record(entry: dict[str, Any]) -> bytes:
+    """Encode a history entry as a length-prefixed log record."""
+    operation = entry["operation"].encode()
+    operands = entry["operands"]
+    timestamp_ns = (
+        entry.timestamp_ns()
+        if isinstance(entry, HistoryEntry)
+        else ns_from_datetime(entry["timestamp"])
+    )
+    payload = b"".join(
+        [
+            _RECORD_HEADER.pack(timestamp_ns, len(operation), len(operands)),
+            operation,
+            *map(encode_value, operands),
+            encode_value(entry["result"]),
+        ]
+    )
+    return _LENGTH.pack(len(payload)) + payload
+
+
+def iter_records(buffer: Any, offset: int = 0):
+    """Yield ``(operation, operands, result, timestamp, end_offset)`` tuples.
+
+    Iteration stops at the first incomplete record, so a log whose last write
+    was interrupted can still be replayed up to that point.
+    """
+    size = len(buffer)
+    while offset + _LENGTH.size <= size:
+        (length,) = _LENGTH.unpack_from(buffer, offset)
+        start = offset + _LENGTH.size
+        end = start + length
+        if end > size:
+            return
+        timestamp_ns, name_length, arity = _RECORD_HEADER.unpack_from(buffer, start)
+        cursor = start + _RECORD_HEADER.size
+        operation = bytes(buffer[cursor : cursor + name_length]).decode()
+        cursor += name_length
+        operands = []
+        for _ in range(arity):
+            value, cursor = decode_value(buffer, cursor)
+            operands.append(value)
+        result, _ = decode_value(buffer, cursor)
+        yield operation, operands, result, datetime_from_ns(timestamp_ns), end
+        offset = end
+
+
+class PersistentHistory(CalculatorHistory):
+    """History that survives restarts via an append-only binary log.
+
+    Recording an entry only appends it in memory and pushes it onto a
+    bounded queue; a background thread drains the queue in batches and
+    writes each batch with a single ``write`` call (and optionally one
+    ``fsync``). When the queue is full, recording blocks until the writer
+    catches up. On construction an existing log is memory-mapped and
+    replayed into memory; a torn record at the end is truncated away.
+
+    Call ``close()`` (or use the history as a context manager) to make sure
+    every pending entry reaches the log.
+    """
+
+    def __init__(
+        self,
+        path: str | Path,
+        batch_size: int = 256,
+        max_pending: int = 10_000,
+        fsync: bool = False,
+    ):
+        """Open (and replay) the log and start the writer thread.
+
+        Args:
+            path: Log file; created if it does not exist
+            batch_size: Maximum entries written per batch
+            max_pending: Queue bound; recording blocks beyond this many
+                unwritten entries
+            fsync: Whether to fsync after every batch
+        """
+        if batch_size < 1 or max_pending < 1:
+            raise ValueError("batch_size and max_pending must be positive")
+        super().__init__()
+        self.path = Path(path)
+        self.batch_size = batch_size
+        self.fsync = fsync
+        self._error: BaseException | None = None
+        self._replay()
+        self._file = self.path.open("ab")
+        self._queue: queue.Queue = queue.Queue(maxsize=max_pending)
+        self._writer = threading.Thread(
+            target=self._write_loop, name="history-log-writer", daemon=True
+        )
+        self._writer.start()
+
+    def _replay(self) -> None:
+        """Load entries from an existing log, truncating a torn tail."""
+        if not self.path.exists() or self.path.stat().st_size == 0:
+            self.path.write_bytes(LOG_MAGIC)
+            return
+
+        valid_end = len(LOG_MAGIC)
+        with (
+            self.path.open("r+b") as log,
+            mmap.mmap(log.fileno(), 0, access=mmap.ACCESS_READ) as view,
+        ):
+            if view[: len(LOG_MAGIC)] != LOG_MAGIC:
+                raise ValueError(f"{self.path} is not a calculator history log")
+            for operation, operands, result, timestamp, end in iter_records(
+                view, valid_end
+            ):
+                super().add_entry(operation, operands, result, timestamp)
+                valid_end = end
+            torn = valid_end < len(view)
+        if torn:
+            with self.path.open("r+b") as log:
+                log.truncate(valid_end)
+
+    def _write_loop(self) -> None:
+        """Drain the queue in batches until the stop sentinel arrives."""
+        while True:
+            batch = [self._queue.get()]
+            stop = batch[0] is _STOP
+            # After the sentinel, drain everything: add_entry calls racing
+            # close() may have queued entries behind it
+            while stop or len(batch) < self.batch_size:
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                batch.append(item)
+                stop = stop or item is _STOP
+            entries = [item for item in batch if item is not _STOP]
+            try:
+                if entries:
+                    self._file.write(b"".join(map(encode_record, entries)))
+                    self._file.flush()
+                    if self.fsync:
+                        os.fsync(self._file.fileno())
+            except (OSError, ValueError, struct.error) as error:
+                # Reported to the caller by flush() or close()
+                self._error = error
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+            if stop:
+                return
+
+    def _raise_writer_error(self) -> None:
+        """Re-raise an error hit by the writer thread in the caller."""
+        if self._error is not None:
+            error, self._error = self._error, None
+            raise OSError(f"Writing history log {self.path} failed") from error
+
+    def add_entry(
+        self,
+        operation: str,
+        operands: list[float],
+        result: float,
+        timestamp: datetime | None = None,
+    ) -> None:
+        """Add a calculation entry and queue it for the log.
+
+        Args:
+            operation: The operation performed (e.g., 'add', 'multiply')
+            operands: List of operands used in the calculation
+            result: The result of the calculation
+            timestamp: When the calculation was performed (defaults to now)
+        """
+        if not self._writer.is_alive():
+            raise RuntimeError("History log is closed")
+        # Queue the entry built here: by now _history[-1] may be another
+        # thread's entry
+        entry = self._new_entry(operation, operands, result, timestamp)
+        self._append_entry(entry)
+        self._queue.put(entry)
+
+    def flush(self) -> None:
+        """Block until every queued entry has been written to the log."""
+        self._queue.join()
+        self._raise_writer_error()
+
+    def clear_history(self) -> int:
+        """Clear all history entries and truncate the log.
+
+        Returns:
+            Number of entries that were cleared
+        """
+        self.flush()
+        count = super().clear_history()
+        self._file.truncate(len(LOG_MAGIC))
+        return count
+
+    def close(self) -> None:
+        """Write pending entries, stop the writer and close the log."""
+        if self._writer.is_alive():
+            self._queue.put(_STOP)
+            self._writer.join()
+            self._file.close()
+        self._raise_writer_error()
+
+    def __enter__(self) -> "PersistentHistory":
+        """Use the history as a context manager that closes the log."""
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        """Close the log on exit."""
+        self.close()
+
+
+# Columnar snapshots
+#
+# Layout (little-endian): magic, header, operation names joined by newlines,
+# then one fixed-width column per ColumnarHistory field in COLUMN_TYPECODES
+# order, then the side table of values that did not fit a column. Names and
+# columns are padded to 8 bytes so every column can be viewed in place.
+
+SNAPSHOT_MAGIC = b"CALCCOL1"
+
+# Header after the magic: u64 rows, u32 bytes of names, u32 side-table rows
+_SNAPSHOT_HEADER = struct.Struct("<QII")
+# Side-table record header: i64 row, u8 flags for the fields that follow
+_EXACT_HEADER = struct.Struct("<qB")
+_EXACT_OPERANDS = 1
+_EXACT_RESULT = 2
+_EXACT_TIMESTAMP = 4
+_ALIGNMENT = 8
+
+
+def _check_byte_order() -> None:
+    """Snapshots are little-endian and mapped in place."""
+    if sys.byteorder != "little":
+        raise RuntimeError("History snapshots require a little-endian platform")
+
+
+def _padding(size: int) -> bytes:
+    """Zero bytes that pad size up to the column alignment."""
+    return bytes(-size % _ALIGNMENT)
+
+
+def _encode_exact(row: int, values: dict[str, Any]) -> bytes:
+    """Encode one side-table row."""
+    flags = 0
+    parts = []
+    operands = values.get("operands")
+    if operands is not None:
+        flags |= _EXACT_OPERANDS
+        parts.append(_LENGTH.pack(len(operands)))
+        parts.extend(map(encode_value, operands))
+    if "result" in values:
+        flags |= _EXACT_RESULT
+        parts.append(encode_value(values["result"]))
+    if "timestamp" in values:
+        flags |= _EXACT_TIMESTAMP
+        text = values["timestamp"].isoformat().encode()
+        parts.append(_LENGTH.pack(len(text)) + text)
+    return _EXACT_HEADER.pack(row, flags) + b"".join(parts)
+
+
+def _decode_exact(buffer: Any, offset: int) -> tuple[int, dict[str, Any], int]:
+    """Decode one side-table row, returning it and the offset after it."""
+    row, flags = _EXACT_HEADER.unpack_from(buffer, offset)
+    offset += _EXACT_HEADER.size
+    values: dict[str, Any] = {}
+    if flags & _EXACT_OPERANDS:
+        (count,) = _LENGTH.unpack_from(buffer, offset)
+        offset += _LENGTH.size
+        operands = []
+        for _ in range(count):
+            value, offset = decode_value(buffer, offset)
+            operands.append(value)
+        values["operands"] = operands
+    if flags & _EXACT_RESULT:
+        values["result"], offset = decode_value(buffer, offset)
+    if flags & _EXACT_TIMESTAMP:
+        (size,) = _LENGTH.unpack_from(buffer, offset)
+        start = offset + _LENGTH.size
+        text = bytes(buffer[start : start + size]).decode()
+        values["timestamp"] = datetime.fromisoformat(text)
+        offset = start + size
+    return row, values, offset
+
+
+def _read_snapshot(
+    buffer: memoryview,
+) -> tuple[list[str], dict[str, memoryview], dict[int, dict[str, Any]]]:
+    """Parse a snapshot into names, raw column slices and the side table."""
+    _check_byte_order()
+    if bytes(buffer[: len(SNAPSHOT_MAGIC)]) != SNAPSHOT_MAGIC:
+        raise ValueError("Not a calculator history snapshot")
+    rows, names_size, exact_rows = _SNAPSHOT_HEADER.unpack_from(
+        buffer, len(SNAPSHOT_MAGIC)
+    )
+    offset = len(SNAPSHOT_MAGIC) + _SNAPSHOT_HEADER.size
+    names = bytes(buffer[offset : offset + names_size]).decode()
+    offset += names_size + len(_padding(names_size))
+
+    spans = {}
+    for name, typecode in COLUMN_TYPECODES.items():
+        size = rows * array(typecode).itemsize
+        spans[name] = (offset, offset + size)
+        offset += size + len(_padding(size))
+    if offset > len(buffer):
+        raise ValueError("History snapshot is truncated")
+
+    exact = {}
+    for _ in range(exact_rows):
+        row, values, offset = _decode_exact(buffer, offset)
+        exact[row] = values
+    # Sliced last, so a parse error leaves no views of the buffer behind
+    columns = {name: buffer[start:end] for name, (start, end) in spans.items()}
+    return names.split("\n") if names else [], columns, exact
+
+
+def export_history(history: CalculatorHistory, path: str | Path) -> int:
+    """Write a history to a compact columnar snapshot file.
+
+    Each entry takes 36 bytes of fixed-width columns (the ``ColumnarHistory``
+    layout); only values that do not fit a column, such as big integers,
+    are encoded separately. Read the file back with ``load_history``, or
+    analyze it in place with ``HistoryView``.
+
+    Args:
+        history: Any history backend
+        path: Snapshot file to create or overwrite
+
+    Returns:
+        Number of entries written
+    """
+    _check_byte_order()
+    if not isinstance(history, ColumnarHistory):
+        columnar = ColumnarHistory()
+        columnar.add_entries(
+            (entry["operation"], entry["operands"], entry["result"], entry["timestamp"])
+            for entry in history.view(oldest_first=True)
+        )
+        history = columnar
+
+    operations, columns, exact = history.export_columns()
+    names = "\n".join(operations).encode()
+    rows = len(columns["ops"])
+    with Path(path).open("wb") as snapshot:
+        snapshot.write(SNAPSHOT_MAGIC)
+        snapshot.write(_SNAPSHOT_HEADER.pack(rows, len(names), len(exact)))
+        snapshot.write(names + _padding(len(names)))
+        for name in COLUMN_TYPECODES:
+            column = columns[name]
+            snapshot.write(column)
+            snapshot.write(_padding(len(column) * column.itemsize))
+        snapshot.writelines(_encode_exact(row, exact[row]) for row in sorted(exact))
+    return rows
+
+
+def load_history(path: str | Path) -> ColumnarHistory:
+    """Load a snapshot into a new, writable ``ColumnarHistory``.
+
+    Columns are copied in bulk; only the summary aggregates and the query
+    index are rebuilt row by row.
+    """
+    with (
+        Path(path).open("rb") as snapshot,
+        mmap.mmap(snapshot.fileno(), 0, access=mmap.ACCESS_READ) as mapped,
+        memoryview(mapped) as buffer,
+    ):
+        history = ColumnarHistory()
+        history.load_columns(*_read_snapshot(buffer))
+    return history
+
+
+class HistoryView(ColumnarHistory):
+    """Read-only history that reads a snapshot file in place.
+
+    The file is memory-mapped and every column is a ``memoryview`` of the
+    mapping, so opening a view costs the same for any file size and entries
+    are only decoded when read. ``column()`` hands out a column without
+    copying, e.g. for ``numpy.asarray(view.column("results"))``. All the
+    read methods of a history work; summary aggregates and query indexes
+    are built on first use.
+
+    Close the view (or use it as a context manager) to unmap the file;
+    columns obtained from ``column()`` must be released first.
+    """
+
+    def __init__(self, path: str | Path):
+        """Map a snapshot file.
+
+        Args:
+            path: File written by ``export_history``
+        """
+        super().__init__()
+        self.path = Path(path)
+        with self.path.open("rb") as snapshot:
+            self._mmap = mmap.mmap(snapshot.fileno(), 0, access=mmap.ACCESS_READ)
+        self._buffer = memoryview(self._mmap)
+        try:
+            operations, columns, self._exact = _read_snapshot(self._buffer)
+        except (ValueError, struct.error):
+            self.close()
+            raise
+        self._op_names = operations
+        self._op_codes = {name: code for code, name in enumerate(operations)}
+        for name, typecode in COLUMN_TYPECODES.items():
+            setattr(self, f"_{name}", columns[name].cast(typecode))
+        self._derived = False
+
+    @property
+    def operation_names(self) -> list[str]:
+        """Operation names, indexed by the values of the ``ops`` column."""
+        return list(self._op_names)
+
+    def column(self, name: str) -> memoryview:
+        """Get a column as a read-only view of the file, without copying.
+
+        Args:
+            name: One of ``COLUMN_TYPECODES``, e.g. ``"results"``
+        """
+        if name not in COLUMN_TYPECODES:
+            raise ValueError(f"Unknown column {name!r}")
+        return getattr(self, f"_{name}")
+
+    def _ensure_derived(self) -> None:
+        """Build aggregates and the query index on first use."""
+        if not self._derived:
+            self._index = HistoryIndex(times=array("q"))
+            self._rebuild_derived(self._timestamps)
+            self._derived = True
+
+    def _current_stats(self) -> HistoryStats:
+        """Aggregates for the mapped entries."""
+        self._ensure_derived()
+        return super()._current_stats()
+
+    def _query_view(
+        self,
+    ) -> tuple[HistoryIndex, Callable[[int], dict[str, Any]], Callable[[int], Any]]:
+        """Query index over the mapped entries."""
+        self._ensure_derived()
+        return super()._query_view()
+
+    def add_entry(self, *_args: Any, **_kwargs: Any) -> None:
+        """Reject writes; views are read-only."""
+        raise TypeError("HistoryView is read-only")
+
+    def clear_history(self) -> int:
+        """Reject writes; views are read-only."""
+        raise TypeError("HistoryView is read-only")
+
+    def load_columns(self, *_args: Any, **_kwargs: Any) -> None:
+        """Reject writes; views are read-only."""
+        raise TypeError("HistoryView is read-only")
+
+    def close(self) -> None:
+        """Release the columns and unmap the file."""
+        if self._mmap.closed:
+            return
+        for name in COLUMN_TYPECODES:
+            column = getattr(self, f"_{name}")
+            if isinstance(column, memoryview):
+                column.release()
+        self._buffer.release()
+        self._mmap.close()
+
+    def __enter__(self) -> "HistoryView":
+        """Use the view as a context manager that unmaps the file."""
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        """Unmap the file on exit."""
+        self.close()
@@ -0,0 +1,508 @@
+"""
+Calculator server - operations and history queries as JSON lines over TCP
+
+Every request is one JSON object per line and gets one response line with
+the same ``id``::
+
+    {"id": 1, "op": "divide", "args": [10, 4]}         -> {"id": 1, "result": 2.5}
+    {"id": 2, "op": "sqrt", "args": [-1]}              -> {"id": 2, "error":
+        {"type": "ValueError", "message": "Cannot compute square root ..."}}
+    {"id": 3, "op": "history", "operation": "divide", "limit": 10}
+    {"id": 4, "op": "summary"}
+
+Clients may pipeline requests; responses come back as they complete, so
+match them by ``id``. Operation requests from all connections are coalesced
+into micro-batches and evaluated with the ``*_many`` batch functions
+(vectorized with NumPy for float batches when it is installed). Backpressure
+comes from a bounded request queue and a per-connection in-flight limit:
+when either is full the server stops reading from that socket.
+
+    python -m src.server --port 8765
+"""
+
+import asyncio
+import contextlib
+import itertools
+import json
+from collections import defaultdict
+from datetime import datetime
+from typing import Any
+
+import click
+
+from src.calculator import OPERATIONS, Calculator
+from src.history import CalculatorHistory, RingBufferHistory
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - numpy is an optional accelerator
+    np = None
+
+# Operations evaluated in batches, with the number of operands they take
+_BATCH_ARITY = {
+    "add": 2,
+    "subtract": 2,
+    "multiply": 2,
+    "divide": 2,
+    "power": 2,
+    "sqrt": 1,
+}
+
+# Float batches at least this large are evaluated with NumPy
+_NUMPY_MIN_BATCH = 32
+
+_REQUEST_ERRORS = (TypeError, ValueError, OverflowError, ZeroDivisionError)
+
+_CLIENT_ERRORS: dict[str, type[Exception]] = {
+    error.__name__: error for error in _REQUEST_ERRORS
+}
+
+
+def _error_response(request_id: Any, error: Exception) -> dict[str, Any]:
+    """Build the response for a failed request."""
+    return {
+        "id": request_id,
+        "error": {"type": type(error).__name__, "message": str(error)},
+    }
+
+
+def _parse_time(value: str | None) -> datetime | None:
+    """Parse an optional ISO 8601 timestamp from a history request."""
+    return None if value is None else datetime.fromisoformat(value)
+
+
+def _entry_json(entry: dict[str, Any]) -> dict[str, Any]:
+    """History entry with its timestamp as ISO 8601 text."""
+    return {**entry, "timestamp": entry["timestamp"].isoformat()}
+
+
+def _is_batchable(operation: str, args: list[Any]) -> bool:
+    """Return True if a request can join a batch of its operation."""
+    return _BATCH_ARITY.get(operation) == len(args) and all(
+        type(arg) is int or type(arg) is float for arg in args
+    )
+
+
+class CalculatorServer:
+    """Asyncio TCP server that evaluates requests in micro-batches.
+
+    Operation requests wait in a bounded queue. A single batcher task takes
+    the first waiting request, lingers ``max_delay`` seconds so concurrent
+    requests can join, then evaluates up to ``max_batch`` requests grouped
+    by operation, one ``*_many`` call per group. Every successful request is
+    recorded in ``history`` as its own entry, with one bulk append per batch.
+    """
+
+    def __init__(
+        self,
+        history: CalculatorHistory | None = None,
+        *,
+        max_batch: int = 256,
+        max_delay: float = 0.0005,
+        max_pending: int = 10_000,
+        max_inflight: int = 128,
+    ):
+        """Configure the server; call ``start`` to listen.
+
+        Args:
+            history: Where calculations are recorded (defaults to a
+                ``RingBufferHistory`` of the newest 100,000 entries)
+            max_batch: Most requests evaluated together
+            max_delay: Seconds the batcher waits for a batch to fill
+            max_pending: Most operation requests queued for evaluation
+            max_inflight: Most unanswered requests per connection
+        """
+        if min(max_batch, max_pending, max_inflight) < 1 or max_delay < 0:
+            raise ValueError("Server limits must be positive")
+        self.history = (
+            RingBufferHistory(max_size=100_000) if history is None else history
+        )
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self.max_pending = max_pending
+        self.max_inflight = max_inflight
+        # Evaluates without recording; the server records per request instead
+        self._session = Calculator(record_history=False)
+        self._queue: asyncio.Queue | None = None
+        self._server: asyncio.Server | None = None
+        self._batcher: asyncio.Task | None = None
+        self._writers: set[asyncio.StreamWriter] = set()
+        self._requests = 0
+        self._batches = 0
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> tuple[str, int]:
+        """Start listening and batching.
+
+        Args:
+            host: Interface to bind
+            port: TCP port (0 picks a free one)
+
+        Returns:
+            The ``(host, port)`` actually bound
+        """
+        if self._server is not None:
+            raise RuntimeError("Server is already running")
+        self._queue = asyncio.Queue(maxsize=self.max_pending)
+        self._batcher = asyncio.create_task(self._batch_loop())
+        self._server = await asyncio.start_server(self._handle_connection, host, port)
+        return self._server.sockets[0].getsockname()[:2]
+
+    async def close(self) -> None:
+        """Stop listening, drop connections and stop the batcher."""
+        if self._server is None:
+            return
+        self._server.close()
+        for writer in list(self._writers):
+            writer.close()
+        await self._server.wait_closed()
+        self._batcher.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await self._batcher
+        self._server = None
+
+    async def __aenter__(self) -> "CalculatorServer":
+        """Start on the default host and a free port."""
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc_info: object) -> None:
+        """Close the server."""
+        await self.close()
+
+    @property
+    def address(self) -> tuple[str, int]:
+        """The ``(host, port)`` the server listens on."""
+        if self._server is None:
+            raise RuntimeError("Server is not running")
+        return self._server.sockets[0].getsockname()[:2]
+
+    def stats(self) -> dict[str, Any]:
+        """Get counts of evaluated requests and batches."""
+        return {
+            "requests": self._requests,
+            "batches": self._batches,
+            "mean_batch_size": self._requests / self._batches if self._batches else 0,
+            "queued": 0 if self._queue is None else self._queue.qsize(),
+        }
+
+    async def submit(self, operation: str, args: list[Any]) -> Any:
+        """Queue one operation for the next batch and wait for its result."""
+        if self._queue is None:
+            raise RuntimeError("Server is not running")
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((operation, args, future))
+        return await future
+
+    async def _batch_loop(self) -> None:
+        """Collect queued requests into batches and evaluate them."""
+        queue = self._queue
+        while True:
+            batch = [await queue.get()]
+            if queue.qsize() < self.max_batch - 1:
+                await asyncio.sleep(self.max_delay)
+            while len(batch) < self.max_batch and not queue.empty():
+                batch.append(queue.get_nowait())
+            try:
+                self._evaluate_batch(batch)
+            except Exception as error:  # fail this batch only, keep serving
+                failure = RuntimeError(f"Batch evaluation failed: {error}")
+                for *_, future in batch:
+                    if not future.done():
+                        future.set_exception(failure)
+
+    def _evaluate_batch(self, batch: list[tuple[str, list[Any], asyncio.Future]]):
+        """Evaluate a batch, resolve its futures and record its history."""
+        groups: dict[str, list[int]] = defaultdict(list)
+        results: list[Any] = [None] * len(batch)
+        for position, (operation, args, future) in enumerate(batch):
+            if future.cancelled():
+                continue
+            if _is_batchable(operation, args):
+                groups[operation].append(position)
+            else:
+                results[position] = self._evaluate_one(operation, args)
+
+        for operation, positions in groups.items():
+            columns = list(zip(*(batch[p][1] for p in positions), strict=True))
+            values = self._evaluate_many(operation, columns)
+            for position, value in zip(positions, values, strict=True):
+                # NaN marks a failure masked by the batch (or a NaN result);
+                # the scalar call gives the real error or the same NaN
+                results[position] = (
+                    self._evaluate_one(operation, batch[position][1])
+                    if value != value  # noqa: PLR0124
+                    else value
+                )
+
+        entries = []
+        for (operation, args, future), result in zip(batch, results, strict=True):
+            if future.cancelled():
+                continue
+            if isinstance(result, Exception):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+                entries.append((operation, args, result, None))
+        self.history.add_entries(entries)
+        self._requests += len(batch)
+        self._batches += 1
+
+    def _evaluate_one(self, operation: str, args: list[Any]) -> Any:
+        """Evaluate a single request, returning its result or exception."""
+        try:
+            return getattr(self._session, operation)(*args)
+        except _REQUEST_ERRORS as error:
+            return error
+
+    def _evaluate_many(self, operation: str, columns: list[tuple]) -> list[Any]:
+        """Evaluate one operation over operand columns; failures become NaN."""
+        batch = getattr(self._session, f"{operation}_many")
+        if (
+            np is not None
+            and len(columns[0]) >= _NUMPY_MIN_BATCH
+            and all(type(v) is float for column in columns for v in column)
+        ):
+            arrays = [np.array(column, dtype=float) for column in columns]
+            results = batch(*arrays, errors="mask")
+            if results.dtype.kind == "c":
+                # A negative base with a fractional exponent made the batch
+                # complex; leave those to the scalar call, the rest are real
+                a, b = arrays
+                roots = (a < 0) & (np.floor(b) != b)
+                results = np.where(roots, np.nan, results.real)
+            return results.tolist()
+        return batch(*columns, errors="mask")
+
+    async def _handle_connection(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        """Read pipelined requests and answer each when it completes."""
+        self._writers.add(writer)
+        inflight = asyncio.Semaphore(self.max_inflight)
+        write_lock = asyncio.Lock()
+        tasks: set[asyncio.Task] = set()
+        try:
+            while line := await reader.readline():
+                await inflight.acquire()
+                task = asyncio.create_task(
+                    self._respond(line, writer, write_lock, inflight)
+                )
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+            if tasks:
+                await asyncio.wait(tasks)
+        except (ConnectionError, ValueError):
+            # Dropped connection, or a request line over the reader limit
+            pass
+        finally:
+            for task in tasks:
+                task.cancel()
+            self._writers.discard(writer)
+            writer.close()
+            with contextlib.suppress(ConnectionError):
+                await writer.wait_closed()
+
+    async def _respond(
+        self,
+        line: bytes,
+        writer: asyncio.StreamWriter,
+        write_lock: asyncio.Lock,
+        inflight: asyncio.Semaphore,
+    ) -> None:
+        """Handle one request line and write its response."""
+        try:
+            response = await self._dispatch(line)
+            data = (json.dumps(response, default=str) + "\n").encode()
+            async with write_lock:
+                writer.write(data)
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            inflight.release()
+
+    async def _dispatch(self, line: bytes) -> dict[str, Any]:
+        """Run one request and build its response."""
+        request_id = None
+        try:
+            request = json.loads(line)
+            if not isinstance(request, dict):
+                raise TypeError("Request must be a JSON object")
+            request_id = request.get("id")
+            operation = request.get("op")
+            if operation == "history":
+                result = self._history_page(request)
+            elif operation == "summary":
+                result = self.history.get_summary()
+            elif operation in OPERATIONS:
+                args = request.get("args", [])
+                if not isinstance(args, list):
+                    raise TypeError("args must be a list")
+                result = await self.submit(operation, args)
+            else:
+                raise ValueError(f"Unknown operation {operation!r}")
+        except (*_REQUEST_ERRORS, RuntimeError) as error:
+            return _error_response(request_id, error)
+        return {"id": request_id, "result": result}
+
+    def _history_page(self, request: dict[str, Any]) -> dict[str, Any]:
+        """Answer a history query request with one page of entries."""
+        page = self.history.query(
+            request.get("operation"),
+            _parse_time(request.get("since")),
+            _parse_time(request.get("until")),
+            limit=request.get("limit", 100),
+            cursor=request.get("cursor"),
+            oldest_first=bool(request.get("oldest_first", False)),
+        )
+        return {
+            "entries": [_entry_json(entry) for entry in page.entries],
+            "next_cursor": page.next_cursor,
+        }
+
+
+class CalculatorClient:
+    """Asyncio client that pipelines requests to a ``CalculatorServer``.
+
+    Any number of calls may be awaited concurrently over one connection;
+    responses are matched to callers by request id. Errors reported by the
+    server are raised as the same built-in exception type.
+    """
+
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """Wrap an open connection; use ``connect`` to create one."""
+        self._reader = reader
+        self._writer = writer
+        self._ids = itertools.count(1)
+        self._pending: dict[int, asyncio.Future] = {}
+        self._receiver = asyncio.create_task(self._receive_loop())
+
+    @classmethod
+    async def connect(cls, host: str, port: int) -> "CalculatorClient":
+        """Open a connection to a server."""
+        reader, writer = await asyncio.open_connection(host, port)
+        return cls(reader, writer)
+
+    async def __aenter__(self) -> "CalculatorClient":
+        """Use the client as a context manager that closes the connection."""
+        return self
+
+    async def __aexit__(self, *exc_info: object) -> None:
+        """Close the connection."""
+        await self.close()
+
+    async def request(self, payload: dict[str, Any]) -> Any:
+        """Send one request and return its result."""
+        if self._receiver.done():
+            raise ConnectionError("Connection closed")
+        request_id = next(self._ids)
+        future = asyncio.get_running_loop().create_future()
+        self._pending[request_id] = future
+        self._writer.write((json.dumps({**payload, "id": request_id}) + "\n").encode())
+        await self._writer.drain()
+        return await future
+
+    async def call(self, operation: str, *args: Any) -> Any:
+        """Evaluate an operation on the server, e.g. ``call("divide", 10, 4)``."""
+        return await self.request({"op": operation, "args": list(args)})
+
+    async def query_history(self, **filters: Any) -> dict[str, Any]:
+        """Get a page of server history (``operation``, ``since``, ``limit``...)."""
+        return await self.request({"op": "history", **filters})
+
+    async def summary(self) -> dict[str, Any]:
+        """Get the server's history summary."""
+        return await self.request({"op": "summary"})
+
+    async def close(self) -> None:
+        """Close the connection; unanswered calls raise ``ConnectionError``."""
+        self._writer.close()
+        with contextlib.suppress(ConnectionError):
+            await self._writer.wait_closed()
+        await self._receiver
+
+    async def _receive_loop(self) -> None:
+        """Resolve pending calls as responses arrive."""
+        try:
+            while line := await self._reader.readline():
+                response = json.loads(line)
+                future = self._pending.pop(response["id"], None)
+                if future is None or future.done():
+                    continue
+                error = response.get("error")
+                if error is None:
+                    future.set_result(response["result"])
+                else:
+                    error_type = _CLIENT_ERRORS.get(error["type"], RuntimeError)
+                    future.set_exception(error_type(error["message"]))
+        except ConnectionError:
+            pass
+        finally:
+            for future in self._pending.values():
+                if not future.done():
+                    future.set_exception(ConnectionError("Connection closed"))
+            self._pending.clear()
+
+
+async def _serve(server: CalculatorServer, host: str, port: int) -> None:
+    """Run a server until cancelled."""
+    bound_host, bound_port = await server.start(host, port)
+    print(f"Listening on {bound_host}:{bound_port}", flush=True)
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await server.close()
+
+
+@click.command()
+@click.option("--host", default="127.0.0.1", show_default=True)
+@click.option("--port", type=int, default=8765, show_default=True)
+@click.option(
+    "--max-batch",
+    type=click.IntRange(min=1),
+    default=256,
+    show_default=True,
+    help="Most requests evaluated together.",
+)
+@click.option(
+    "--max-delay-ms",
+    type=click.FloatRange(min=0),
+    default=0.5,
+    show_default=True,
+    help="How long a batch waits to fill.",
+)
+@click.option(
+    "--max-pending",
+    type=click.IntRange(min=1),
+    default=10_000,
+    show_default=True,
+    help="Queued requests before the server stops reading.",
+)
+@click.option(
+    "--history-limit",
+    type=click.IntRange(min=1),
+    default=100_000,
+    show_default=True,
+    help="Most recent calculations kept in history.",
+)
+def main(  # noqa: PLR0913, PLR0917 - one parameter per CLI option
+    host: str,
+    port: int,
+    max_batch: int,
+    max_delay_ms: float,
+    max_pending: int,
+    history_limit: int,
+) -> None:
+    """Serve calculator operations as JSON lines over TCP."""
+    server = CalculatorServer(
+        RingBufferHistory(max_size=history_limit),
+        max_batch=max_batch,
+        max_delay=max_delay_ms / 1000,
+        max_pending=max_pending,
+    )
+    with contextlib.suppress(KeyboardInterrupt):
+        asyncio.run(_serve(server, host, port))
+
+
+if __name__ == "__main__":
+    main()
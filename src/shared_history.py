@@ -0,0 +1,493 @@
+"""
+Cross-process calculator history in a ``multiprocessing.shared_memory`` block
+
+Every process that records into a ``SharedMemoryHistory`` writes fixed-size
+records into its own lane, a ring buffer in the shared block, so processes
+never contend and no entry is pickled or sent over a pipe. Any process can
+read the merged history, count, last result and summary straight from the
+block.
+"""
+
+import heapq
+import itertools
+import math
+import multiprocessing
+import os
+import struct
+import threading
+import time
+import weakref
+from collections.abc import Callable, Iterator, Sequence
+from datetime import datetime
+from multiprocessing.shared_memory import SharedMemory
+from operator import itemgetter
+from pathlib import Path
+from typing import Any
+
+from src.history import (
+    CalculatorHistory,
+    HistoryEntry,
+    HistoryIndex,
+    HistoryStats,
+    ns_from_datetime,
+)
+
+SHARED_MAGIC = b"CALCSHM1"
+
+# Block header: magic, number of lanes, records per lane
+_HEADER = struct.Struct("<8sII")
+# Lane header: owning pid (0 = free), records ever written, first record
+# still in history (raised by clear_history)
+_LANE = struct.Struct("<qQQ")
+# Record: operation name, operand count, int flags, three operands, result,
+# timestamp (epoch ns); 64 bytes
+_RECORD = struct.Struct("<16sBB6xddddq")
+_LANE_WRITTEN = 8
+_LANE_FLOOR = 16
+_COUNT = struct.Struct("<Q")
+
+MAX_OPERANDS = 3
+MAX_OPERATION_BYTES = 16
+# Bit i set: operand i is an int; bit MAX_OPERANDS: the result is
+_RESULT_IS_INT = 1 << MAX_OPERANDS
+_MAX_EXACT_INT = 2**53
+
+# Record fields after unpacking
+_OPERATION, _ARITY, _KINDS, _RESULT, _TIMESTAMP = 0, 1, 2, 6, 7
+
+# Histories to detach from lanes in a forked child; each child claims its own
+_open_histories: "weakref.WeakSet[SharedMemoryHistory]" = weakref.WeakSet()
+
+# Threads of a process share its lane, as do history objects attached to
+# the same block, so appends are serialized by one lock per block name
+_write_locks: dict[str, threading.Lock] = {}
+
+
+def _write_lock(name: str) -> threading.Lock:
+    """This process's lock for appending to a block's lane."""
+    return _write_locks.setdefault(name, threading.Lock())
+
+
+def _forget_lanes_after_fork() -> None:
+    """Make forked children claim a lane of their own on first write.
+
+    Write locks are replaced too, since a parent thread may have held one
+    at the fork.
+    """
+    _write_locks.clear()
+    for history in _open_histories:
+        history._lane_at = None  # noqa: SLF001 - module-private fork hook
+        history._write_lock = _write_lock(history.name)  # noqa: SLF001
+
+
+os.register_at_fork(after_in_child=_forget_lanes_after_fork)
+
+
+def _pack_value(value: Any) -> tuple[float, bool]:
+    """Store a value in a float64 slot; return it and whether it is an int.
+
+    Ints beyond 2**53 and other numbers are stored as the nearest float,
+    values without one (e.g. complex) as NaN.
+    """
+    if type(value) is float:
+        return value, False
+    if isinstance(value, int) and -_MAX_EXACT_INT <= value <= _MAX_EXACT_INT:
+        return float(value), True
+    try:
+        return float(value), False
+    except (TypeError, ValueError, OverflowError):
+        return math.nan, False
+
+
+class SharedMemoryHistory(CalculatorHistory):
+    """History shared by processes through one shared memory block.
+
+    The block is split into ``lanes``; each process claims a free lane (or
+    the lane of a process that has exited) the first time it records, then
+    appends to it without cross-process locking; only threads of the same
+    process take turns, on a per-process lock. A lane is a ring of
+    ``lane_capacity`` compact records, so the oldest entries of a busy
+    process are overwritten. Reads merge the lanes by timestamp. Counters
+    are single machine words written after the record they publish, and
+    readers drop records that were overwritten while they read, so reads
+    never block writers.
+
+    Records hold up to three operands; values are stored as float64 (ints
+    up to 2**53 exactly, anything else as the nearest float, or NaN), so
+    the shared history suits monitoring and summaries rather than exact
+    replay. Operation names are limited to 16 bytes.
+
+    Hand the history to worker processes by inheritance: create it before
+    forking, or pass it to ``Process`` / pool initializer arguments. The
+    creating process owns the block; ``unlink()`` (or leaving a ``with``
+    block) frees it once the workers are done.
+    """
+
+    def __init__(
+        self,
+        lanes: int = 16,
+        lane_capacity: int = 100_000,
+        *,
+        context: multiprocessing.context.BaseContext | None = None,
+    ):
+        """Create a new shared block.
+
+        Args:
+            lanes: Most processes that can record at the same time
+            lane_capacity: Entries kept per process before the oldest are
+                overwritten
+            context: Multiprocessing context the workers are started with
+                (defaults to the global one)
+        """
+        if lanes < 1 or lane_capacity < 1:
+            raise ValueError("lanes and lane_capacity must be positive")
+        super().__init__()
+        self.lanes = lanes
+        self.lane_capacity = lane_capacity
+        # One spare slot per lane for the record being written, so a full
+        # lane still has lane_capacity complete records
+        slots = lane_capacity + 1
+        size = _HEADER.size + lanes * (_LANE.size + slots * _RECORD.size)
+        self._shm = SharedMemory(create=True, size=size)
+        self._owner = True
+        self._claim_lock = (context or multiprocessing).Lock()
+        _HEADER.pack_into(self._shm.buf, 0, SHARED_MAGIC, lanes, lane_capacity)
+        self._attach()
+
+    def _attach(self) -> None:
+        """Set up per-process state for the mapped block."""
+        self._buf = self._shm.buf
+        self._slots = self.lane_capacity + 1
+        # Byte offset of this process's lane, once claimed
+        self._lane_at: int | None = None
+        self._write_lock = _write_lock(self._shm.name)
+        self._names: dict[str, bytes] = {}
+        self._decoded_names: dict[bytes, str] = {}
+        _open_histories.add(self)
+
+    def __getstate__(self) -> dict[str, Any]:
+        """Pickle as a reference to the block, for worker processes."""
+        return {
+            "name": self._shm.name,
+            "claim_lock": self._claim_lock,
+            "lanes": self.lanes,
+            "lane_capacity": self.lane_capacity,
+        }
+
+    def __setstate__(self, state: dict[str, Any]) -> None:
+        """Attach to the block in a worker process."""
+        CalculatorHistory.__init__(self)
+        self.lanes = state["lanes"]
+        self.lane_capacity = state["lane_capacity"]
+        self._claim_lock = state["claim_lock"]
+        self._shm = SharedMemory(name=state["name"])
+        self._owner = False
+        self._attach()
+
+    @property
+    def name(self) -> str:
+        """Name of the shared memory block."""
+        return self._shm.name
+
+    def close(self) -> None:
+        """Unmap the block in this process."""
+        _open_histories.discard(self)
+        self._buf = None
+        self._shm.close()
+
+    def unlink(self) -> None:
+        """Free the block; processes that still map it keep their mapping."""
+        self._shm.unlink()
+
+    def __enter__(self) -> "SharedMemoryHistory":
+        """Use the history as a context manager."""
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        """Close the block, and free it in the process that created it."""
+        self.close()
+        if self._owner:
+            self.unlink()
+
+    def _lane_offset(self, lane: int) -> int:
+        """Byte offset of a lane's header."""
+        return _HEADER.size + lane * (_LANE.size + self._slots * _RECORD.size)
+
+    def _claim_lane(self) -> int:
+        """Take a free lane, or the lane of a process that has exited.
+
+        Returns:
+            Byte offset of the lane's header
+        """
+        pid = os.getpid()
+        with self._claim_lock:
+            for lane in range(self.lanes):
+                offset = self._lane_offset(lane)
+                owner = _LANE.unpack_from(self._buf, offset)[0]
+                if owner in {0, pid} or not _process_alive(owner):
+                    struct.pack_into("<q", self._buf, offset, pid)
+                    self._lane_at = offset
+                    return offset
+        raise RuntimeError(f"All {self.lanes} lanes are in use by other processes")
+
+    def add_entry(
+        self,
+        operation: str,
+        operands: list[float],
+        result: float,
+        timestamp: datetime | None = None,
+    ) -> None:
+        """Append a calculation entry to this process's lane.
+
+        Args:
+            operation: The operation performed (e.g., 'add', 'multiply')
+            operands: List of operands used in the calculation
+            result: The result of the calculation
+            timestamp: When the calculation was performed (defaults to now)
+        """
+        name = self._names.get(operation)
+        if name is None:
+            name = operation.encode()
+            if len(name) > MAX_OPERATION_BYTES:
+                raise ValueError(
+                    f"Operation name longer than {MAX_OPERATION_BYTES} bytes: "
+                    f"{operation!r}"
+                )
+            self._names[operation] = name
+        kinds = 0
+        values = [0.0] * MAX_OPERANDS
+        for i, operand in enumerate(operands[:MAX_OPERANDS]):
+            # Plain floats and ints inline; they are almost every operand
+            kind = type(operand)
+            if kind is float:
+                values[i] = operand
+            elif kind is int and -_MAX_EXACT_INT <= operand <= _MAX_EXACT_INT:
+                values[i] = float(operand)
+                kinds |= 1 << i
+            else:
+                values[i], is_int = _pack_value(operand)
+                kinds |= is_int << i
+        stored_result, is_int = _pack_value(result)
+        if is_int:
+            kinds |= _RESULT_IS_INT
+        timestamp_ns = None if timestamp is None else ns_from_datetime(timestamp)
+
+        buf = self._buf
+        with self._write_lock:
+            offset = self._lane_at
+            if offset is None:
+                offset = self._claim_lane()
+            if timestamp_ns is None:
+                # Stamped under the lock, so a lane stays in time order
+                timestamp_ns = time.time_ns()
+            written = _COUNT.unpack_from(buf, offset + _LANE_WRITTEN)[0]
+            slot = written % self._slots
+            _RECORD.pack_into(
+                buf,
+                offset + _LANE.size + slot * _RECORD.size,
+                name,
+                min(len(operands), 255),
+                kinds,
+                *values,
+                stored_result,
+                timestamp_ns,
+            )
+            # Publish the record only once it is complete
+            _COUNT.pack_into(buf, offset + _LANE_WRITTEN, written + 1)
+
+    def _lane_bounds(self, lane: int) -> tuple[int, int]:
+        """``(first, end)`` record numbers of a lane's live records."""
+        _, written, floor = _LANE.unpack_from(self._buf, self._lane_offset(lane))
+        return max(floor, written - self.lane_capacity), written
+
+    def _lane_records(
+        self, lane: int, *, oldest: int | None = None, newest: int | None = None
+    ) -> list[tuple]:
+        """Unpacked live records of one lane, oldest first.
+
+        Args:
+            lane: Lane number
+            oldest: Only the oldest this many records
+            newest: Only the newest this many records
+        """
+        first, end = self._lane_bounds(lane)
+        if oldest is not None:
+            end = min(end, first + oldest)
+        if newest is not None:
+            first = max(first, end - newest)
+        slots = self._slots
+        records_at = self._lane_offset(lane) + _LANE.size
+        records = []
+        for start, stop in _ring_runs(first, end, slots):
+            run = self._buf[
+                records_at + start * _RECORD.size : records_at + stop * _RECORD.size
+            ]
+            records.extend(_RECORD.iter_unpack(run))
+        # Drop records overwritten while they were read, including the one
+        # the writer may be overwriting now
+        unsafe = self._lane_bounds(lane)[1] + 1 - slots - first
+        return records[unsafe:] if unsafe > 0 else records
+
+    def _all_records(self) -> list[list[tuple]]:
+        """Live records of every lane."""
+        return [self._lane_records(lane) for lane in range(self.lanes)]
+
+    def _operation_name(self, raw: bytes) -> str:
+        """Decode a stored operation name."""
+        name = self._decoded_names.get(raw)
+        if name is None:
+            name = self._decoded_names[raw] = raw.rstrip(b"\0").decode()
+        return name
+
+    def _entry(self, record: tuple) -> HistoryEntry:
+        """Build a history entry from an unpacked record."""
+        kinds = record[_KINDS]
+        arity = min(record[_ARITY], MAX_OPERANDS)
+        operands = [
+            int(value) if kinds >> i & 1 else value
+            for i, value in enumerate(record[3 : 3 + arity])
+        ]
+        result = record[_RESULT]
+        if kinds & _RESULT_IS_INT:
+            result = int(result)
+        operation = self._operation_name(record[_OPERATION])
+        return HistoryEntry.stamped(operation, operands, result, record[_TIMESTAMP])
+
+    def _merged_records(self) -> Iterator[tuple]:
+        """Every live record, oldest first."""
+        return heapq.merge(*self._all_records(), key=itemgetter(_TIMESTAMP))
+
+    def get_history(self, limit: int | None = None) -> list[dict[str, Any]]:
+        """Get calculation history merged across processes.
+
+        Args:
+            limit: Maximum number of entries to return (newest first)
+
+        Returns:
+            List of history entries
+        """
+        if limit is None:
+            records = list(self._merged_records())
+            records.reverse()
+        else:
+            self._check_limit(limit)
+            tails = [
+                self._lane_records(lane, newest=limit) for lane in range(self.lanes)
+            ]
+            records = heapq.nlargest(
+                limit, itertools.chain(*tails), key=itemgetter(_TIMESTAMP)
+            )
+        return [self._entry(record) for record in records]
+
+    def _edge_record(self, newest: bool) -> tuple | None:
+        """Oldest or newest record across lanes."""
+        edges = []
+        for lane in range(self.lanes):
+            if newest:
+                edges.extend(self._lane_records(lane, newest=1))
+            else:
+                edges.extend(self._lane_records(lane, oldest=2)[:1])
+        if not edges:
+            return None
+        return (max if newest else min)(edges, key=itemgetter(_TIMESTAMP))
+
+    def _first_entry(self) -> dict[str, Any] | None:
+        """Oldest entry in history, or None."""
+        record = self._edge_record(newest=False)
+        return None if record is None else self._entry(record)
+
+    def _last_entry(self) -> dict[str, Any] | None:
+        """Newest entry in history, or None."""
+        record = self._edge_record(newest=True)
+        return None if record is None else self._entry(record)
+
+    def get_last_result(self) -> float | None:
+        """Get the result of the last calculation from any process."""
+        last = self._last_entry()
+        return None if last is None else last["result"]
+
+    def get_history_count(self) -> int:
+        """Get the number of calculations in history across processes."""
+        total = 0
+        for lane in range(self.lanes):
+            first, end = self._lane_bounds(lane)
+            total += end - first
+        return total
+
+    def clear_history(self) -> int:
+        """Clear every process's entries.
+
+        Returns:
+            Number of entries that were cleared
+        """
+        count = 0
+        for lane in range(self.lanes):
+            first, end = self._lane_bounds(lane)
+            count += end - first
+            _COUNT.pack_into(self._buf, self._lane_offset(lane) + _LANE_FLOOR, end)
+        return count
+
+    def _current_stats(self) -> HistoryStats:
+        """Aggregates computed from the records, without building entries."""
+        stats = HistoryStats()
+        record_result = stats.record
+        name = self._operation_name
+        for records in self._all_records():
+            for record in records:
+                result = record[_RESULT]
+                if record[_KINDS] & _RESULT_IS_INT:
+                    result = int(result)
+                record_result(name(record[_OPERATION]), result)
+        return stats
+
+    def _iter_entries(self) -> Iterator[dict[str, Any]]:
+        """Iterate over all entries, oldest first."""
+        return map(self._entry, self._merged_records())
+
+    def _entry_sequence(self) -> Sequence[dict[str, Any]]:
+        """A merged list of the entries, decoded from the block once.
+
+        Creating a view therefore costs O(n); ``get_history(limit)`` reads
+        only the newest records of each lane.
+        """
+        return list(self._iter_entries())
+
+    def _query_view(
+        self,
+    ) -> tuple[HistoryIndex, Callable[[int], dict[str, Any]], Callable[[int], Any]]:
+        """Index a merged snapshot of the block.
+
+        The snapshot is rebuilt only after some lane's records changed.
+        """
+        bounds = tuple(self._lane_bounds(lane) for lane in range(self.lanes))
+        return self._snapshot_query_view(bounds)
+
+
+def _ring_runs(first: int, end: int, slots: int) -> list[tuple[int, int]]:
+    """Slot ranges holding record numbers ``first .. end - 1``, in order."""
+    if first >= end:
+        return []
+    start, stop = first % slots, (end - 1) % slots + 1
+    if start < stop:
+        return [(start, stop)]
+    return [(start, slots), (0, stop)]
+
+
+def _process_alive(pid: int) -> bool:
+    """Return True if a process with this pid is running.
+
+    A zombie (exited, but not yet reaped by its parent) still has its pid,
+    so where ``/proc`` is available its state is checked as well.
+    """
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    try:
+        stat = Path(f"/proc/{pid}/stat").read_text()
+    except OSError:
+        return True
+    # Fields after the parenthesized command name start with the state
+    return stat.rpartition(")")[2].split()[0] not in {"Z", "X"}
@@ -0,0 +1,286 @@
+"""
+Worksheets - named cells that recompute incrementally when inputs change
+
+A worksheet holds input cells (plain values) and formula cells defined with
+a calculator operation whose arguments are other cells or literals::
+
+    sheet = Worksheet()
+    sheet.set_input("price", 20)
+    sheet.set_input("quantity", 3)
+    sheet.define("subtotal", "multiply", "price", "quantity")
+    sheet.define("total", "multiply", "subtotal", 1.2)
+    sheet.set_input("quantity", 4)  # recomputes subtotal and total only
+
+Cells form a dependency graph. Changing an input recomputes only the cells
+downstream of it, in dependency order, and stops early along paths whose
+values did not change, so an update costs time proportional to what it
+affects rather than to the size of the worksheet. Each recomputation is one
+call on the worksheet's calculator session and so one history entry; cells
+that are not recomputed record nothing.
+"""
+
+import heapq
+from collections.abc import Iterator, Mapping
+from typing import Any
+
+from src.calculator import OPERATIONS, Calculator, get_default_session
+
+_CALCULATION_ERRORS = (TypeError, ValueError, OverflowError, ZeroDivisionError)
+
+
+class _Cell:
+    """One worksheet cell: an input value or an operation over other cells."""
+
+    __slots__ = ("args", "dependents", "error", "operation", "rank", "value")
+
+    def __init__(self):
+        """Create an empty input cell."""
+        self.operation: str | None = None
+        # (is cell reference, cell name or literal value) per argument
+        self.args: tuple[tuple[bool, Any], ...] = ()
+        self.value: Any = None
+        self.error: Exception | None = None
+        # Greater than the rank of every cell this one reads
+        self.rank = 0
+        self.dependents: set[str] = set()
+
+    def references(self) -> Iterator[str]:
+        """Names of the cells this cell reads."""
+        return (value for is_ref, value in self.args if is_ref)
+
+
+class Worksheet:
+    """Named input and formula cells with incremental recomputation."""
+
+    def __init__(self, session: Calculator | None = None):
+        """Initialize an empty worksheet.
+
+        Args:
+            session: Calculator that evaluates formulas and records them
+                (defaults to the session behind the module-level functions)
+        """
+        self.session = get_default_session() if session is None else session
+        self._cells: dict[str, _Cell] = {}
+
+    def __contains__(self, name: object) -> bool:
+        """Return True if a cell with this name exists."""
+        return name in self._cells
+
+    def __len__(self) -> int:
+        """Number of cells."""
+        return len(self._cells)
+
+    def __getitem__(self, name: str) -> Any:
+        """Same as ``value(name)``."""
+        return self.value(name)
+
+    def value(self, name: str) -> Any:
+        """Get a cell's current value.
+
+        Raises:
+            KeyError: If there is no such cell
+            Exception: The error a formula cell (or a cell it reads) failed
+                with, e.g. ``ValueError`` for a division by zero
+        """
+        cell = self._cells[name]
+        if cell.error is not None:
+            raise cell.error
+        return cell.value
+
+    def values(self) -> dict[str, Any]:
+        """Every cell's value, with the exception object for failed cells."""
+        return {
+            name: cell.value if cell.error is None else cell.error
+            for name, cell in self._cells.items()
+        }
+
+    def set_input(self, name: str, value: Any) -> list[str]:
+        """Set an input cell, creating it if needed, and update its dependents.
+
+        Returns:
+            Names of the formula cells that were recomputed, in order
+        """
+        return self.update({name: value})
+
+    def update(self, values: Mapping[str, Any]) -> list[str]:
+        """Set several input cells, then recompute their dependents once.
+
+        Args:
+            values: New values by cell name
+
+        Returns:
+            Names of the formula cells that were recomputed, in order
+
+        Raises:
+            ValueError: If a name belongs to a formula cell
+        """
+        for name in values:
+            cell = self._cells.get(name)
+            if cell is not None and cell.operation is not None:
+                raise ValueError(f"Cell {name!r} is a formula; use define()")
+        changed = []
+        for name, value in values.items():
+            cell = self._cells.get(name)
+            if cell is None:
+                cell = self._cells[name] = _Cell()
+            elif cell.value == value and type(cell.value) is type(value):
+                continue
+            cell.value = value
+            changed.append(name)
+        return self._recompute(changed, changed_inputs=True)
+
+    def define(self, name: str, operation: str, *args: Any) -> list[str]:
+        """Define (or redefine) a formula cell and compute it.
+
+        Args:
+            name: Cell name
+            operation: Calculator operation, e.g. ``"multiply"``
+            *args: Operands: a string names another cell, anything else is
+                used as a literal value
+
+        Returns:
+            Names of the formula cells that were computed, this one first
+
+        Raises:
+            ValueError: For an unknown operation, a missing cell, or a
+                definition that would make a cell depend on itself
+        """
+        if operation not in OPERATIONS:
+            raise ValueError(f"Unknown operation {operation!r}")
+        parsed = tuple((isinstance(arg, str), arg) for arg in args)
+        references = {value for is_ref, value in parsed if is_ref}
+        for reference in references:
+            if reference not in self._cells:
+                raise ValueError(f"Cell {name!r} refers to missing cell {reference!r}")
+        cell = self._cells.get(name)
+        if cell is None:
+            cell = self._cells[name] = _Cell()
+        elif name in references or references & self._downstream(name):
+            raise ValueError(f"Cell {name!r} would depend on itself")
+
+        for reference in set(cell.references()):
+            self._cells[reference].dependents.discard(name)
+        for reference in references:
+            self._cells[reference].dependents.add(name)
+        cell.operation = operation
+        cell.args = parsed
+        self._raise_rank(name)
+        return self._recompute([name])
+
+    def remove(self, name: str) -> None:
+        """Delete a cell that no other cell reads.
+
+        Raises:
+            KeyError: If there is no such cell
+            ValueError: If other cells read it
+        """
+        cell = self._cells[name]
+        if cell.dependents:
+            used_by = ", ".join(sorted(cell.dependents))
+            raise ValueError(f"Cell {name!r} is used by {used_by}")
+        for reference in set(cell.references()):
+            self._cells[reference].dependents.discard(name)
+        del self._cells[name]
+
+    def dependents(self, name: str) -> set[str]:
+        """Names of every cell that reads ``name``, directly or not."""
+        if name not in self._cells:
+            raise KeyError(name)
+        return self._downstream(name)
+
+    def _downstream(self, name: str) -> set[str]:
+        """Cells reachable from ``name`` through dependents, excluding it."""
+        cells = self._cells
+        seen: set[str] = set()
+        stack = [name]
+        while stack:
+            for dependent in cells[stack.pop()].dependents:
+                if dependent not in seen:
+                    seen.add(dependent)
+                    stack.append(dependent)
+        return seen
+
+    def _raise_rank(self, name: str) -> None:
+        """Give ``name`` a rank above its inputs and push dependents above it.
+
+        Ranks never need to go down: any ranks that keep every cell above
+        the cells it reads give a valid evaluation order.
+        """
+        cells = self._cells
+        cell = cells[name]
+        cell.rank = 1 + max((cells[ref].rank for ref in cell.references()), default=0)
+        stack = [name]
+        while stack:
+            current = cells[stack.pop()]
+            for dependent in current.dependents:
+                dependent_cell = cells[dependent]
+                if dependent_cell.rank <= current.rank:
+                    dependent_cell.rank = current.rank + 1
+                    stack.append(dependent)
+
+    def _recompute(
+        self, seeds: list[str], *, changed_inputs: bool = False
+    ) -> list[str]:
+        """Recompute ``seeds`` (or, for changed inputs, their dependents).
+
+        Cells are taken from a heap in rank order, so every cell is evaluated
+        after all the cells it reads. A cell's dependents are only queued when
+        its value or error actually changed.
+        """
+        cells = self._cells
+        heap: list[tuple[int, str]] = []
+        queued: set[str] = set()
+        if changed_inputs:
+            for name in seeds:
+                for dependent in cells[name].dependents:
+                    if dependent not in queued:
+                        queued.add(dependent)
+                        heap.append((cells[dependent].rank, dependent))
+        else:
+            queued.update(seeds)
+            heap.extend((cells[name].rank, name) for name in seeds)
+        heapq.heapify(heap)
+
+        recomputed = []
+        while heap:
+            _, name = heapq.heappop(heap)
+            cell = cells[name]
+            recomputed.append(name)
+            if not self._evaluate(cell):
+                continue
+            for dependent in cell.dependents:
+                if dependent not in queued:
+                    queued.add(dependent)
+                    heapq.heappush(heap, (cells[dependent].rank, dependent))
+        return recomputed
+
+    def _evaluate(self, cell: _Cell) -> bool:
+        """Evaluate a formula cell; return True if its value or error changed."""
+        cells = self._cells
+        operands = []
+        error = None
+        for is_ref, value in cell.args:
+            if is_ref:
+                source = cells[value]
+                if source.error is not None:
+                    error = source.error
+                    break
+                value = source.value  # noqa: PLW2901 - resolve the reference
+            operands.append(value)
+        result = None
+        if error is None:
+            try:
+                result = getattr(self.session, cell.operation)(*operands)
+            except _CALCULATION_ERRORS as failure:
+                error = failure
+
+        if error is not None:
+            changed = error is not cell.error
+        else:
+            changed = (
+                cell.error is not None
+                or result != cell.value
+                or type(result) is not type(cell.value)
+            )
+        cell.value, cell.error = result, error
+        return changed
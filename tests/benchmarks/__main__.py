@@ -0,0 +1,67 @@
+"""
+Run the benchmark suite
+
+    python -m tests.benchmarks [--full] [--output results.json]
+    python -m tests.benchmarks --compare baseline.json [--threshold 0.1]
+
+With --compare the exit status is 1 if any metric regressed by more than the
+threshold relative to the baseline report.
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+from tests.benchmarks.suite import (
+    DEFAULT_SIZES,
+    FULL_SIZES,
+    compare_results,
+    run_suite,
+)
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Parse arguments, run the suite and report or compare results."""
+    parser = argparse.ArgumentParser(prog="python -m tests.benchmarks")
+    parser.add_argument("--output", type=Path, help="write the JSON report here")
+    parser.add_argument("--compare", type=Path, help="baseline JSON report")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.10,
+        help="allowed relative slowdown before failing (default 0.10)",
+    )
+    parser.add_argument(
+        "--full", action="store_true", help="query history sizes up to 10^7"
+    )
+    parser.add_argument(
+        "--calls", type=int, default=20_000, help="calls per timing loop"
+    )
+    args = parser.parse_args(argv)
+
+    report = run_suite(FULL_SIZES if args.full else DEFAULT_SIZES, args.calls)
+    for name, result in report["results"].items():
+        print(f"{name:<55} {result['value']:>14,.1f} {result['unit']}")
+
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=2), encoding="utf-8")
+        print(f"\nWrote {args.output}")
+
+    if args.compare:
+        baseline = json.loads(args.compare.read_text(encoding="utf-8"))
+        regressions = compare_results(baseline, report, args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) over {args.threshold:.0%}:")
+            for item in regressions:
+                print(
+                    f"  {item['metric']}: {item['baseline']:,.1f} -> "
+                    f"{item['current']:,.1f} ({item['ratio']:.2f}x)"
+                )
+            return 1
+        print(f"\nNo regressions over {args.threshold:.0%}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,78 @@
+"""
+Benchmark: add/multiply throughput from many threads per history backend
+
+Run with: python -m tests.benchmarks.bench_concurrent_history [calls_per_thread]
+"""
+
+import contextlib
+import io
+import sys
+import threading
+import time
+
+from src.calculator import add, multiply, set_history_backend
+from src.history import CalculatorHistory, ConcurrentHistory
+
+
+class LockedHistory(CalculatorHistory):
+    """Baseline: the list-backed history guarded by one global lock."""
+
+    def __init__(self):
+        """Initialize the history and its lock."""
+        super().__init__()
+        self._lock = threading.Lock()
+
+    def add_entry(self, operation, operands, result, timestamp=None):
+        """Add an entry while holding the lock."""
+        with self._lock:
+            super().add_entry(operation, operands, result, timestamp)
+
+    def get_history(self, limit=None):
+        """Copy the history while holding the lock."""
+        with self._lock:
+            return super().get_history(limit)
+
+
+def _worker(barrier: threading.Barrier, calls: int) -> None:
+    """Alternate add and multiply calls."""
+    barrier.wait()
+    for i in range(calls):
+        if i % 2:
+            multiply(i, 2)
+        else:
+            add(i, 2)
+
+
+def throughput(factory, threads: int, calls: int) -> float:
+    """Operations per second with `threads` threads making `calls` calls each."""
+    previous = set_history_backend(factory())
+    barrier = threading.Barrier(threads + 1)
+    workers = [
+        threading.Thread(target=_worker, args=(barrier, calls)) for _ in range(threads)
+    ]
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            for worker in workers:
+                worker.start()
+            barrier.wait()
+            start = time.perf_counter()
+            for worker in workers:
+                worker.join()
+            elapsed = time.perf_counter() - start
+    finally:
+        set_history_backend(previous)
+    return threads * calls / elapsed
+
+
+def main(calls: int = 20_000) -> None:
+    """Print throughput for 1-16 threads for both backends."""
+    print(f"Throughput, ops/s ({calls:,} calls per thread)")
+    print(f"  {'threads':>7} {'LockedHistory':>15} {'ConcurrentHistory':>18}")
+    for threads in (1, 2, 4, 8, 16):
+        locked = throughput(LockedHistory, threads, calls)
+        concurrent = throughput(ConcurrentHistory, threads, calls)
+        print(f"  {threads:>7} {locked:>15,.0f} {concurrent:>18,.0f}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20_000)
@@ -0,0 +1,119 @@
+"""
+Benchmark: size and speed of history snapshots vs JSON dumps
+
+Run with: python -m tests.benchmarks.bench_history_export [entries]
+"""
+
+import json
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+from src.history import CalculatorHistory, ColumnarHistory
+from src.persistence import HistoryView, export_history, load_history
+
+
+def build_history(entries: int) -> CalculatorHistory:
+    """A list-backed history of mixed operations."""
+    history = CalculatorHistory()
+    operations = ("add", "multiply", "divide", "power")
+    for i in range(entries):
+        history.add_entry(operations[i % 4], [i, 2.5], i * 2.5)
+    return history
+
+
+def export_json(history: CalculatorHistory, path: Path) -> None:
+    """The ad hoc dump: every entry dict, expression included."""
+    entries = [
+        {**entry, "timestamp": entry["timestamp"].isoformat()}
+        for entry in history.get_history()
+    ]
+    path.write_text(json.dumps(entries))
+
+
+def load_json(path: Path) -> ColumnarHistory:
+    """Load a JSON dump back into a columnar history."""
+    history = ColumnarHistory()
+    history.add_entries(
+        (
+            entry["operation"],
+            entry["operands"],
+            entry["result"],
+            datetime.fromisoformat(entry["timestamp"]),
+        )
+        for entry in reversed(json.loads(path.read_text()))
+    )
+    return history
+
+
+def timed(func, *args) -> float:
+    """Seconds taken by one call."""
+    start = time.perf_counter()
+    func(*args)
+    return time.perf_counter() - start
+
+
+def sum_results_view(path: Path) -> float:
+    """Open a snapshot in place and total its result column."""
+    with HistoryView(path) as view:
+        results = view.column("results")
+        total = sum(results)
+        results.release()
+    return total
+
+
+def sum_results_json(path: Path) -> float:
+    """Parse a JSON dump and total its results."""
+    return sum(entry["result"] for entry in json.loads(path.read_text()))
+
+
+def main(entries: int = 100_000) -> None:
+    """Print file size and export/load/scan times for both formats."""
+    history = build_history(entries)
+    with tempfile.TemporaryDirectory() as directory:
+        json_path = Path(directory) / "history.json"
+        snapshot_path = Path(directory) / "history.calc"
+        columnar = ColumnarHistory()
+        columnar.add_entries(
+            (e["operation"], e["operands"], e["result"], e["timestamp"])
+            for e in reversed(history.get_history())
+        )
+        rows = [
+            (
+                "export",
+                timed(export_json, history, json_path),
+                timed(export_history, history, snapshot_path),
+            ),
+            ("load", timed(load_json, json_path), timed(load_history, snapshot_path)),
+            (
+                "re-export",  # from a ColumnarHistory: columns are written as is
+                timed(export_json, columnar, json_path),
+                timed(export_history, columnar, snapshot_path),
+            ),
+            (
+                "sum results",
+                timed(sum_results_json, json_path),
+                timed(sum_results_view, snapshot_path),
+            ),
+        ]
+        json_size = json_path.stat().st_size
+        snapshot_size = snapshot_path.stat().st_size
+
+    print(f"History export ({entries:,} entries)")
+    print(
+        f"  {'size':<12} json {json_size / entries:8.1f} B/entry"
+        f"  snapshot {snapshot_size / entries:8.1f} B/entry"
+        f"  ({json_size / snapshot_size:.1f}x smaller)"
+    )
+    for label, json_seconds, snapshot_seconds in rows:
+        print(
+            f"  {label:<12} json {json_seconds * 1000:8.1f} ms"
+            f"        snapshot {snapshot_seconds * 1000:8.1f} ms"
+            f"  ({json_seconds / snapshot_seconds:.1f}x faster)"
+        )
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
@@ -0,0 +1,38 @@
+"""
+Benchmark: memory per history entry for each history backend
+
+Run with: python -m tests.benchmarks.bench_history_memory [entries]
+"""
+
+import sys
+import tracemalloc
+
+from src.history import CalculatorHistory, ColumnarHistory
+
+BACKENDS = {
+    "CalculatorHistory": CalculatorHistory,
+    "ColumnarHistory": ColumnarHistory,
+}
+
+
+def bytes_per_entry(factory, entries: int) -> float:
+    """Measure traced allocation per entry after recording `entries` calls."""
+    tracemalloc.start()
+    history = factory()
+    baseline, _ = tracemalloc.get_traced_memory()
+    for i in range(entries):
+        history.add_entry("multiply", [i, 2.5], i * 2.5)
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return (current - baseline) / entries
+
+
+def main(entries: int = 100_000) -> None:
+    """Print bytes per entry for every backend."""
+    print(f"History memory per entry ({entries:,} entries)")
+    for name, factory in BACKENDS.items():
+        print(f"  {name:<20} {bytes_per_entry(factory, entries):8.1f} bytes")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
@@ -0,0 +1,67 @@
+"""
+Benchmark: per-call cost of add/multiply with eager vs lazy expressions
+
+Run with: python -m tests.benchmarks.bench_lazy_expression [calls]
+"""
+
+import contextlib
+import io
+import sys
+import timeit
+from datetime import datetime
+
+from src.calculator import add, multiply, set_history_backend
+from src.history import CalculatorHistory
+
+
+class EagerHistory(CalculatorHistory):
+    """The previous behaviour: format every expression when it is recorded."""
+
+    def add_entry(self, operation, operands, result, timestamp=None):
+        """Add an entry with a pre-formatted expression."""
+        formatters = {
+            "add": lambda ops, res: f"{ops[0]} + {ops[1]} = {res}",
+            "subtract": lambda ops, res: f"{ops[0]} - {ops[1]} = {res}",
+            "multiply": lambda ops, res: f"{ops[0]} x {ops[1]} = {res}",
+            "divide": lambda ops, res: f"{ops[0]} ÷ {ops[1]} = {res}",
+            "power": lambda ops, res: f"{ops[0]} ^ {ops[1]} = {res}",
+            "sqrt": lambda ops, res: f"√{ops[0]} = {res}",
+        }
+        self._history.append(
+            {
+                "operation": operation,
+                "operands": operands.copy(),
+                "result": result,
+                "timestamp": timestamp or datetime.now(),
+                "expression": formatters[operation](operands, result),
+            }
+        )
+
+
+def per_call_ns(func, calls: int) -> float:
+    """Best-of-5 nanoseconds per call of func(1.5, 2.25)."""
+    timings = timeit.repeat(lambda: func(1.5, 2.25), number=calls, repeat=5)
+    return min(timings) / calls * 1e9
+
+
+def main(calls: int = 100_000) -> None:
+    """Print per-call cost of add and multiply for both history styles."""
+    print(f"Per-call cost ({calls:,} calls, best of 5)")
+    for name, func in (("add", add), ("multiply", multiply)):
+        results = {}
+        for label, factory in (("eager", EagerHistory), ("lazy", CalculatorHistory)):
+            previous = set_history_backend(factory())
+            try:
+                with contextlib.redirect_stdout(io.StringIO()):
+                    results[label] = per_call_ns(func, calls)
+            finally:
+                set_history_backend(previous)
+        saving = results["eager"] - results["lazy"]
+        print(
+            f"  {name:<9} eager {results['eager']:7.0f} ns"
+            f"  lazy {results['lazy']:7.0f} ns  saving {saving:6.0f} ns/call"
+        )
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
@@ -0,0 +1,42 @@
+"""
+Benchmark: cost of the fraction and decimal precision modes
+
+Times every scalar operation in a session of each precision mode against
+the default float path, with int operands (whose results the exact modes
+keep exact) and with operands whose results are not exact. History
+recording is included; logging is off.
+
+Run with: python -m tests.benchmarks.bench_precision [calls]
+"""
+
+import sys
+
+from src.calculator import PRECISION_MODES, Calculator
+from tests.benchmarks.suite import ns_per_call
+
+# Row label, calculator method and operands
+CASES = (
+    ("add", "add", (7, 3)),
+    ("divide", "divide", (7, 3)),
+    ("power", "power", (3, -4)),
+    ("sqrt (perfect square)", "sqrt", (15129,)),
+    ("sqrt", "sqrt", (12345,)),
+)
+
+
+def main(calls: int = 20_000) -> None:
+    """Print ns per call for each operation and precision mode."""
+    print(f"Precision modes ({calls:,} calls, ns per call, ratio to float)")
+    print(f"  {'':<24}" + "".join(f"{mode:>16}" for mode in PRECISION_MODES))
+    for label, operation, args in CASES:
+        row = []
+        for mode in PRECISION_MODES:
+            session = Calculator(log_sink=None, precision=mode)
+            call = getattr(session, operation)
+            row.append(ns_per_call(lambda c=call, a=args: c(*a), calls))
+        cells = "".join(f"{ns:>10,.0f} {ns / row[0]:>4.1f}x" for ns in row)
+        print(f"  {label:<24}{cells}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20_000)
@@ -0,0 +1,91 @@
+"""
+Benchmark: printing and slicing a large history
+
+Compares the previous ``print_history`` (copy the history with
+``get_history``, then one ``print`` per entry) against the streaming
+version that formats from a view and writes in chunks, both into a
+buffered file, and reports the traced memory peak of a second run. Also
+times reading the newest ten entries by copying the whole history (what
+``get_history(limit=10)`` used to do) against ``get_history(limit=10)``,
+which now slices a view.
+
+Run with: python -m tests.benchmarks.bench_print_history [entries]
+"""
+
+import os
+import sys
+import time
+import tracemalloc
+from collections.abc import Callable
+from typing import TextIO
+
+from src.calculator import (
+    add,
+    clear_calculation_history,
+    get_history_backend,
+    print_history,
+    set_log_sink,
+)
+
+
+def print_per_entry(file: TextIO) -> None:
+    """The previous implementation: copy, then print entry by entry."""
+    history = get_history_backend().get_history()
+    print(f"\n📊 Calculation History ({len(history)} entries):", file=file)
+    print("-" * 50, file=file)
+    for i, entry in enumerate(history, 1):
+        timestamp = entry["timestamp"].strftime("%H:%M:%S")
+        print(f"{i:2d}. [{timestamp}] {entry['expression']}", file=file)
+
+
+def measure(func: Callable[[], object], entries: int) -> tuple[float, int]:
+    """Seconds of one call, and traced peak bytes of another.
+
+    Each call gets freshly recorded entries, so none sees fields cached by
+    an earlier run.
+    """
+    fill(entries)
+    start = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - start
+    fill(entries)
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak
+
+
+def fill(entries: int) -> None:
+    """Record ``entries`` fresh calculations."""
+    clear_calculation_history()
+    for i in range(entries):
+        add(i, 0.5)
+
+
+def main(entries: int = 100_000) -> None:
+    """Print time and peak memory of both ways of printing the history."""
+    set_log_sink(None)
+    print(f"Printing history ({entries:,} entries)")
+    with open(os.devnull, "w", encoding="utf-8") as devnull:  # noqa: PTH123
+        for label, func in (
+            ("print per entry", lambda: print_per_entry(devnull)),
+            ("streaming", lambda: print_history(file=devnull)),
+        ):
+            elapsed, peak = measure(func, entries)
+            print(f"  {label:<16} {elapsed * 1e3:9.1f} ms  peak {peak / 1e6:7.1f} MB")
+
+    history = get_history_backend()
+    for label, func in (
+        ("copy, then [:10]", lambda: history.get_history()[:10]),
+        ("get_history(10)", lambda: history.get_history(10)),
+    ):
+        start = time.perf_counter()
+        for _ in range(100):
+            func()
+        per_call = (time.perf_counter() - start) / 100
+        print(f"  {label:<16} {per_call * 1e6:9.1f} µs")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
@@ -0,0 +1,146 @@
+"""
+Load test: throughput and latency of the calculator server on localhost
+
+Starts ``python -m src.server`` with and without micro-batching (or targets
+a running server with --port) and drives it from several pipelining client
+connections.
+
+Run with: python -m tests.benchmarks.bench_server [--requests N] [--port P]
+"""
+
+import argparse
+import asyncio
+import random
+import subprocess
+import sys
+import time
+from contextlib import contextmanager
+
+from src.server import CalculatorClient
+
+OPERATIONS = ("add", "multiply", "divide", "power", "sqrt")
+
+
+def make_request(rng: random.Random) -> tuple:
+    """A random float operation."""
+    operation = rng.choice(OPERATIONS)
+    if operation == "sqrt":
+        return operation, rng.uniform(0, 1000)
+    if operation == "power":
+        return operation, rng.uniform(0, 10), rng.uniform(-3, 3)
+    return operation, rng.uniform(-1000, 1000), rng.uniform(1, 1000)
+
+
+async def drive(
+    client: CalculatorClient, requests: list[tuple], inflight: int
+) -> list[float]:
+    """Send requests with up to ``inflight`` outstanding; return latencies."""
+    latencies: list[float] = []
+    slots = asyncio.Semaphore(inflight)
+
+    async def one(request: tuple) -> None:
+        async with slots:
+            start = time.perf_counter()
+            await client.call(*request)
+            latencies.append(time.perf_counter() - start)
+
+    await asyncio.gather(*(one(request) for request in requests))
+    return latencies
+
+
+async def load(
+    host: str, port: int, connections: int, requests: int, inflight: int
+) -> tuple[float, list[float]]:
+    """Run the load; return elapsed seconds and all latencies."""
+    rng = random.Random(42)
+    per_connection = requests // connections
+    clients = [await CalculatorClient.connect(host, port) for _ in range(connections)]
+    workloads = [[make_request(rng) for _ in range(per_connection)] for _ in clients]
+    start = time.perf_counter()
+    results = await asyncio.gather(
+        *(
+            drive(client, work, inflight)
+            for client, work in zip(clients, workloads, strict=True)
+        )
+    )
+    elapsed = time.perf_counter() - start
+    for client in clients:
+        await client.close()
+    return elapsed, [latency for latencies in results for latency in latencies]
+
+
+def percentile(values: list[float], fraction: float) -> float:
+    """Nearest-rank percentile of unsorted values."""
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+@contextmanager
+def local_server(max_batch: int, max_delay_ms: float):
+    """Start ``python -m src.server`` on a free port; yield its port."""
+    process = subprocess.Popen(
+        [
+            sys.executable,
+            "-m",
+            "src.server",
+            "--port",
+            "0",
+            "--max-batch",
+            str(max_batch),
+            "--max-delay-ms",
+            str(max_delay_ms),
+        ],
+        stdout=subprocess.PIPE,
+        text=True,
+    )
+    try:
+        line = process.stdout.readline()  # "Listening on host:port"
+        yield int(line.rsplit(":", 1)[1])
+    finally:
+        process.terminate()
+        process.wait()
+
+
+def report(label: str, requests: int, elapsed: float, latencies: list[float]):
+    """Print one result row."""
+    print(
+        f"  {label:<14} {requests / elapsed:>10,.0f} req/s"
+        f"  p50 {percentile(latencies, 0.50) * 1000:7.2f} ms"
+        f"  p99 {percentile(latencies, 0.99) * 1000:7.2f} ms"
+    )
+
+
+def main() -> None:
+    """Parse arguments and run the load test."""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, help="Target a running server")
+    parser.add_argument("--connections", type=int, default=8)
+    parser.add_argument("--requests", type=int, default=40_000)
+    parser.add_argument("--inflight", type=int, default=64, help="Per connection")
+    args = parser.parse_args()
+
+    total = args.requests // args.connections * args.connections
+    print(
+        f"Server load test ({total:,} requests, {args.connections} connections,"
+        f" {args.inflight} in flight each)"
+    )
+    if args.port is not None:
+        elapsed, latencies = asyncio.run(
+            load(args.host, args.port, args.connections, total, args.inflight)
+        )
+        report(f"{args.host}:{args.port}", total, elapsed, latencies)
+        return
+    for label, max_batch, max_delay_ms in (
+        ("unbatched", 1, 0),
+        ("micro-batched", 256, 0.5),
+    ):
+        with local_server(max_batch, max_delay_ms) as port:
+            elapsed, latencies = asyncio.run(
+                load(args.host, port, args.connections, total, args.inflight)
+            )
+        report(label, total, elapsed, latencies)
+
+
+if __name__ == "__main__":
+    main()
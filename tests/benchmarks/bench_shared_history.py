@@ -0,0 +1,125 @@
+"""
+Benchmark: combined history of worker processes
+
+Each of four forked workers records ``entries`` calculations. The baseline
+keeps a ``CalculatorHistory`` per worker and sends every entry back to
+the parent over a pipe, where it is merged into one history for the
+summary. The shared version records into a ``SharedMemoryHistory`` that
+the parent reads directly. Also times a single ``add_entry`` on each
+backend, and the parent-side count, last result and summary.
+
+Run with: python -m tests.benchmarks.bench_shared_history [entries]
+"""
+
+import multiprocessing
+import sys
+import time
+from collections.abc import Callable
+
+from src.history import CalculatorHistory
+from src.shared_history import SharedMemoryHistory
+
+WORKERS = 4
+
+
+def record(history: CalculatorHistory, count: int) -> None:
+    """Record ``count`` calculations into a history."""
+    for i in range(count):
+        history.add_entry("multiply", [i, 1.5], i * 1.5)
+
+
+def pickled_worker(connection, count: int) -> None:
+    """Baseline worker: record locally, then send the entries back."""
+    history = CalculatorHistory()
+    record(history, count)
+    connection.send(
+        [
+            (entry["operation"], entry["operands"], entry["result"], entry["timestamp"])
+            for entry in history.view(oldest_first=True)
+        ]
+    )
+    connection.close()
+
+
+def shared_worker(history: SharedMemoryHistory, count: int) -> None:
+    """Shared worker: record straight into the shared block."""
+    record(history, count)
+
+
+def run_pickled(context, count: int) -> CalculatorHistory:
+    """Merge worker histories sent over pipes into one history."""
+    merged = CalculatorHistory()
+    pipes, workers = [], []
+    for _ in range(WORKERS):
+        receiver, sender = context.Pipe(duplex=False)
+        worker = context.Process(target=pickled_worker, args=(sender, count))
+        worker.start()
+        pipes.append(receiver)
+        workers.append(worker)
+    for receiver in pipes:
+        merged.add_entries(receiver.recv())
+    for worker in workers:
+        worker.join()
+    merged.get_summary()
+    return merged
+
+
+def run_shared(context, history: SharedMemoryHistory, count: int) -> None:
+    """Let workers record into the shared block, then summarize it."""
+    workers = [
+        context.Process(target=shared_worker, args=(history, count))
+        for _ in range(WORKERS)
+    ]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    history.get_summary()
+
+
+def per_call(function: Callable[[], object], calls: int) -> float:
+    """Mean seconds per call."""
+    start = time.perf_counter()
+    for _ in range(calls):
+        function()
+    return (time.perf_counter() - start) / calls
+
+
+def main(entries: int = 50_000) -> None:
+    """Print the timings."""
+    context = multiprocessing.get_context("fork")
+    print(f"{WORKERS} workers x {entries:,} entries, combined summary in the parent")
+
+    start = time.perf_counter()
+    run_pickled(context, entries)
+    pickled = time.perf_counter() - start
+
+    with SharedMemoryHistory(lanes=WORKERS + 1, lane_capacity=entries) as shared:
+        start = time.perf_counter()
+        run_shared(context, shared, entries)
+        in_block = time.perf_counter() - start
+        print(f"  entries over pipes     {pickled * 1e3:8.1f} ms")
+        print(
+            f"  shared memory          {in_block * 1e3:8.1f} ms"
+            f"  ({pickled / in_block:.1f}x)"
+        )
+
+        print("Parent-side reads of the shared block")
+        for label, read, calls in (
+            ("get_history_count", shared.get_history_count, 10_000),
+            ("get_last_result", shared.get_last_result, 10_000),
+            ("get_history(limit=10)", lambda: shared.get_history(10), 100),
+            ("get_summary", shared.get_summary, 3),
+        ):
+            print(f"  {label:<22} {per_call(read, calls) * 1e6:10.1f} µs")
+
+    print("add_entry")
+    local = CalculatorHistory()
+    with SharedMemoryHistory(lanes=1, lane_capacity=entries) as shared:
+        for label, history in (("CalculatorHistory", local), ("shared", shared)):
+            seconds = per_call(lambda h=history: h.add_entry("add", [1, 2], 3), entries)
+            print(f"  {label:<22} {seconds * 1e9:10.0f} ns")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 50_000)
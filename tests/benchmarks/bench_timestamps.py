@@ -0,0 +1,88 @@
+"""
+Benchmark: cost of timestamping history entries
+
+Compares recording with an eagerly built ``datetime.now()`` (what every
+entry paid before entries were stamped with integer nanoseconds) against the
+default stamp for each backend, times a full ``Calculator.add`` call, and
+shows what building the ``datetime`` costs when a timestamp is first read.
+
+Run with: python -m tests.benchmarks.bench_timestamps [calls]
+"""
+
+import gc
+import sys
+import time
+from collections.abc import Callable
+from datetime import datetime
+from typing import Any
+
+from src.calculator import Calculator
+from src.history import CalculatorHistory, ColumnarHistory, ConcurrentHistory
+
+
+def per_call_ns(
+    factory: Callable[[], Any], call: Callable[[Any, int], Any], calls: int
+) -> float:
+    """Nanoseconds per ``call(target, i)`` on a fresh target, best of seven.
+
+    The garbage collector is paused while timing, as ``timeit`` does, so
+    collections of the growing history do not swamp the per-call cost.
+    """
+    best = float("inf")
+    for _ in range(7):
+        target = factory()
+        gc.collect()
+        gc.disable()
+        try:
+            start = time.perf_counter_ns()
+            for i in range(calls):
+                call(target, i)
+            best = min(best, (time.perf_counter_ns() - start) / calls)
+        finally:
+            gc.enable()
+    return best
+
+
+def eager_add(history: Any, i: int) -> None:
+    """Record with a ``datetime.now()`` built up front."""
+    history.add_entry("add", [i, 1], i + 1, datetime.now())
+
+
+def lazy_add(history: Any, i: int) -> None:
+    """Record with the backend's default timestamp."""
+    history.add_entry("add", [i, 1], i + 1)
+
+
+def main(calls: int = 100_000) -> None:
+    """Print per-call costs with eager and default timestamps."""
+    print(f"History timestamps ({calls:,} calls, ns per call)")
+    print(f"  {'':<28} {'datetime.now()':>14} {'default':>10}")
+    clock = (
+        per_call_ns(object, lambda _, __: datetime.now(), calls),
+        per_call_ns(object, lambda _, __: time.time_ns(), calls),
+    )
+    print(f"  {'clock read':<28} {clock[0]:>14.0f} {clock[1]:>10.0f}")
+    for backend in (CalculatorHistory, ConcurrentHistory, ColumnarHistory):
+        eager = per_call_ns(backend, eager_add, calls)
+        lazy = per_call_ns(backend, lazy_add, calls)
+        label = f"{backend.__name__}.add_entry"
+        print(f"  {label:<28} {eager:>14.0f} {lazy:>10.0f}")
+
+    add = per_call_ns(
+        lambda: Calculator(log_sink=None), lambda s, i: s.add(i, 1), calls
+    )
+    print(f"  {'Calculator.add':<28} {'':>14} {add:>10.0f}")
+
+    session = Calculator(log_sink=None)
+    for i in range(calls):
+        session.add(i, 1)
+    entries = session.history.get_history()
+    start = time.perf_counter_ns()
+    for entry in entries:
+        entry["timestamp"]
+    first_read = (time.perf_counter_ns() - start) / calls
+    print(f"  {'first timestamp read':<28} {'':>14} {first_read:>10.0f}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
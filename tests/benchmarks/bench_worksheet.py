@@ -0,0 +1,66 @@
+"""
+Benchmark: incremental worksheet updates vs rerunning every chain
+
+Builds worksheets of independent chains (one input feeding ``depth``
+formula cells each) and times changing a single input, against rerunning
+every calculation in the worksheet as a script would.
+
+Run with: python -m tests.benchmarks.bench_worksheet [depth]
+"""
+
+import statistics
+import sys
+import time
+
+from src.calculator import Calculator
+from src.worksheet import Worksheet
+
+OPERATIONS = ("add", "multiply", "subtract", "divide")
+
+
+def build(chains: int, depth: int) -> Worksheet:
+    """A worksheet of ``chains`` chains of ``depth`` formula cells."""
+    sheet = Worksheet(Calculator())
+    for chain in range(chains):
+        previous = f"in{chain}"
+        sheet.set_input(previous, chain + 1)
+        for step in range(depth):
+            name = f"c{chain}_{step}"
+            sheet.define(name, OPERATIONS[step % 4], previous, 1.5)
+            previous = name
+    return sheet
+
+
+def rerun_all(session: Calculator, chains: int, depth: int) -> None:
+    """Recompute every chain from scratch, as a script rerun would."""
+    for chain in range(chains):
+        value = chain + 1
+        for step in range(depth):
+            value = getattr(session, OPERATIONS[step % 4])(value, 1.5)
+
+
+def main(depth: int = 20) -> None:
+    """Print per-update times for growing worksheets."""
+    print(f"Worksheet updates (chains of {depth} cells, one input changed)")
+    for chains in (100, 1_000, 10_000):
+        sheet = build(chains, depth)
+        timings = []
+        for i in range(201):
+            start = time.perf_counter()
+            sheet.set_input(f"in{i % chains}", i + 0.5)
+            timings.append(time.perf_counter() - start)
+        # Median, so an occasional garbage collection of the large heap
+        # does not stand in for the cost of a typical update
+        incremental = statistics.median(timings)
+
+        start = time.perf_counter()
+        rerun_all(Calculator(), chains, depth)
+        rerun = time.perf_counter() - start
+        print(
+            f"  {len(sheet):>8,} cells  update (median) {incremental * 1e6:7.1f} µs"
+            f"  rerun all {rerun * 1e3:8.1f} ms  ({rerun / incremental:,.0f}x)"
+        )
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20)
@@ -0,0 +1,228 @@
+"""
+Benchmark suite covering every operation and history path
+
+Each benchmark returns ``{metric_name: (value, unit)}`` where lower values
+are better. ``run_suite`` collects them into a JSON-serializable report and
+``compare_results`` flags metrics that regressed beyond a threshold.
+"""
+
+import contextlib
+import platform
+import time
+import timeit
+import tracemalloc
+from collections.abc import Callable, Iterator
+from datetime import datetime
+from typing import Any
+
+from src.calculator import (
+    PRECISION_MODES,
+    Calculator,
+    add,
+    divide,
+    multiply,
+    power,
+    set_history_backend,
+    set_log_sink,
+    sqrt,
+    subtract,
+)
+from src.history import CalculatorHistory, ColumnarHistory, RingBufferHistory
+
+Metrics = dict[str, tuple[float, str]]
+
+DEFAULT_SIZES = (1_000, 10_000, 100_000)
+FULL_SIZES = (1_000, 10_000, 100_000, 1_000_000, 10_000_000)
+
+HISTORY_BACKENDS: dict[str, Callable[[], CalculatorHistory]] = {
+    "list": CalculatorHistory,
+    "columnar": ColumnarHistory,
+    "ring": lambda: RingBufferHistory(max_size=100_000),
+}
+
+
+@contextlib.contextmanager
+def isolated_calculator() -> Iterator[None]:
+    """Record into a throwaway history with operation logging disabled."""
+    previous_history = set_history_backend(CalculatorHistory())
+    previous_sink = set_log_sink(None)
+    try:
+        yield
+    finally:
+        set_history_backend(previous_history)
+        set_log_sink(previous_sink)
+
+
+def ns_per_call(func: Callable[[], Any], number: int, repeat: int = 5) -> float:
+    """Best-of-``repeat`` nanoseconds per call of func."""
+    return min(timeit.repeat(func, number=number, repeat=repeat)) / number * 1e9
+
+
+def bench_scalar_operations(calls: int) -> Metrics:
+    """Per-call cost of every scalar operation, including history recording."""
+    cases = {
+        "add": lambda: add(1.5, 2.25),
+        "subtract": lambda: subtract(7, 3),
+        "multiply": lambda: multiply(1.5, 2.25),
+        "divide": lambda: divide(7.0, 3.0),
+        "power": lambda: power(1.0001, 20),
+        "sqrt": lambda: sqrt(12345.0),
+    }
+    metrics = {}
+    for name, func in cases.items():
+        with isolated_calculator():
+            metrics[f"scalar.{name}"] = (ns_per_call(func, calls), "ns/op")
+    return metrics
+
+
+def bench_precision_modes(calls: int) -> Metrics:
+    """Per-call cost of divide and sqrt of ints in each precision mode."""
+    metrics = {}
+    for mode in PRECISION_MODES:
+        session = Calculator(log_sink=None, precision=mode)
+        metrics[f"precision.{mode}.divide"] = (
+            ns_per_call(lambda s=session: s.divide(7, 3), calls),
+            "ns/op",
+        )
+        metrics[f"precision.{mode}.sqrt"] = (
+            ns_per_call(lambda s=session: s.sqrt(15129), calls),
+            "ns/op",
+        )
+    return metrics
+
+
+def bench_history_append(calls: int) -> Metrics:
+    """Per-entry cost of ``add_entry`` for each history backend."""
+    metrics = {}
+    for name, factory in HISTORY_BACKENDS.items():
+        history = factory()
+        metrics[f"history.append.{name}"] = (
+            ns_per_call(lambda h=history: h.add_entry("add", [1, 2], 3), calls),
+            "ns/op",
+        )
+    return metrics
+
+
+def filled_history(factory: Callable[[], CalculatorHistory], size: int):
+    """Build a history holding ``size`` entries with a fixed timestamp."""
+    history = factory()
+    timestamp = datetime.now()
+    operations = ("add", "subtract", "multiply", "divide")
+    for i in range(size):
+        history.add_entry(operations[i % 4], [i, 2], i + 2, timestamp)
+    return history
+
+
+def bench_history_queries(sizes: tuple[int, ...]) -> Metrics:
+    """Latency of get_history(limit), full get_history and get_summary."""
+    metrics = {}
+    for name, factory in HISTORY_BACKENDS.items():
+        for size in sizes:
+            history = filled_history(factory, size)
+            prefix = f"history.{name}.{size}"
+            metrics[f"{prefix}.get_history_limit_10"] = (
+                ns_per_call(lambda h=history: h.get_history(limit=10), 100),
+                "ns/op",
+            )
+            metrics[f"{prefix}.get_summary"] = (
+                ns_per_call(history.get_summary, 100),
+                "ns/op",
+            )
+            if size <= 100_000:
+                metrics[f"{prefix}.get_history_full"] = (
+                    ns_per_call(history.get_history, 3, repeat=3),
+                    "ns/op",
+                )
+            del history
+    return metrics
+
+
+def _rejected_power(a: int, b: int) -> None:
+    """Call power expecting it to raise OverflowError."""
+    with contextlib.suppress(OverflowError):
+        power(a, b)
+
+
+def bench_big_int_power() -> Metrics:
+    """Cost of big-integer power, including the representability check."""
+    cases = {"3^1000": (3, 1000), "3^5000": (3, 5000), "7^5000": (7, 5000)}
+    metrics = {}
+    with isolated_calculator():
+        for label, (a, b) in cases.items():
+            metrics[f"power.bigint.{label}"] = (
+                ns_per_call(lambda a=a, b=b: power(a, b), 20, repeat=3),
+                "ns/op",
+            )
+        # 7^9000 has 7606 digits, past the default 4300-digit limit: measures
+        # the rejection path
+        metrics["power.bigint.overflow.7^9000"] = (
+            ns_per_call(lambda: _rejected_power(7, 9000), 20, repeat=3),
+            "ns/op",
+        )
+    return metrics
+
+
+def bench_history_memory(entries: int) -> Metrics:
+    """Traced bytes per history entry for each backend."""
+    metrics = {}
+    for name, factory in HISTORY_BACKENDS.items():
+        tracemalloc.start()
+        history = factory()
+        baseline, _ = tracemalloc.get_traced_memory()
+        for i in range(entries):
+            history.add_entry("multiply", [i, 2.5], i * 2.5)
+        current, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        metrics[f"memory.{name}"] = ((current - baseline) / entries, "bytes/entry")
+    return metrics
+
+
+def run_suite(sizes: tuple[int, ...] = DEFAULT_SIZES, calls: int = 20_000) -> dict:
+    """Run every benchmark and return a JSON-serializable report."""
+    metrics: Metrics = {}
+    metrics.update(bench_scalar_operations(calls))
+    metrics.update(bench_precision_modes(calls))
+    metrics.update(bench_history_append(calls))
+    metrics.update(bench_history_queries(sizes))
+    metrics.update(bench_big_int_power())
+    metrics.update(bench_history_memory(min(calls, 100_000)))
+    return {
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "results": {
+            name: {"value": value, "unit": unit}
+            for name, (value, unit) in metrics.items()
+        },
+    }
+
+
+def compare_results(
+    baseline: dict, current: dict, threshold: float = 0.10
+) -> list[dict[str, Any]]:
+    """Return the metrics that got worse than baseline by more than threshold.
+
+    Args:
+        baseline: A report produced by ``run_suite``
+        current: A newer report
+        threshold: Allowed relative slowdown, e.g. 0.10 for 10%
+
+    Returns:
+        One dict per regressed metric with its name, both values and ratio
+    """
+    regressions = []
+    for name, result in current["results"].items():
+        previous = baseline["results"].get(name)
+        if previous is None or previous["value"] <= 0:
+            continue
+        ratio = result["value"] / previous["value"]
+        if ratio > 1 + threshold:
+            regressions.append(
+                {
+                    "metric": name,
+                    "baseline": previous["value"],
+                    "current": result["value"],
+                    "ratio": ratio,
+                }
+            )
+    return regressions
@@ -0,0 +1,169 @@
+"""
+Test batch (vectorized) operations for the calculator
+"""
+
+import math
+
+import pytest
+
+from src.calculator import (
+    add_many,
+    clear_calculation_history,
+    divide_many,
+    get_calculation_history,
+    get_history_count,
+    multiply_many,
+    power,
+    power_many,
+    sqrt_many,
+    subtract_many,
+)
+
+
+class TestPythonBatches:
+    """Test batch operations over plain Python sequences."""
+
+    def setup_method(self):
+        """Clear history before each test."""
+        clear_calculation_history()
+
+    def test_binary_operations(self):
+        """Test element-wise binary operations."""
+        assert add_many([1, 2, 3], [4, 5, 6]) == [5, 7, 9]
+        assert subtract_many([5, 5], [1, 2]) == [4, 3]
+        assert multiply_many([2, 3], [4, 5]) == [8, 15]
+        assert divide_many([10, 9], [4, 3]) == [2.5, 3.0]
+        assert power_many([2, 3], [3, 2]) == [8, 9]
+        assert sqrt_many([16, 25]) == [4.0, 5.0]
+
+    def test_batch_recorded_as_single_entry(self):
+        """Test that a whole batch produces one compact history entry."""
+        add_many(list(range(100)), list(range(100)))
+
+        assert get_history_count() == 1
+        entry = get_calculation_history()[0]
+        assert entry["operation"] == "add_many"
+        assert entry["operands"] == [100]
+        assert entry["result"] == 100
+
+    def test_divide_by_zero_raises(self):
+        """Test that a zero divisor raises the scalar error."""
+        with pytest.raises(ValueError, match="Cannot divide 3 by zero"):
+            divide_many([1, 3], [1, 0])
+        assert get_history_count() == 0
+
+    def test_divide_by_zero_masked(self):
+        """Test that a zero divisor can be masked with NaN."""
+        results = divide_many([1, 3], [1, 0], errors="mask")
+        assert results[0] == 1.0
+        assert math.isnan(results[1])
+        assert get_calculation_history()[0]["result"] == 1
+
+    def test_negative_sqrt_masked(self):
+        """Test that negative square roots can be masked."""
+        results = sqrt_many([4, -4], errors="mask")
+        assert results[0] == 2.0
+        assert math.isnan(results[1])
+
+    def test_power_overflow_per_element(self):
+        """Test that overflow is detected for individual elements."""
+        with pytest.raises(OverflowError, match="Result too large to represent"):
+            power_many([2, 2], [3, 1000000])
+        results = power_many([2, 2], [3, 1000000], errors="mask")
+        assert results[0] == 8
+        assert math.isnan(results[1])
+
+    def test_input_validation(self):
+        """Test type, length and error mode validation."""
+        with pytest.raises(TypeError, match="Division requires numeric inputs"):
+            divide_many([1, "2"], [1, 1])
+        with pytest.raises(ValueError, match="same length"):
+            add_many([1, 2], [1])
+        with pytest.raises(ValueError, match="errors must be one of"):
+            add_many([1], [1], errors="ignore")
+
+
+class TestNumpyBatches:
+    """Test batch operations over NumPy arrays."""
+
+    def setup_method(self):
+        """Clear history before each test."""
+        clear_calculation_history()
+
+    def test_vectorized_results(self):
+        """Test that arrays are evaluated in one vectorized pass."""
+        np = pytest.importorskip("numpy")
+        a = np.array([1.0, 4.0, 9.0])
+        b = np.array([2.0, 2.0, 3.0])
+
+        np.testing.assert_array_equal(add_many(a, b), [3.0, 6.0, 12.0])
+        np.testing.assert_array_equal(divide_many(a, b), [0.5, 2.0, 3.0])
+        np.testing.assert_array_equal(sqrt_many(a), [1.0, 2.0, 3.0])
+        assert get_history_count() == 3
+
+    def test_divide_by_zero(self):
+        """Test zero divisors in arrays raise or are masked."""
+        np = pytest.importorskip("numpy")
+        with pytest.raises(ValueError, match="Cannot divide 5 by zero"):
+            divide_many(np.array([1, 5]), np.array([1, 0]))
+
+        results = divide_many(np.array([1, 5]), np.array([1, 0]), errors="mask")
+        assert results[0] == 1.0
+        assert np.isnan(results[1])
+        assert get_calculation_history()[0]["result"] == 1
+
+    def test_integer_power_overflow_detected(self):
+        """Test int64 overflow is reported instead of silently wrapping."""
+        np = pytest.importorskip("numpy")
+        a = np.array([2, 2], dtype=np.int64)
+        b = np.array([10, 100], dtype=np.int64)
+
+        with pytest.raises(OverflowError):
+            power_many(a, b)
+        results = power_many(a, b, errors="mask")
+        assert results[0] == 1024
+        assert np.isnan(results[1])
+
+    def test_integer_power_at_the_dtype_bounds(self):
+        """Test powers landing exactly on the int64 bounds are checked exactly."""
+        np = pytest.importorskip("numpy")
+        top = 2**63 - 1
+        a = np.array([2, -2, 2, top], dtype=np.int64)
+        b = np.array([63, 63, 62, 1], dtype=np.int64)
+
+        with pytest.raises(OverflowError):
+            power_many(a, b)
+        assert np.isnan(power_many(a, b, errors="mask")[0])
+        assert power_many(a[1:], b[1:]).tolist() == [-(2**63), 2**62, top]
+
+    def test_integer_overflow_gives_exact_ints(self):
+        """Test add, subtract and multiply overflowing int64 match scalar ints."""
+        np = pytest.importorskip("numpy")
+        top = np.array([2**63 - 1, 2**62], dtype=np.int64)
+
+        assert add_many(top, np.array([0, 0])).dtype == np.int64
+        assert add_many(top, np.array([1, 0])).tolist() == [2**63, 2**62]
+        differences = subtract_many(-top, np.array([2, 0]))
+        assert differences.tolist() == [-(2**63) - 1, -(2**62)]
+        assert multiply_many(top, np.array([1, 4])).tolist() == [2**63 - 1, 2**64]
+        unsigned = np.array([1], dtype=np.uint64)
+        assert subtract_many(unsigned, unsigned * 3).tolist() == [-2]
+
+    def test_fractional_power_of_negative_base(self):
+        """Test negative bases with fractional exponents match scalar power."""
+        np = pytest.importorskip("numpy")
+        a = np.array([-8.0, 4.0, 0.0])
+        b = np.array([0.5, 0.5, -1.0])
+
+        with pytest.raises(ZeroDivisionError):
+            power_many(a, b)
+        results = power_many(a, b, errors="mask")
+        assert results[0] == power(-8.0, 0.5)
+        assert results[1] == 2.0
+        assert np.isnan(results[2])
+
+    def test_non_numeric_array_rejected(self):
+        """Test that non-numeric arrays raise TypeError."""
+        np = pytest.importorskip("numpy")
+        with pytest.raises(TypeError, match="Argument must be a number"):
+            sqrt_many(np.array(["a", "b"]))
@@ -0,0 +1,31 @@
+"""
+Test the benchmark report comparison used to catch regressions
+"""
+
+from tests.benchmarks.suite import compare_results
+
+
+def _report(**values):
+    """Build a minimal benchmark report."""
+    return {
+        "results": {
+            name: {"value": value, "unit": "ns/op"} for name, value in values.items()
+        }
+    }
+
+
+class TestCompareResults:
+    """Test regression detection between two benchmark reports."""
+
+    def test_flags_only_regressions_beyond_threshold(self):
+        """Test metrics slower than the threshold allows are reported."""
+        baseline = _report(add=100.0, sqrt=100.0, power=100.0)
+        current = _report(add=105.0, sqrt=150.0, power=50.0)
+
+        regressions = compare_results(baseline, current, threshold=0.10)
+        assert [item["metric"] for item in regressions] == ["sqrt"]
+        assert regressions[0]["ratio"] == 1.5
+
+    def test_new_metrics_ignored(self):
+        """Test metrics missing from the baseline never fail the comparison."""
+        assert compare_results(_report(), _report(add=1.0)) == []
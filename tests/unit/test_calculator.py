@@ -5,7 +5,17 @@ Students start with 2 passing tests, then add more
 
 import pytest
 
-from src.calculator import add, divide, multiply, power, sqrt, subtract
+from src.calculator import (
+    add,
+    divide,
+    estimate_power_size,
+    get_calculation_history,
+    multiply,
+    power,
+    set_power_limits,
+    sqrt,
+    subtract,
+)
 
 
 class TestBasicOperations:
@@ -76,4 +86,70 @@ class TestPowerSqrt:
             sqrt(-4)
 
 
+class TestPowerLimits:
+    """Test the size pre-check and modular exponentiation for power."""
+
+    def test_estimate_power_size(self):
+        """Test the digit/bit estimate matches the real result."""
+        for a, b in [(2, 10), (10, 5), (7, 1234), (-3, 999), (12345, 67)]:
+            digits, bits = estimate_power_size(a, b)
+            result = abs(a**b)
+            assert abs(digits - len(str(result))) <= 1
+            assert abs(bits - result.bit_length()) <= 1
+
+    def test_exponents_too_large_for_a_float(self):
+        """Test exponents past the float range get the usual overflow error."""
+        digits, bits = estimate_power_size(2, 10**400)
+        assert bits == 10**400 + 1
+        assert abs(digits - (10**400 * 30103 // 100000 + 1)) < 10**396
+        with pytest.raises(OverflowError, match="Result too large to represent"):
+            power(2, 10**400)
+        with pytest.raises(OverflowError, match="Result too large to represent"):
+            power(-3, 2**1024)
+        with pytest.raises(OverflowError, match="Result too large to represent"):
+            power(2**100, 2**1020)  # b fits a float, but b * log2(a) does not
+
+    def test_trivial_bases_with_huge_exponents(self):
+        """Test results that are obviously small are no longer rejected."""
+        assert power(1, 50000) == 1
+        assert power(-1, 50001) == -1
+        assert power(0, 10**9) == 0
+
+    def test_digit_limit_is_exact(self):
+        """Test the limit is enforced exactly at the boundary."""
+        previous = set_power_limits(max_digits=10)
+        try:
+            assert power(10, 9) == 10**9
+            assert power(9, 10) == 9**10
+            with pytest.raises(OverflowError, match="Result too large"):
+                power(10, 10)
+        finally:
+            set_power_limits(*previous)
+
+    def test_bit_limit(self):
+        """Test the optional bit-length limit."""
+        previous = set_power_limits(max_digits=None, max_bits=64)
+        try:
+            assert power(2, 63) == 2**63
+            with pytest.raises(OverflowError):
+                power(2, 64)
+        finally:
+            set_power_limits(*previous)
+
+    def test_modular_exponentiation(self):
+        """Test huge exponents are cheap with a modulus."""
+        assert power(3, 10**18, modulus=1_000_000_007) == pow(3, 10**18, 1_000_000_007)
+        assert get_calculation_history(limit=1)[0]["operands"][2] == 1_000_000_007
+        assert get_calculation_history(limit=1)[0]["expression"].startswith(
+            "3 ^ 1000000000000000000 mod 1000000007 = "
+        )
+
+    def test_modular_exponentiation_validation(self):
+        """Test modulus arguments are validated."""
+        with pytest.raises(TypeError, match="integer arguments"):
+            power(2.0, 3, modulus=5)
+        with pytest.raises(ValueError, match="Modulus cannot be zero"):
+            power(2, 3, modulus=0)
+
+
 # TODO: Students will add TestMultiplyDivide class
@@ -0,0 +1,131 @@
+"""
+Test the streaming command-line pipeline
+"""
+
+import json
+
+import pytest
+from click.testing import CliRunner
+
+from src.calculator import (
+    get_history_backend,
+    get_log_sink,
+    set_history_backend,
+    set_log_sink,
+)
+from src.cli import main, parse_record, write_chunked
+from src.history import NullHistory
+
+
+@pytest.fixture(autouse=True)
+def restore_calculator():
+    """Undo the history and logging changes the CLI makes."""
+    history, sink = get_history_backend(), get_log_sink()
+    yield
+    set_history_backend(history)
+    set_log_sink(sink)
+
+
+def run(args, stdin=""):
+    """Invoke the CLI and return the click result."""
+    return CliRunner().invoke(main, args, input=stdin)
+
+
+class TestParsing:
+    """Test record parsing."""
+
+    @pytest.mark.parametrize(
+        ("text", "expected"),
+        [
+            ("divide,10,2", ("divide", [10, 2])),
+            ("add, 1.5 , 2", ("add", [1.5, 2])),
+            ('["power", 2, 8]', ("power", [2, 8])),
+            ('{"op": "sqrt", "args": [9]}', ("sqrt", [9])),
+        ],
+    )
+    def test_formats(self, text, expected):
+        """Test CSV and both JSON shapes are recognized."""
+        assert parse_record(text, "auto") == expected
+
+
+class TestCommandLine:
+    """Test the CLI end to end."""
+
+    def test_csv_stdin(self):
+        """Test records from stdin produce one result per line."""
+        result = run([], "add,2,3\nmultiply,4,6\ndivide,10,4\n")
+        assert result.exit_code == 0
+        assert result.output == "5\n24\n2.5\n"
+
+    def test_errors_do_not_stop_stream(self):
+        """Test failing lines are reported and later lines still run."""
+        result = run(["--output-format", "csv"], "divide,1,0\nbogus,1\nsqrt,16\n")
+        assert result.exit_code == 1
+        assert "line 1: ValueError: Cannot divide 1 by zero" in result.stderr
+        assert "line 2: ValueError: Unknown operation 'bogus'" in result.stderr
+        assert result.stdout == "3,sqrt,4.0\n"
+
+    def test_malformed_operation_name(self):
+        """Test a JSON record whose op is not a string fails only its line."""
+        stdin = '{"op": ["add"], "args": [1, 2]}\n[5, 1]\n["add", 1, 2]\n'
+        result = run(["--output-format", "csv"], stdin)
+        assert result.exit_code == 1
+        assert "line 1: ValueError: Invalid record: operation name must" in (
+            result.stderr
+        )
+        assert "line 2: ValueError: Invalid record" in result.stderr
+        assert result.stdout == "3,add,3\n"
+
+    def test_jsonl_files(self, tmp_path):
+        """Test JSON-lines input files and output."""
+        path = tmp_path / "ops.jsonl"
+        path.write_text('["power", 2, 10]\n{"op": "subtract", "args": [5, 7]}\n')
+
+        result = run([str(path), "--output-format", "jsonl"])
+        assert [json.loads(line) for line in result.output.splitlines()] == [
+            {"line": 1, "op": "power", "result": 1024},
+            {"line": 2, "op": "subtract", "result": -2},
+        ]
+
+    def test_jsonl_complex_result(self):
+        """Test a result JSON cannot encode is written as a string."""
+        result = run(["--output-format", "jsonl"], "power,-8,0.5\nadd,1,2\n")
+        assert result.exit_code == 0
+        first, second = map(json.loads, result.output.splitlines())
+        assert complex(first["result"]) == (-8) ** 0.5
+        assert second == {"line": 2, "op": "add", "result": 3}
+
+    def test_no_history(self):
+        """Test history recording can be turned off."""
+        run(["--no-history"], "add,1,1\n")
+        assert isinstance(get_history_backend(), NullHistory)
+        assert get_history_backend().get_history_count() == 0
+
+    def test_history_bounded(self):
+        """Test history is capped at --history-limit entries."""
+        stdin = "".join(f"add,{i},1\n" for i in range(50))
+        run(["--history-limit", "10", "--summary"], stdin)
+        assert get_history_backend().get_history_count() == 10
+
+
+class TestChunkedWriter:
+    """Test buffered output."""
+
+    def test_writes_in_chunks(self):
+        """Test results are written with one call per chunk."""
+
+        class Recorder:
+            def __init__(self):
+                self.writes = []
+
+            def write(self, text):
+                self.writes.append(text)
+
+            def flush(self):
+                pass
+
+        out, err = Recorder(), Recorder()
+        lines = [(f"{i}\n", False) for i in range(5)] + [("bad\n", True)]
+        assert write_chunked(lines, out, err, chunk_size=2) == 1
+        assert out.writes == ["0\n1\n", "2\n3\n", "4\n"]
+        assert err.writes == ["bad\n"]
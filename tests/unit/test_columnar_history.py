@@ -0,0 +1,99 @@
+"""
+Test the columnar history backend
+"""
+
+from datetime import UTC, datetime
+
+import pytest
+
+from src.calculator import get_history_backend, set_history_backend
+from src.history import CalculatorHistory, ColumnarHistory
+from tests.unit import test_history
+
+
+@pytest.fixture(autouse=True)
+def columnar_backend():
+    """Record module-level calculations into a fresh ColumnarHistory."""
+    previous = set_history_backend(ColumnarHistory())
+    yield
+    set_history_backend(previous)
+
+
+class TestColumnarHistoryBasics(test_history.TestHistoryBasics):
+    """Run the basic history tests against the columnar backend."""
+
+
+class TestColumnarHistoryManagement(test_history.TestHistoryManagement):
+    """Run the history management tests against the columnar backend."""
+
+
+class TestColumnarHistoryEdgeCases(test_history.TestHistoryEdgeCases):
+    """Run the history edge case tests against the columnar backend."""
+
+
+class TestColumnarHistoryDataIntegrity(test_history.TestHistoryDataIntegrity):
+    """Run the data integrity tests against the columnar backend."""
+
+    def test_operands_list_copied(self):
+        """Test that operands list is properly copied."""
+        operands = [1, 2]
+        get_history_backend().add_entry("test", operands, 3)
+        operands[0] = 999
+
+        assert get_history_backend().get_history()[0]["operands"] == [1, 2]
+
+
+class TestColumnarRoundTrip:
+    """Test that columnar entries match the dict-based history exactly."""
+
+    ENTRIES = (
+        ("add", [5, 3], 8),
+        ("divide", [7, 3], 7 / 3),
+        ("power", [2, 100], 2**100),
+        ("power", [-8, 1 / 3], (-8) ** (1 / 3)),
+        ("sqrt", [2.0], 2.0**0.5),
+        ("custom", [1, 2, 3], 6),
+        ("add_many", [1000], 998),
+    )
+
+    def test_matches_reference_history(self):
+        """Test every entry round-trips through the columns unchanged."""
+        timestamp = datetime(2024, 5, 17, 13, 45, 12, 123456)
+        reference = CalculatorHistory()
+        columnar = ColumnarHistory()
+        for operation, operands, result in self.ENTRIES:
+            reference.add_entry(operation, operands, result, timestamp)
+            columnar.add_entry(operation, operands, result, timestamp)
+
+        assert columnar.get_history() == reference.get_history()
+        assert columnar.get_history(limit=3) == reference.get_history(limit=3)
+        assert columnar.get_last_result() == reference.get_last_result()
+
+    def test_int_and_float_types_preserved(self):
+        """Test ints stay ints and floats stay floats."""
+        columnar = ColumnarHistory()
+        columnar.add_entry("add", [1, 2.0], 3.0)
+        entry = columnar.get_history()[0]
+
+        assert type(entry["operands"][0]) is int
+        assert type(entry["operands"][1]) is float
+        assert type(entry["result"]) is float
+
+    def test_aware_timestamp_preserved(self):
+        """Test timezone-aware timestamps are returned unchanged."""
+        timestamp = datetime(2024, 1, 1, tzinfo=UTC)
+        columnar = ColumnarHistory()
+        columnar.add_entry("add", [1, 1], 2, timestamp)
+
+        assert columnar.get_history()[0]["timestamp"] == timestamp
+
+    def test_clear_and_memory(self):
+        """Test clearing resets the columns and entries stay compact."""
+        columnar = ColumnarHistory()
+        for i in range(100):
+            columnar.add_entry("multiply", [i, 2], i * 2)
+
+        assert columnar.nbytes() <= 100 * 40
+        assert columnar.clear_history() == 100
+        assert columnar.get_history_count() == 0
+        assert columnar.get_last_result() is None
@@ -0,0 +1,91 @@
+"""
+Test the thread-safe concurrent history backend
+"""
+
+import threading
+
+from src.calculator import add, multiply, set_history_backend
+from src.history import ConcurrentHistory
+
+THREADS = 8
+CALLS_PER_THREAD = 500
+
+
+def _hammer(barrier: threading.Barrier, worker: int) -> None:
+    """Record CALLS_PER_THREAD add/multiply calls tagged with the worker id."""
+    barrier.wait()
+    for i in range(CALLS_PER_THREAD):
+        if i % 2:
+            multiply(worker, i)
+        else:
+            add(worker, i)
+
+
+class TestConcurrentHistory:
+    """Test recording from many threads at once."""
+
+    def test_stress_many_threads(self, capsys):
+        """Test no entries are lost and per-thread order is preserved."""
+        history = ConcurrentHistory()
+        previous = set_history_backend(history)
+        barrier = threading.Barrier(THREADS)
+        threads = [
+            threading.Thread(target=_hammer, args=(barrier, worker))
+            for worker in range(THREADS)
+        ]
+        try:
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        finally:
+            set_history_backend(previous)
+        capsys.readouterr()
+
+        total = THREADS * CALLS_PER_THREAD
+        assert history.get_history_count() == total
+
+        sequenced = history.get_sequenced_history()
+        sequences = [seq for seq, _ in sequenced]
+        assert sequences == sorted(set(sequences), reverse=True)
+
+        for worker in range(THREADS):
+            seen = [
+                entry["operands"][1]
+                for _, entry in reversed(sequenced)
+                if entry["operands"][0] == worker
+            ]
+            assert seen == list(range(CALLS_PER_THREAD))
+
+        summary = history.get_summary()
+        assert summary["total_calculations"] == total
+        assert sum(summary["operation_counts"].values()) == total
+
+    def test_limit_and_last_result(self):
+        """Test newest-first reads merge entries from several threads."""
+        history = ConcurrentHistory()
+        history.add_entry("add", [1, 1], 2)
+        worker = threading.Thread(target=history.add_entry, args=("add", [2, 2], 4))
+        worker.start()
+        worker.join()
+        history.add_entry("add", [3, 3], 6)
+
+        assert [e["result"] for e in history.get_history()] == [6, 4, 2]
+        assert [e["result"] for e in history.get_history(limit=2)] == [6, 4]
+        assert history.get_last_result() == 6
+        assert history.get_summary()["first_calculation"] == "1 + 1 = 2"
+
+    def test_clear_history(self):
+        """Test clearing drops every thread's buffer."""
+        history = ConcurrentHistory()
+        history.add_entry("add", [1, 1], 2)
+        worker = threading.Thread(target=history.add_entry, args=("add", [2, 2], 4))
+        worker.start()
+        worker.join()
+
+        assert history.clear_history() == 2
+        assert history.get_history() == []
+        assert history.get_last_result() is None
+
+        history.add_entry("add", [5, 5], 10)
+        assert history.get_history_count() == 1
@@ -0,0 +1,111 @@
+"""
+Test the expression evaluator and its compiled-expression cache
+"""
+
+import pytest
+
+from src.calculator import clear_calculation_history, get_calculation_history
+from src.expression import ExpressionEngine, evaluate, parse
+
+
+class TestEvaluate:
+    """Test parsing and evaluating expressions."""
+
+    def setup_method(self):
+        """Clear history before each test."""
+        clear_calculation_history()
+
+    @pytest.mark.parametrize(
+        ("source", "expected"),
+        [
+            ("1 + 2 * 3", 7),
+            ("(1 + 2) * 3", 9),
+            ("10 / 4", 2.5),
+            ("10 ÷ 4", 2.5),
+            ("2^3^2", 512),
+            ("2 ** 3", 8),
+            ("-2^2", -4),
+            ("2^-1", 0.5),
+            ("sqrt(16) + 2^3 * 4", 36.0),
+            ("power(2, 10) - 24", 1000),
+            ("1.5e1 + .5", 15.5),
+        ],
+    )
+    def test_values(self, source, expected, capsys):
+        """Test operator precedence, associativity and functions."""
+        assert evaluate(source) == expected
+        capsys.readouterr()
+
+    def test_variables(self):
+        """Test variables are bound at evaluation time."""
+        assert evaluate("a - b", {"a": 10, "b": 4}) == 6
+        assert evaluate("a - b", {"a": 1, "b": 1}) == 0
+        with pytest.raises(ValueError, match="Undefined variable 'b'"):
+            evaluate("a - b", {"a": 1})
+
+    def test_steps_recorded_in_history(self, capsys):
+        """Test each operation of an evaluation is recorded."""
+        evaluate("sqrt(16) + 2^3 * 4")
+        capsys.readouterr()
+
+        expressions = [e["expression"] for e in get_calculation_history()]
+        assert expressions == [
+            "4.0 + 32 = 36.0",
+            "8 x 4 = 32",
+            "2 ^ 3 = 8",
+            "√16 = 4.0",
+        ]
+
+    def test_operation_errors_propagate(self):
+        """Test calculator errors surface unchanged."""
+        with pytest.raises(ValueError, match="division by zero"):
+            evaluate("1 / (2 - 2)")
+        with pytest.raises(ValueError, match="square root of negative"):
+            evaluate("sqrt(0 - 4)")
+
+    @pytest.mark.parametrize(
+        "source", ["1 +", "(1 + 2", "1 2", "foo(1)", "sqrt(1, 2)", "1 $ 2", ""]
+    )
+    def test_syntax_errors(self, source):
+        """Test malformed expressions raise ValueError."""
+        with pytest.raises(ValueError, match="Invalid expression"):
+            parse(source)
+
+
+class TestExpressionCache:
+    """Test the LRU cache of compiled expressions."""
+
+    def test_repeated_source_skips_parsing(self, monkeypatch):
+        """Test a cached expression is not parsed again."""
+        engine = ExpressionEngine()
+        assert engine.evaluate("x + 1", {"x": 1}) == 2
+
+        def fail(_source):
+            raise AssertionError("cached expression was parsed again")
+
+        monkeypatch.setattr("src.expression.parse", fail)
+        assert engine.evaluate("x + 1", {"x": 5}) == 6
+        assert engine.cache_info()["hits"] == 1
+        assert engine.cache_info()["misses"] == 1
+
+    def test_least_recently_used_evicted(self):
+        """Test the cache keeps at most cache_size expressions."""
+        engine = ExpressionEngine(cache_size=2)
+        engine.evaluate("1 + 1")
+        engine.evaluate("2 + 2")
+        engine.evaluate("1 + 1")
+        engine.evaluate("3 + 3")
+
+        engine.evaluate("1 + 1")
+        assert engine.cache_info()["hits"] == 2
+        engine.evaluate("2 + 2")
+        assert engine.cache_info()["misses"] == 4
+        assert engine.cache_info()["size"] == 2
+
+    def test_clear_cache(self):
+        """Test clearing drops entries and counters."""
+        engine = ExpressionEngine()
+        engine.evaluate("1 + 1")
+        engine.clear_cache()
+        assert engine.cache_info()["size"] == 0
+        assert engine.cache_info()["misses"] == 0
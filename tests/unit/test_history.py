@@ -2,6 +2,7 @@
 Test history functionality for the calculator
 """
 
+import io
 from datetime import datetime
 
 import pytest
@@ -12,15 +13,27 @@ from src.calculator import (
     clear_calculation_history,
     divide,
     get_calculation_history,
+    get_history_backend,
     get_history_count,
     get_history_summary,
     get_last_calculation_result,
     multiply,
     power,
     print_history,
+    set_history_backend,
     sqrt,
     subtract,
 )
+from src.history import (
+    CalculatorHistory,
+    ColumnarHistory,
+    ConcurrentHistory,
+    HistoryEntry,
+    RingBufferHistory,
+    datetime_from_ns,
+    format_expression,
+    ns_from_datetime,
+)
 
 
 class TestHistoryBasics:
@@ -280,6 +293,41 @@ class TestHistoryEdgeCases:
         assert "2 + 2 = 4" in captured.out
         assert "1 + 1 = 2" not in captured.out
 
+    def test_print_history_to_file(self):
+        """Test printing many entries to a stream, chunk after chunk."""
+        for i in range(2500):
+            add(i, 1)
+
+        out = io.StringIO()
+        print_history(file=out)
+        lines = out.getvalue().splitlines()
+        assert lines[1] == "📊 Calculation History (2500 entries):"
+        assert lines[3].endswith("] 2499 + 1 = 2500")
+        assert lines[-1].startswith("2500. [")
+        assert lines[-1].endswith("] 0 + 1 = 1")
+
+    def test_print_history_leaves_entries_lazy(self):
+        """Test printing formats lazy fields without storing them."""
+        add(2, 3)
+        print_history(file=io.StringIO())
+        entry = get_history_backend().view()[0]
+        assert not dict.__contains__(entry, "expression")
+        assert not dict.__contains__(entry, "timestamp")
+
+    def test_print_history_limit_reads_newest_only(self, monkeypatch):
+        """Test a limited print does not merge a concurrent history."""
+        history = ConcurrentHistory()
+        for i in range(5):
+            history.add_entry("add", [i, 1], i + 1)
+        monkeypatch.setattr(history, "_entry_sequence", pytest.fail)
+        previous = set_history_backend(history)
+        try:
+            out = io.StringIO()
+            print_history(limit=2, file=out)
+        finally:
+            set_history_backend(previous)
+        assert out.getvalue().splitlines()[-1].endswith("] 3 + 1 = 4")
+
 
 class TestHistoryDataIntegrity:
     """Test data integrity of history entries."""
@@ -325,3 +373,223 @@ class TestHistoryDataIntegrity:
         timestamp = history[0]["timestamp"]
 
         assert before <= timestamp <= after
+
+
+class TestLazyExpression:
+    """Test that expressions are formatted lazily and cached."""
+
+    def test_expression_not_formatted_until_read(self):
+        """Test the expression string is only built on first access."""
+        entry = HistoryEntry(operation="add", operands=[1, 2], result=3)
+        assert not dict.__contains__(entry, "expression")
+
+        assert entry["expression"] == "1 + 2 = 3"
+        assert dict.__contains__(entry, "expression")
+
+    def test_entry_behaves_like_full_dict(self):
+        """Test whole-dict access includes the expression."""
+        entry = HistoryEntry(operation="multiply", operands=[2, 3], result=6)
+        expected = {
+            "operation": "multiply",
+            "operands": [2, 3],
+            "result": 6,
+            "expression": "2 x 3 = 6",
+        }
+
+        assert entry == expected
+        assert dict(entry) == expected
+        assert "expression" in entry
+        assert entry.get("expression") == "2 x 3 = 6"
+        assert set(entry.keys()) == set(expected)
+
+    def test_unknown_operation_format(self):
+        """Test operations without a formatter use the generic format."""
+        assert format_expression("hypot", [3, 4], 5.0) == "hypot(3, 4) = 5.0"
+
+
+class TestLazyTimestamp:
+    """Test that default timestamps are stored as integers until read."""
+
+    def test_timestamp_not_built_until_read(self):
+        """Test the datetime is only built on first access."""
+        history = CalculatorHistory()
+        history.add_entry("add", [1, 2], 3)
+        entry = history.get_history()[0]
+        assert not dict.__contains__(entry, "timestamp")
+        assert "timestamp" in entry
+
+        timestamp = entry["timestamp"]
+        assert isinstance(timestamp, datetime)
+        assert dict.__contains__(entry, "timestamp")
+        assert entry.timestamp_ns() // 1000 == ns_from_datetime(timestamp) // 1000
+
+    def test_entry_keeps_key_order(self):
+        """Test a lazily stamped entry has the keys of an eager one, in order."""
+        history = CalculatorHistory()
+        history.add_entry("add", [1, 2], 3)
+        history.add_entry("add", [1, 2], 3, datetime.now())
+        lazy, eager = history.get_history()[::-1]
+
+        assert lazy["expression"] == "1 + 2 = 3"
+        assert list(lazy) == list(eager)
+        assert lazy.get("timestamp") == lazy["timestamp"]
+
+    def test_query_uses_raw_stamp(self):
+        """Test time filters agree with the timestamp an entry reports."""
+        history = CalculatorHistory()
+        history.add_entry("add", [1, 2], 3)
+        timestamp = history.get_history()[0]["timestamp"]
+
+        assert len(history.query(since=timestamp).entries) == 1
+        assert history.query(until=timestamp).entries == []
+
+    def test_ns_round_trip(self):
+        """Test converting nanoseconds to datetime and back floors to µs."""
+        for timestamp_ns in (0, 1_700_000_000_123_456_789, -86_400_000_000_001):
+            timestamp = datetime_from_ns(timestamp_ns)
+            assert ns_from_datetime(timestamp) == timestamp_ns // 1000 * 1000
+
+
+@pytest.fixture(
+    params=[
+        CalculatorHistory,
+        ColumnarHistory,
+        ConcurrentHistory,
+        lambda: RingBufferHistory(max_size=100),
+    ],
+    ids=["list", "columnar", "concurrent", "ring"],
+)
+def ten_entries(request):
+    """A history of each backend holding ``add(i, 0)`` for i in 0..9."""
+    history = request.param()
+    for i in range(10):
+        history.add_entry("add", [i, 0], i)
+    return history
+
+
+class TestHistoryLimit:
+    """Test every backend handles get_history limits the same way."""
+
+    def test_limits(self, ten_entries):
+        """Test limits past the size, zero, and negative limits."""
+        assert len(ten_entries.get_history(3)) == 3
+        assert len(ten_entries.get_history(50)) == 10
+        assert ten_entries.get_history(0) == []
+        with pytest.raises(ValueError, match="limit cannot be negative"):
+            ten_entries.get_history(-1)
+
+
+class TestEntriesView:
+    """Test read-only views over history entries."""
+
+    def results(self, entries):
+        """Results of a sequence of entries."""
+        return [entry["result"] for entry in entries]
+
+    def test_newest_first(self, ten_entries):
+        """Test the default view matches get_history."""
+        view = ten_entries.view()
+        assert len(view) == 10
+        assert view[0]["result"] == 9
+        assert view[-1]["result"] == 0
+        assert list(view) == ten_entries.get_history()
+
+    def test_oldest_first(self, ten_entries):
+        """Test the view can be ordered oldest first."""
+        view = ten_entries.view(oldest_first=True)
+        assert self.results(view) == list(range(10))
+        assert self.results(reversed(view)) == list(range(9, -1, -1))
+
+    def test_slices_are_views(self, ten_entries):
+        """Test slicing composes without copying, like list slicing."""
+        view = ten_entries.view()
+        head = view[:3]
+        assert type(head) is type(view)
+        assert self.results(head) == [9, 8, 7]
+        assert self.results(view[2:8][::2]) == [7, 5, 3]
+        assert self.results(reversed(view[-3:])) == [0, 1, 2]
+        assert len(view[20:]) == 0
+        with pytest.raises(IndexError):
+            view[10]
+
+    @pytest.mark.parametrize("oldest_first", [False, True])
+    def test_slices_match_list_slices(self, ten_entries, oldest_first):
+        """Test slices from either end, in either order, match a list."""
+        view = ten_entries.view(oldest_first=oldest_first)
+        expected = self.results(list(view))
+        for piece in (
+            slice(3),
+            slice(-3, None),
+            slice(2, 8),
+            slice(8, 1, -1),
+            slice(None, None, -1),
+            slice(None, 6, -1),
+        ):
+            assert self.results(view[piece]) == expected[piece]
+            assert self.results(reversed(view[piece])) == expected[piece][::-1]
+
+    def test_columnar_slices_decode_only_their_rows(self, monkeypatch):
+        """Test reading the far end of a columnar view skips the other rows."""
+        history = ColumnarHistory()
+        for i in range(1000):
+            history.add_entry("add", [i, 0], i)
+        decoded = []
+        entry_at = history._entry_at  # noqa: SLF001 - count decoded rows
+
+        def counting_entry_at(row):
+            decoded.append(row)
+            return entry_at(row)
+
+        monkeypatch.setattr(history, "_entry_at", counting_entry_at)
+        assert self.results(history.view()[-2:]) == [1, 0]
+        assert decoded == [1, 0]
+
+    def test_view_is_read_only(self):
+        """Test views cannot be used to change the history."""
+        history = CalculatorHistory()
+        history.add_entry("add", [1, 1], 2)
+        view = history.view()
+        with pytest.raises(TypeError):
+            view[0] = {}
+        assert not hasattr(view, "append")
+
+
+class TestHistoryStatistics:
+    """Test the running per-operation statistics in the summary."""
+
+    def setup_method(self):
+        """Clear history before each test."""
+        clear_calculation_history()
+
+    def test_operation_stats(self):
+        """Test count and min/max/mean per operation."""
+        add(1, 2)
+        add(10, 20)
+        sqrt(16)
+
+        stats = get_history_summary()["operation_stats"]
+        assert stats["add"] == {"count": 2, "min": 3, "max": 30, "mean": 16.5}
+        assert stats["sqrt"] == {"count": 1, "min": 4.0, "max": 4.0, "mean": 4.0}
+
+    def test_stats_reset_on_clear(self):
+        """Test clearing history resets the aggregates."""
+        add(1, 2)
+        clear_calculation_history()
+        add(5, 5)
+
+        summary = get_history_summary()
+        assert summary["operation_counts"] == {"add": 1}
+        assert summary["operation_stats"]["add"]["min"] == 10
+
+    def test_summary_does_not_copy_history(self, monkeypatch):
+        """Test the summary is built without reading the full history."""
+        add(1, 2)
+        multiply(3, 4)
+
+        def fail(*_args, **_kwargs):
+            raise AssertionError("get_summary must not call get_history")
+
+        monkeypatch.setattr(_calculator_history, "get_history", fail)
+        summary = get_history_summary()
+        assert summary["total_calculations"] == 2
+        assert summary["most_recent"] == "3 x 4 = 12"
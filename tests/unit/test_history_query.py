@@ -0,0 +1,249 @@
+"""
+Test indexed history queries and cursor pagination
+"""
+
+from datetime import UTC, datetime, timedelta
+
+import pytest
+
+from src.history import (
+    CalculatorHistory,
+    ColumnarHistory,
+    ConcurrentHistory,
+    HistoryIndex,
+    RingBufferHistory,
+    RollupHistory,
+)
+from src.shared_history import SharedMemoryHistory
+
+START = datetime(2024, 1, 1, 12, 0, 0)
+OPERATIONS = ("add", "divide", "multiply")
+
+BACKENDS = {
+    "list": CalculatorHistory,
+    "columnar": ColumnarHistory,
+    "ring": lambda: RingBufferHistory(max_size=1000),
+    "concurrent": ConcurrentHistory,
+    # Detail kept long enough that nothing is rolled up
+    "rollup": lambda: RollupHistory(detail_age=timedelta(days=36_500)),
+}
+
+
+@pytest.fixture(params=list(BACKENDS))
+def history(request):
+    """A backend holding 30 entries, one per minute, cycling operations."""
+    history = BACKENDS[request.param]()
+    for i in range(30):
+        history.add_entry(OPERATIONS[i % 3], [i, 1], i, START + timedelta(minutes=i))
+    return history
+
+
+def results(entries):
+    """Results of a list of entries."""
+    return [entry["result"] for entry in entries]
+
+
+class TestQuery:
+    """Test filtering by operation, time and result."""
+
+    def test_operation(self, history):
+        """Test only the requested operation is returned, newest first."""
+        page = history.query("divide", limit=3)
+        assert results(page.entries) == [28, 25, 22]
+        assert all(entry["operation"] == "divide" for entry in page.entries)
+
+    def test_time_range(self, history):
+        """Test since is inclusive and until is exclusive."""
+        page = history.query(
+            since=START + timedelta(minutes=5),
+            until=START + timedelta(minutes=9),
+            oldest_first=True,
+        )
+        assert results(page.entries) == [5, 6, 7, 8]
+        assert page.next_cursor is None
+
+    def test_combined_filters(self, history):
+        """Test operation, time range and result predicate together."""
+        page = history.query(
+            "add",
+            since=START + timedelta(minutes=10),
+            where=lambda result: result % 2 == 0,
+        )
+        assert results(page.entries) == [24, 18, 12]
+
+    def test_aware_bounds(self, history):
+        """Test timezone-aware bounds are compared in local time."""
+        since = (START + timedelta(minutes=27)).astimezone(UTC)
+        assert results(history.query(since=since).entries) == [29, 28, 27]
+
+    def test_no_matches(self, history):
+        """Test unknown operations and empty ranges return an empty page."""
+        assert history.query("sqrt").entries == []
+        assert history.query(since=START + timedelta(days=1)).entries == []
+
+    def test_invalid_limit(self, history):
+        """Test that a page must hold at least one entry."""
+        with pytest.raises(ValueError, match="limit"):
+            history.query(limit=0)
+
+
+class TestAggregate:
+    """Test per-operation aggregates over time ranges."""
+
+    def test_time_range(self, history):
+        """Test count, sum, min and max for entries in the range."""
+        totals = history.aggregate(
+            since=START + timedelta(minutes=3), until=START + timedelta(minutes=9)
+        )
+        assert totals == {
+            "add": {"count": 2, "sum": 9, "min": 3, "max": 6},
+            "divide": {"count": 2, "sum": 11, "min": 4, "max": 7},
+            "multiply": {"count": 2, "sum": 13, "min": 5, "max": 8},
+        }
+
+    def test_operation(self, history):
+        """Test a single operation over the whole history."""
+        assert history.aggregate("divide") == {
+            "divide": {"count": 10, "sum": 145, "min": 1, "max": 28}
+        }
+        assert history.aggregate("sqrt") == {}
+
+
+class TestPagination:
+    """Test walking results with cursors."""
+
+    @pytest.mark.parametrize("oldest_first", [False, True])
+    def test_pages_cover_everything_once(self, history, oldest_first):
+        """Test consecutive pages neither skip nor repeat entries."""
+        seen = []
+        cursor = None
+        while True:
+            page = history.query(
+                "multiply", limit=4, cursor=cursor, oldest_first=oldest_first
+            )
+            seen.extend(results(page.entries))
+            if page.next_cursor is None:
+                break
+            cursor = page.next_cursor
+
+        expected = list(range(2, 30, 3))
+        assert seen == (expected if oldest_first else expected[::-1])
+
+    def test_last_page_has_no_cursor(self, history):
+        """Test an exactly full last page does not offer another page."""
+        page = history.query("add", limit=10)
+        assert len(page.entries) == 10
+        assert page.next_cursor is None
+
+    def test_cursor_with_predicate(self, history):
+        """Test pagination with a result predicate."""
+        first = history.query(where=lambda result: result > 20, limit=5)
+        second = history.query(
+            where=lambda result: result > 20, limit=5, cursor=first.next_cursor
+        )
+        assert results(first.entries) == [29, 28, 27, 26, 25]
+        assert results(second.entries) == [24, 23, 22, 21]
+        assert second.next_cursor is None
+
+    def test_iter_query(self, history):
+        """Test iter_query yields every match across pages."""
+        found = history.iter_query("divide", oldest_first=True, page_size=2)
+        assert results(found) == list(range(1, 30, 3))
+
+    def test_cursor_survives_new_entries(self):
+        """Test entries added between pages do not disturb older pages."""
+        history = CalculatorHistory()
+        for i in range(10):
+            history.add_entry("add", [i, 0], i)
+        page = history.query(limit=5)
+        history.add_entry("add", [99, 0], 99)
+        assert results(history.query(cursor=page.next_cursor).entries) == [
+            4,
+            3,
+            2,
+            1,
+            0,
+        ]
+
+
+class TestIndexMaintenance:
+    """Test the indexes stay correct as history changes."""
+
+    def test_out_of_order_timestamps(self):
+        """Test time queries when entries arrive out of timestamp order."""
+        history = CalculatorHistory()
+        for minute in (5, 1, 4, 2, 3):
+            history.add_entry(
+                "add", [minute, 0], minute, START + timedelta(minutes=minute)
+            )
+
+        page = history.query(
+            since=START + timedelta(minutes=2), until=START + timedelta(minutes=5)
+        )
+        # Results come back in recording order, newest first
+        assert results(page.entries) == [3, 2, 4]
+
+    def test_ring_eviction(self):
+        """Test evicted entries leave the indexes."""
+        history = RingBufferHistory(max_size=5)
+        history.query()  # build the index before evictions start
+        for i in range(3000):
+            history.add_entry(OPERATIONS[i % 3], [i, 0], i)
+
+        assert results(history.query("divide").entries) == [2998, 2995]
+        assert results(history.query(oldest_first=True).entries) == list(
+            range(2995, 3000)
+        )
+
+    def test_clear_and_reuse(self):
+        """Test queries after clearing only see new entries."""
+        history = CalculatorHistory()
+        history.add_entry("add", [1, 1], 2)
+        history.query()
+        history.clear_history()
+        history.add_entry("sqrt", [9], 3.0)
+
+        assert results(history.query().entries) == [3.0]
+        assert history.query("add").entries == []
+
+    def test_index_selects_in_log_time(self):
+        """Test selection by operation and time uses bisection."""
+        index = HistoryIndex()
+        for i in range(100):
+            index.add(OPERATIONS[i % 3], i)
+
+        assert list(index.select("divide", 10, 20)) == [10, 13, 16, 19]
+        assert list(index.select("divide", 10, 20, reverse=True, limit=2)) == [19, 16]
+        assert list(index.select(start=95, after=97)) == [98, 99]
+
+    @pytest.mark.parametrize(
+        "make",
+        [ConcurrentHistory, lambda: SharedMemoryHistory(lanes=2, lane_capacity=64)],
+        ids=["concurrent", "shared"],
+    )
+    def test_snapshot_reused_across_pages(self, make, monkeypatch):
+        """Test unindexed backends merge once per change, not once per page."""
+        history = make()
+        for i in range(30):
+            history.add_entry("add", [i, 0], i)
+        merges = 0
+        iter_entries = history._iter_entries  # noqa: SLF001 - count merges
+
+        def counting():
+            nonlocal merges
+            merges += 1
+            return iter_entries()
+
+        monkeypatch.setattr(history, "_iter_entries", counting)
+        try:
+            assert results(history.iter_query(page_size=4)) == list(range(29, -1, -1))
+            assert merges == 1
+            history.add_entry("add", [30, 0], 30)
+            assert results(history.query(limit=1).entries) == [30]
+            history.clear_history()
+            assert history.query().entries == []
+            assert merges == 3
+        finally:
+            if isinstance(history, SharedMemoryHistory):
+                history.close()
+                history.unlink()
@@ -0,0 +1,209 @@
+"""
+Test the pluggable logging sinks used by multiply and divide
+"""
+
+import cProfile
+import logging
+import pstats
+import sys
+
+import pytest
+
+from src.calculator import (
+    add,
+    disable_operation_stats,
+    divide,
+    enable_operation_stats,
+    get_log_sink,
+    get_operation_stats,
+    multiply,
+    power,
+    reset_operation_stats,
+    set_log_sink,
+    sqrt,
+)
+from src.instrumentation import (
+    BufferSink,
+    LatencyHistogram,
+    LoggingSink,
+    LogSink,
+    StdoutSink,
+    bucket_index,
+    bucket_upper_bound,
+)
+
+
+@pytest.fixture
+def restore_sink():
+    """Put the original sink back after the test."""
+    original = get_log_sink()
+    yield
+    set_log_sink(original)
+
+
+class TestLogSinks:
+    """Test routing, sampling and disabling operation logs."""
+
+    def test_default_prints_to_stdout(self, capsys):
+        """Test the default sink keeps the original stdout output."""
+        assert isinstance(get_log_sink(), StdoutSink)
+        multiply(4, 6)
+        divide(10, 2)
+
+        captured = capsys.readouterr()
+        assert captured.out == (
+            "Multiplying 4 x 6\nResult: 24\nDividing 10 ÷ 2\nResult: 5.0\n"
+        )
+
+    @pytest.mark.usefixtures("restore_sink")
+    def test_disabled(self, capsys):
+        """Test no output is produced when logging is disabled."""
+        set_log_sink(None)
+        assert multiply(2, 3) == 6
+        assert capsys.readouterr().out == ""
+
+    @pytest.mark.usefixtures("restore_sink")
+    def test_buffer_sink(self):
+        """Test messages can be collected in memory."""
+        sink = BufferSink(max_size=3)
+        set_log_sink(sink)
+        multiply(2, 3)
+        divide(9, 3)
+
+        assert list(sink.messages) == ["Result: 6", "Dividing 9 ÷ 3", "Result: 3.0"]
+
+    @pytest.mark.usefixtures("restore_sink")
+    def test_sampling(self):
+        """Test only one call in every N is logged, both lines together."""
+        sink = BufferSink(every=3)
+        set_log_sink(sink)
+        for i in range(6):
+            multiply(i, 1)
+
+        assert list(sink.messages) == [
+            "Multiplying 0 x 1",
+            "Result: 0",
+            "Multiplying 3 x 1",
+            "Result: 3",
+        ]
+
+    @pytest.mark.usefixtures("restore_sink")
+    def test_logging_sink(self, caplog):
+        """Test messages can be routed to the logging module."""
+        set_log_sink(LoggingSink(level=logging.DEBUG))
+        with caplog.at_level(logging.DEBUG, logger="src.calculator"):
+            divide(1, 4)
+
+        assert caplog.messages == ["Dividing 1 ÷ 4", "Result: 0.25"]
+
+    def test_invalid_sampling_rate(self):
+        """Test a non-positive sampling rate is rejected."""
+        with pytest.raises(ValueError, match="every"):
+            BufferSink(every=0)
+
+    def test_sink_without_emit_rejected(self):
+        """Test an incomplete sink fails when created, not on first log."""
+
+        class Incomplete(LogSink):
+            pass
+
+        with pytest.raises(TypeError, match="emit"):
+            Incomplete()
+
+
+class TestLatencyHistogram:
+    """Test the log-linear latency histogram."""
+
+    def test_bucket_bounds_contain_values(self):
+        """Test every value falls within its bucket's upper bound."""
+        previous_bound = -1
+        for value in [0, 1, 31, 32, 47, 63, 64, 1000, 10**6, 10**9]:
+            index = bucket_index(value)
+            assert value <= bucket_upper_bound(index)
+            assert bucket_upper_bound(index) >= previous_bound
+            previous_bound = bucket_upper_bound(index)
+
+    def test_relative_precision(self):
+        """Test bucket bounds stay within about 6% of the value."""
+        for value in (100, 12_345, 9_876_543):
+            assert bucket_upper_bound(bucket_index(value)) <= value * 1.07
+
+    def test_percentiles(self):
+        """Test percentiles come from the recorded distribution."""
+        histogram = LatencyHistogram()
+        for value in range(1, 101):
+            histogram.record(value * 1000)
+
+        summary = histogram.summary()
+        assert summary["count"] == 100
+        assert summary["min"] == 1000
+        assert summary["max"] == 100_000
+        assert 50_000 <= summary["p50"] <= 50_000 * 1.07
+        assert 99_000 <= summary["p99"] <= 100_000
+
+
+class TestOperationStats:
+    """Test per-operation counters collected via sys.monitoring."""
+
+    def setup_method(self):
+        """Start each test with fresh, enabled statistics."""
+        reset_operation_stats()
+        enable_operation_stats()
+
+    def teardown_method(self):
+        """Leave statistics disabled and empty."""
+        disable_operation_stats()
+        reset_operation_stats()
+
+    def test_calls_and_errors_counted(self):
+        """Test calls, errors by type and latencies are recorded."""
+        add(1, 2)
+        add(3, 4)
+        with pytest.raises(ValueError):
+            sqrt(-1)
+        with pytest.raises(TypeError):
+            sqrt("x")
+        with pytest.raises(OverflowError):
+            power(2, 1000000)
+
+        stats = get_operation_stats()
+        assert stats["add"]["calls"] == 2
+        assert stats["add"]["errors"] == {}
+        assert stats["add"]["latency_ns"]["count"] == 2
+        assert stats["sqrt"]["calls"] == 2
+        assert stats["sqrt"]["errors"] == {"ValueError": 1, "TypeError": 1}
+        assert stats["power"]["errors"] == {"OverflowError": 1}
+
+    def test_disabled_collects_nothing(self):
+        """Test no statistics are gathered while disabled."""
+        disable_operation_stats()
+        add(1, 2)
+        assert get_operation_stats() == {}
+
+    def test_reset(self):
+        """Test resetting zeroes the counters."""
+        add(1, 2)
+        reset_operation_stats()
+        assert get_operation_stats() == {}
+        add(1, 2)
+        assert get_operation_stats()["add"]["calls"] == 1
+
+    def test_profiler_still_works(self):
+        """Test cProfile can run while statistics are collected."""
+        profiler = cProfile.Profile()
+        profiler.runcall(add, 1, 2)
+        assert pstats.Stats(profiler).total_calls > 0
+        assert get_operation_stats()["add"]["calls"] == 1
+
+    def test_no_free_tool_id(self):
+        """Test enabling fails clearly when other tools hold ids 3 and 4."""
+        disable_operation_stats()
+        monitoring = sys.monitoring
+        for tool_id in (3, 4):
+            monitoring.use_tool_id(tool_id, "other tool")
+        try:
+            with pytest.raises(RuntimeError, match="No free sys"):
+                enable_operation_stats()
+        finally:
+            for tool_id in (3, 4):
+                monitoring.free_tool_id(tool_id)
@@ -0,0 +1,100 @@
+"""
+Test process-pool execution of calculator batches
+"""
+
+from fractions import Fraction
+
+import pytest
+
+from src.calculator import (
+    clear_calculation_history,
+    get_calculation_history,
+    power,
+    set_power_limits,
+    set_precision,
+)
+from src.parallel import ParallelBatchExecutor, run_parallel
+
+
+@pytest.fixture(scope="module")
+def executor():
+    """A small process pool shared by the tests in this module."""
+    with ParallelBatchExecutor(
+        max_workers=2, chunk_size=3, start_method="forkserver"
+    ) as pool:
+        yield pool
+
+
+class TestParallelBatches:
+    """Test results, errors and history of parallel batches."""
+
+    def setup_method(self):
+        """Clear history before each test."""
+        clear_calculation_history()
+
+    def test_results_in_order(self, executor):
+        """Test results come back in request order across chunks."""
+        requests = [("power", i, 3) for i in range(10)] + [("sqrt", 81)]
+        assert executor.run(requests) == [i**3 for i in range(10)] + [9.0]
+
+    def test_history_merged_in_bulk(self, executor):
+        """Test worker history entries are recorded in the parent in order."""
+        executor.run([("add", 1, 2), ("multiply", 3, 4), ("divide", 1, 4)])
+
+        expressions = [e["expression"] for e in get_calculation_history()]
+        assert expressions == ["1 ÷ 4 = 0.25", "3 x 4 = 12", "1 + 2 = 3"]
+
+    def test_errors_match_scalar_functions(self, executor):
+        """Test per-item errors are the exceptions the scalar ops raise."""
+        results = executor.run(
+            [("divide", 1, 0), ("sqrt", -1), ("add", "a", 1), ("power", 2, 3)],
+            errors="return",
+        )
+
+        assert isinstance(results[0], ValueError)
+        assert str(results[0]) == (
+            "Cannot divide 1 by zero - division by zero is undefined"
+        )
+        assert isinstance(results[1], ValueError)
+        assert isinstance(results[2], TypeError)
+        assert results[3] == 8
+        assert len(get_calculation_history()) == 1
+
+    def test_raise_mode(self, executor):
+        """Test the first failure is raised after successes are recorded."""
+        with pytest.raises(OverflowError, match="Result too large"):
+            executor.run([("add", 1, 1), ("power", 2, 1000000)])
+        assert len(get_calculation_history()) == 1
+
+    def test_unknown_operation(self, executor):
+        """Test unknown operation names fail per item."""
+        (result,) = executor.run([("modulo", 5, 2)], errors="return")
+        assert isinstance(result, ValueError)
+
+    def test_malformed_request(self, executor):
+        """Test a malformed request fails alone in "return" mode."""
+        results = executor.run([(), ("add", 1, 2)], errors="return")
+        assert isinstance(results[0], ValueError)
+        assert results[1] == 3
+
+    def test_parent_settings_apply_in_workers(self, executor):
+        """Test workers use the parent's precision mode and power limits."""
+        previous_precision = set_precision("fraction")
+        previous_limits = set_power_limits(max_digits=10)
+        try:
+            results = executor.run(
+                [("divide", 1, 3), ("power", 10, 10)], errors="return"
+            )
+        finally:
+            set_precision(previous_precision)
+            set_power_limits(*previous_limits)
+
+        assert results[0] == Fraction(1, 3)
+        assert isinstance(results[1], OverflowError)
+        assert executor.run([("divide", 1, 4), ("power", 10, 10)]) == [0.25, 10**10]
+
+    def test_run_parallel_matches_scalar(self):
+        """Test the one-shot helper gives the same big-int results."""
+        requests = [("power", 3, 2000), ("power", 7, 1500)]
+        expected = [power(3, 2000), power(7, 1500)]
+        assert run_parallel(requests, max_workers=1) == expected
@@ -0,0 +1,262 @@
+"""
+Test the durable append-only history log and columnar snapshots
+"""
+
+import json
+import threading
+import time
+from datetime import UTC, datetime
+from decimal import Decimal
+from fractions import Fraction
+
+import pytest
+
+from src import persistence
+from src.history import CalculatorHistory, ColumnarHistory, RingBufferHistory
+from src.persistence import (
+    LOG_MAGIC,
+    HistoryView,
+    PersistentHistory,
+    decode_value,
+    encode_value,
+    export_history,
+    load_history,
+)
+
+
+class TestValueCodec:
+    """Test the tagged binary value encoding."""
+
+    @pytest.mark.parametrize(
+        "value",
+        [
+            0,
+            -7,
+            2**63 - 1,
+            2**200,
+            -(2**100),
+            1.5,
+            float("inf"),
+            2 + 3j,
+            Fraction(-22, 7),
+            Decimal("0.1000"),
+        ],
+    )
+    def test_round_trip(self, value):
+        """Test numeric values decode to equal values of the same type."""
+        decoded, offset = decode_value(encode_value(value), 0)
+        assert decoded == value
+        assert type(decoded) is type(value)
+        assert offset == len(encode_value(value))
+
+
+class TestPersistentHistory:
+    """Test writing, replaying and clearing the log."""
+
+    def test_replay_after_restart(self, tmp_path):
+        """Test entries written by one instance are replayed by the next."""
+        path = tmp_path / "history.log"
+        timestamp = datetime(2024, 3, 1, 12, 30, 45, 123456)
+        with PersistentHistory(path, batch_size=2) as history:
+            history.add_entry("add", [5, 3], 8, timestamp)
+            history.add_entry("power", [2, 100], 2**100, timestamp)
+            history.add_entry("sqrt", [2.0], 2.0**0.5, timestamp)
+            expected = history.get_history()
+
+        with PersistentHistory(path) as replayed:
+            assert replayed.get_history() == expected
+            assert replayed.get_summary()["operation_counts"]["add"] == 1
+
+    def test_flush_writes_pending_entries(self, tmp_path):
+        """Test flush blocks until queued entries are on disk."""
+        path = tmp_path / "history.log"
+        history = PersistentHistory(path)
+        for i in range(100):
+            history.add_entry("add", [i, 1], i + 1)
+        history.flush()
+        size = path.stat().st_size
+        history.close()
+
+        assert size > len(LOG_MAGIC)
+        assert size == path.stat().st_size
+
+    def test_torn_tail_is_truncated(self, tmp_path):
+        """Test a partially written last record is dropped on replay."""
+        path = tmp_path / "history.log"
+        with PersistentHistory(path) as history:
+            history.add_entry("add", [1, 1], 2)
+            history.add_entry("add", [2, 2], 4)
+        with path.open("ab") as log:
+            log.write(b"\x40\x00\x00\x00partial")
+
+        with PersistentHistory(path) as replayed:
+            assert replayed.get_history_count() == 2
+            replayed.add_entry("add", [3, 3], 6)
+
+        with PersistentHistory(path) as replayed:
+            assert [e["result"] for e in replayed.get_history()] == [6, 4, 2]
+
+    def test_clear_truncates_log(self, tmp_path):
+        """Test clearing history also empties the log."""
+        path = tmp_path / "history.log"
+        with PersistentHistory(path) as history:
+            history.add_entry("add", [1, 1], 2)
+            assert history.clear_history() == 1
+
+        assert path.read_bytes() == LOG_MAGIC
+
+    def test_rejects_foreign_file(self, tmp_path):
+        """Test a file without the log header is not replayed."""
+        path = tmp_path / "history.log"
+        path.write_bytes(b"not a log")
+        with pytest.raises(ValueError, match="not a calculator history log"):
+            PersistentHistory(path)
+
+    def test_entries_racing_close_are_written(self, tmp_path, monkeypatch):
+        """Test entries queued behind the stop sentinel still reach the log."""
+        path = tmp_path / "history.log"
+        history = PersistentHistory(path)
+        writing, release = threading.Event(), threading.Event()
+        encode = persistence.encode_record
+
+        def slow_encode(entry):
+            writing.set()
+            release.wait()
+            return encode(entry)
+
+        monkeypatch.setattr(persistence, "encode_record", slow_encode)
+        history.add_entry("add", [1, 1], 2)
+        writing.wait()  # the writer is busy with the first entry
+        history.add_entry("add", [2, 2], 4)
+        closer = threading.Thread(target=history.close)
+        closer.start()
+        while history._queue.qsize() < 2:  # noqa: SLF001 - wait for the sentinel
+            time.sleep(0.001)
+        history.add_entry("add", [3, 3], 6)  # lands behind the sentinel
+        release.set()
+        closer.join()
+
+        with PersistentHistory(path) as replayed:
+            assert [e["result"] for e in replayed.get_history()] == [6, 4, 2]
+
+    def test_interleaved_entries_are_each_logged(self, tmp_path):
+        """Test an entry recorded by another thread mid-add is not logged twice."""
+        path = tmp_path / "history.log"
+
+        class Interleaving(list):
+            """Records a second entry just after the first, like a thread switch."""
+
+            def append(self, entry):
+                super().append(entry)
+                if entry["result"] == 1:
+                    history.add_entry("add", [1, 1], 2)
+
+        with PersistentHistory(path) as history:
+            history._history = Interleaving()  # noqa: SLF001 - inject the switch
+            history.add_entry("add", [0, 1], 1)
+
+        with PersistentHistory(path) as replayed:
+            assert [e["result"] for e in replayed.get_history()] == [1, 2]
+
+    def test_closed_history_rejects_entries(self, tmp_path):
+        """Test recording after close raises instead of losing data."""
+        history = PersistentHistory(tmp_path / "history.log")
+        history.close()
+        with pytest.raises(RuntimeError, match="closed"):
+            history.add_entry("add", [1, 1], 2)
+
+
+def sample_history(factory=CalculatorHistory):
+    """A history covering column and side-table values."""
+    history = factory()
+    timestamp = datetime(2024, 3, 1, 12, 30, 45, 123456)
+    history.add_entry("add", [5, 3], 8, timestamp)
+    history.add_entry("divide", [1, 3], 1 / 3, timestamp)
+    history.add_entry("power", [2, 100], 2**100, timestamp)
+    history.add_entry("power", [3, 200, 7], pow(3, 200, 7), timestamp)
+    history.add_entry("sqrt", [-4], 2j, datetime(2024, 3, 2, tzinfo=UTC))
+    history.add_entry("multiply", [2.5, -4], -10.0)
+    return history
+
+
+class TestSnapshots:
+    """Test exporting, loading and mapping columnar snapshots."""
+
+    @pytest.mark.parametrize(
+        "factory",
+        [CalculatorHistory, ColumnarHistory, lambda: RingBufferHistory(max_size=10)],
+    )
+    def test_round_trip(self, tmp_path, factory):
+        """Test every backend exports entries that load back unchanged."""
+        path = tmp_path / "history.calc"
+        history = sample_history(factory)
+        assert export_history(history, path) == 6
+
+        loaded = load_history(path)
+        assert loaded.get_history() == history.get_history()
+        assert loaded.get_summary() == history.get_summary()
+
+        loaded.add_entry("add", [1, 1], 2)
+        assert loaded.get_last_result() == 2
+
+    def test_empty_history(self, tmp_path):
+        """Test an empty history round-trips."""
+        path = tmp_path / "empty.calc"
+        export_history(CalculatorHistory(), path)
+        assert load_history(path).get_history() == []
+        with HistoryView(path) as view:
+            assert view.get_history_count() == 0
+
+    def test_view_reads_in_place(self, tmp_path):
+        """Test the view answers reads and queries straight from the file."""
+        path = tmp_path / "history.calc"
+        history = sample_history()
+        export_history(history, path)
+
+        with HistoryView(path) as view:
+            assert view.get_history() == history.get_history()
+            assert view.get_summary() == history.get_summary()
+            assert [e["result"] for e in view.query("power").entries] == [
+                pow(3, 200, 7),
+                2**100,
+            ]
+            results = view.column("results")
+            assert results.readonly
+            assert results.format == "d"
+            assert results[0] == 8.0
+            results.release()
+
+    def test_view_is_read_only(self, tmp_path):
+        """Test the view rejects writes."""
+        path = tmp_path / "history.calc"
+        export_history(sample_history(), path)
+        with HistoryView(path) as view:
+            with pytest.raises(TypeError, match="read-only"):
+                view.add_entry("add", [1, 1], 2)
+            with pytest.raises(TypeError, match="read-only"):
+                view.clear_history()
+            with pytest.raises(ValueError, match="Unknown column"):
+                view.column("expression")
+
+    def test_rejects_foreign_and_truncated_files(self, tmp_path):
+        """Test files that are not complete snapshots are rejected."""
+        path = tmp_path / "history.calc"
+        path.write_bytes(b"not a snapshot file")
+        with pytest.raises(ValueError, match="Not a calculator history snapshot"):
+            load_history(path)
+
+        export_history(sample_history(), path)
+        path.write_bytes(path.read_bytes()[:100])
+        with pytest.raises(ValueError, match="truncated"):
+            HistoryView(path)
+
+    def test_smaller_than_json(self, tmp_path):
+        """Test snapshots are much smaller than JSON dumps of the entries."""
+        history = ColumnarHistory()
+        for i in range(1000):
+            history.add_entry("multiply", [i, 2.5], i * 2.5)
+        path = tmp_path / "history.calc"
+        export_history(history, path)
+
+        dumped = json.dumps(history.get_history(), default=str)
+        assert path.stat().st_size * 3 < len(dumped)
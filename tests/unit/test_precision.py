@@ -0,0 +1,180 @@
+"""
+Test exact (fraction) and decimal precision modes
+"""
+
+from decimal import Decimal
+from fractions import Fraction
+
+import pytest
+
+from src.calculator import (
+    Calculator,
+    divide,
+    exact_sqrt,
+    get_precision,
+    set_precision,
+    sqrt,
+)
+from src.instrumentation import BufferSink
+
+
+class TestExactSqrt:
+    """Test the integer square root helper."""
+
+    @pytest.mark.parametrize(
+        ("value", "root"),
+        [
+            (0, 0),
+            (49, 7),
+            (10**400, 10**200),
+            (Fraction(9, 4), Fraction(3, 2)),
+            (50, None),
+            (10**400 + 1, None),
+            (Fraction(9, 2), None),
+        ],
+    )
+    def test_roots(self, value, root):
+        """Test perfect squares have exact roots and others have none."""
+        assert exact_sqrt(value) == root
+        assert type(exact_sqrt(value)) is type(root)
+
+
+class TestFloatPrecision:
+    """Test the default mode and type-based dispatch."""
+
+    def test_float_results_unchanged(self):
+        """Test ints and floats are computed as before."""
+        session = Calculator()
+        assert session.divide(1, 4) == 0.25
+        assert type(session.sqrt(16)) is float
+
+    def test_fraction_and_decimal_operands(self):
+        """Test Fraction and Decimal operands keep their own arithmetic."""
+        session = Calculator(decimal_digits=5)
+        assert session.divide(Fraction(1, 3), 2) == Fraction(1, 6)
+        assert session.sqrt(Fraction(9, 4)) == Fraction(3, 2)
+        assert session.add(Decimal("0.1"), 0.2) == Decimal("0.3")
+        assert session.divide(Decimal(1), 3) == Decimal("0.33333")
+
+    def test_other_types_rejected(self):
+        """Test non-numeric operands still raise the usual TypeError."""
+        session = Calculator(precision="fraction")
+        with pytest.raises(TypeError, match="Division requires numeric inputs"):
+            session.divide("1", 2)
+        with pytest.raises(TypeError, match="Argument must be a number"):
+            Calculator().sqrt("4")
+
+    def test_invalid_settings(self):
+        """Test unknown modes and non-positive digits are rejected."""
+        with pytest.raises(ValueError, match="precision must be one of"):
+            Calculator(precision="double")
+        with pytest.raises(ValueError, match="decimal_digits"):
+            Calculator(decimal_digits=0)
+
+
+class TestFractionPrecision:
+    """Test exact integer and rational arithmetic."""
+
+    @pytest.fixture
+    def session(self):
+        """A fraction-mode session."""
+        return Calculator(precision="fraction")
+
+    def test_exact_results(self, session):
+        """Test division, powers and roots of ints stay exact."""
+        assert session.divide(1, 3) == Fraction(1, 3)
+        assert session.add(Fraction(1, 3), Fraction(2, 3)) == 1
+        assert session.power(2, -3) == Fraction(1, 8)
+        assert session.power(Fraction(2, 3), 3) == Fraction(8, 27)
+        assert session.sqrt(144) == 12
+        assert type(session.sqrt(144)) is int
+
+    def test_huge_perfect_square(self, session):
+        """Test roots of ints too large for a float."""
+        assert session.sqrt(3**1000) == 3**500
+
+    def test_inexact_results_fall_back_to_float(self, session):
+        """Test floats and irrational roots give floats."""
+        assert session.sqrt(2) == pytest.approx(2**0.5)
+        assert session.divide(1.0, 4) == 0.25
+        assert session.power(4, 0.5) == 2.0
+
+    def test_errors(self, session):
+        """Test the usual errors are raised."""
+        with pytest.raises(ValueError, match="by zero"):
+            session.divide(1, 0)
+        with pytest.raises(ValueError, match="negative"):
+            session.sqrt(-4)
+        with pytest.raises(ZeroDivisionError):
+            session.power(0, -1)
+        with pytest.raises(OverflowError):
+            session.power(Fraction(1, 7), 10**6)
+
+    def test_modular_power_unaffected(self, session):
+        """Test modular exponentiation stays an integer operation."""
+        assert session.power(3, 200, 7) == pow(3, 200, 7)
+
+    def test_history_and_stats(self, session):
+        """Test exact results are recorded and summarized."""
+        session.divide(1, 3)
+        session.divide(2, 3)
+        assert session.history.get_history()[0]["expression"] == "2 ÷ 3 = 2/3"
+        stats = session.history.get_summary()["operation_stats"]["divide"]
+        assert stats == {
+            "count": 2,
+            "min": Fraction(1, 3),
+            "max": Fraction(2, 3),
+            "mean": Fraction(1, 2),
+        }
+
+
+class TestDecimalPrecision:
+    """Test arithmetic in a decimal context."""
+
+    @pytest.fixture
+    def session(self):
+        """A decimal-mode session with 10 significant digits."""
+        return Calculator(precision="decimal", decimal_digits=10)
+
+    def test_decimal_results(self, session):
+        """Test operands are converted and rounded to the context."""
+        assert session.add(0.1, 0.2) == Decimal("0.3")
+        assert session.divide(2, 3) == Decimal("0.6666666667")
+        assert session.sqrt(2) == Decimal("1.414213562")
+        assert session.multiply(Fraction(1, 4), 2) == Decimal("0.5")
+
+    def test_context_can_be_replaced(self, session):
+        """Test digits can be changed later without changing the mode."""
+        session.set_precision("decimal", decimal_digits=3)
+        assert session.divide(2, 3) == Decimal("0.667")
+
+    def test_errors(self, session):
+        """Test decimal signals become the usual exceptions."""
+        with pytest.raises(ValueError, match="by zero"):
+            session.divide(1, 0)
+        with pytest.raises(OverflowError):
+            session.power(10, 10**7)
+        with pytest.raises(ValueError, match="Invalid decimal power"):
+            session.power(-8, 0.5)
+
+    def test_logging(self):
+        """Test multiply and divide log on the precise path too."""
+        sink = BufferSink()
+        session = Calculator(log_sink=sink, precision="decimal")
+        session.divide(1, 4)
+        assert list(sink.messages) == ["Dividing 1 ÷ 4", "Result: 0.25"]
+
+
+class TestDefaultSessionPrecision:
+    """Test the module-level precision setting."""
+
+    def test_set_precision(self):
+        """Test module-level functions follow the default session's mode."""
+        previous = set_precision("fraction")
+        try:
+            assert get_precision() == "fraction"
+            assert divide(1, 3) == Fraction(1, 3)
+            assert sqrt(81) == 9
+        finally:
+            set_precision(previous)
+        assert divide(1, 4) == 0.25
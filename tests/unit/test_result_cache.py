@@ -0,0 +1,100 @@
+"""
+Test memoization of power and sqrt results
+"""
+
+import pytest
+
+from src.calculator import (
+    clear_calculation_history,
+    clear_result_cache,
+    disable_result_cache,
+    enable_result_cache,
+    get_calculation_history,
+    get_result_cache_stats,
+    power,
+    set_power_limits,
+    sqrt,
+)
+
+
+class TestResultCache:
+    """Test the opt-in LRU result cache."""
+
+    def setup_method(self):
+        """Start each test with an empty history and a fresh cache."""
+        clear_calculation_history()
+        enable_result_cache(max_size=2)
+
+    def teardown_method(self):
+        """Leave caching disabled for other tests."""
+        disable_result_cache()
+
+    def test_disabled_by_default(self):
+        """Test no cache is active until enabled."""
+        disable_result_cache()
+        assert get_result_cache_stats() is None
+        assert power(2, 3) == 8
+
+    def test_hits_and_misses(self):
+        """Test repeated calls are served from the cache."""
+        assert power(2, 10) == 1024
+        assert power(2, 10) == 1024
+        assert sqrt(16) == 4.0
+        assert sqrt(16) == 4.0
+
+        stats = get_result_cache_stats()
+        assert stats["hits"] == 2
+        assert stats["misses"] == 2
+        assert stats["hit_rate"] == 0.5
+
+    def test_cache_hits_recorded_in_history(self):
+        """Test cache hits produce the same history entries as computations."""
+        power(3, 2)
+        power(3, 2)
+
+        history = get_calculation_history()
+        assert len(history) == 2
+        assert history[0]["expression"] == history[1]["expression"] == "3 ^ 2 = 9"
+
+    def test_operand_types_kept_apart(self):
+        """Test int and float operands with equal values are cached separately."""
+        assert type(power(2, 3)) is int
+        assert type(power(2.0, 3)) is float
+
+    def test_lru_eviction(self):
+        """Test the least recently used result is evicted."""
+        power(2, 1)
+        power(2, 2)
+        power(2, 1)
+        power(2, 3)
+
+        stats = get_result_cache_stats()
+        assert stats["evictions"] == 1
+        assert stats["size"] == 2
+        power(2, 2)
+        assert get_result_cache_stats()["misses"] == 4
+
+    def test_errors_not_cached(self):
+        """Test failing calls raise every time and are not stored."""
+        for _ in range(2):
+            with pytest.raises(OverflowError):
+                power(2, 1000000)
+        assert get_result_cache_stats()["size"] == 0
+
+    def test_clear(self):
+        """Test clearing empties the cache and resets counters."""
+        power(2, 2)
+        clear_result_cache()
+        assert get_result_cache_stats()["size"] == 0
+        assert get_result_cache_stats()["misses"] == 0
+
+    def test_power_limits_apply_to_cached_results(self):
+        """Test lowering the power limits drops results over the new ones."""
+        assert power(10, 20) == 10**20
+        previous = set_power_limits(max_digits=10)
+        try:
+            with pytest.raises(OverflowError):
+                power(10, 20)
+        finally:
+            set_power_limits(*previous)
+        assert power(10, 20) == 10**20
@@ -0,0 +1,129 @@
+"""
+Test the bounded ring-buffer history backend
+"""
+
+import pytest
+
+from src.calculator import add, get_calculation_history, set_history_backend
+from src.history import RingBufferHistory
+
+
+class TestRingBufferHistory:
+    """Test bounded history with drop-oldest eviction."""
+
+    def test_keeps_newest_entries(self):
+        """Test that only the newest max_size entries are retained."""
+        history = RingBufferHistory(max_size=3)
+        for i in range(10):
+            history.add_entry("add", [i, i], i * 2)
+
+        assert history.get_history_count() == 3
+        assert history.get_evicted_count() == 7
+        assert history.get_last_result() == 18
+        assert [e["result"] for e in history.get_history()] == [18, 16, 14]
+        assert [e["result"] for e in history.get_history(limit=2)] == [18, 16]
+
+    def test_clear_history(self):
+        """Test clearing a ring returns the retained count."""
+        history = RingBufferHistory(max_size=2)
+        for i in range(5):
+            history.add_entry("add", [i, 0], i)
+
+        assert history.clear_history() == 2
+        assert history.get_history() == []
+        assert history.get_last_result() is None
+
+    def test_module_functions_use_ring(self):
+        """Test the ring can back the module-level functions."""
+        previous = set_history_backend(RingBufferHistory(max_size=2))
+        try:
+            add(1, 1)
+            add(2, 2)
+            add(3, 3)
+            expressions = [e["expression"] for e in get_calculation_history()]
+        finally:
+            set_history_backend(previous)
+
+        assert expressions == ["3 + 3 = 6", "2 + 2 = 4"]
+
+    def test_invalid_configuration(self):
+        """Test that bad sizes and policies are rejected."""
+        with pytest.raises(ValueError, match="max_size"):
+            RingBufferHistory(max_size=0)
+        with pytest.raises(ValueError, match="eviction must be one of"):
+            RingBufferHistory(max_size=1, eviction="lru")
+        with pytest.raises(ValueError, match="spill_path"):
+            RingBufferHistory(max_size=1, eviction="spill")
+
+
+class TestSpillEviction:
+    """Test spilling evicted entries to disk."""
+
+    def test_evicted_entries_spilled(self, tmp_path):
+        """Test evicted entries are appended to the spill file in order."""
+        spill_path = tmp_path / "history.jsonl"
+        history = RingBufferHistory(max_size=2, eviction="spill", spill_path=spill_path)
+        for i in range(5):
+            history.add_entry("multiply", [i, 3], i * 3)
+
+        spilled = list(history.iter_spilled())
+        history.close()
+
+        assert [e["result"] for e in spilled] == [0, 3, 6]
+        assert spilled[0]["expression"] == "0 x 3 = 0"
+        assert spilled[0]["operands"] == [0, 3]
+        assert [e["result"] for e in history.get_history()] == [12, 9]
+
+
+class TestRingBufferStatistics:
+    """Test summary statistics stay correct as entries are evicted."""
+
+    def test_stats_follow_eviction(self):
+        """Test evicted results leave the counts and min/max."""
+        history = RingBufferHistory(max_size=3)
+        for value in (1, 50, 7, 3, 4):
+            history.add_entry("add", [value, 0], value)
+
+        summary = history.get_summary()
+        assert summary["total_calculations"] == 3
+        assert summary["operation_stats"]["add"] == {
+            "count": 3,
+            "min": 3,
+            "max": 7,
+            "mean": 14 / 3,
+        }
+        assert summary["first_calculation"] == "7 + 0 = 7"
+
+    def test_operation_removed_when_fully_evicted(self):
+        """Test operations disappear once none of their entries remain."""
+        history = RingBufferHistory(max_size=1)
+        history.add_entry("sqrt", [4], 2.0)
+        history.add_entry("add", [1, 1], 2)
+
+        assert history.get_summary()["operations_used"] == ["add"]
+
+    @pytest.mark.parametrize("step", [1, -1])
+    def test_evicting_extremes_does_not_rescan(self, step, monkeypatch):
+        """Test monotonic results keep min/max current without a rescan."""
+        history = RingBufferHistory(max_size=4)
+        monkeypatch.setattr(history, "_iter_entries", pytest.fail, raising=False)
+        for value in range(0, 20 * step, step):
+            history.add_entry("add", [value, 0], value)
+            window = [max(0, abs(value) - 3) * step, value]
+            stats = history.get_summary()["operation_stats"]["add"]
+            assert (stats["min"], stats["max"]) == (min(window), max(window))
+
+    def test_mean_does_not_drift(self):
+        """Test evicting a large float next to small ones keeps the mean."""
+        history = RingBufferHistory(max_size=2)
+        for value in (1e16, 1.0, 1.0):
+            history.add_entry("add", [value, 0], value)
+        assert history.get_summary()["operation_stats"]["add"]["mean"] == 1.0
+
+    def test_nan_results_can_be_evicted(self):
+        """Test a NaN result leaves min/max when it is evicted."""
+        history = RingBufferHistory(max_size=1)
+        history.add_entry("add", [0, 0], float("nan"))
+        history.add_entry("add", [1, 1], 2)
+        stats = history.get_summary()["operation_stats"]["add"]
+        assert (stats["min"], stats["max"]) == (2, 2)
@@ -0,0 +1,129 @@
+"""
+Test rolling up old history entries into time-bucket aggregates
+"""
+
+from datetime import datetime, timedelta
+
+import pytest
+
+from src.history import RollupHistory
+
+# Long past, so entries stamped here are older than any detail_age below
+BASE = datetime(2024, 1, 1, 12, 0)
+FIVE_MINUTES = timedelta(minutes=5)
+
+
+@pytest.fixture
+def history():
+    """Ten old ``add`` entries, one per minute, and one recent ``multiply``."""
+    history = RollupHistory(detail_age=timedelta(hours=1), bucket=FIVE_MINUTES)
+    for i in range(10):
+        history.add_entry("add", [i, 0], i, BASE + timedelta(minutes=i))
+    history.add_entry("multiply", [2, 3], 6)
+    return history
+
+
+class TestCompaction:
+    """Test which entries are rolled up and how."""
+
+    def test_old_entries_are_rolled_up(self, history):
+        """Test entries past detail_age leave the detailed history."""
+        assert history.get_history_count() == 1
+        assert history.get_rolled_up_count() == 10
+        assert [e["operation"] for e in history.get_history()] == ["multiply"]
+
+    def test_rollup_buckets(self, history):
+        """Test per-bucket count, sum, min and max."""
+        assert history.get_rollups() == [
+            {
+                "operation": "add",
+                "bucket_start": BASE,
+                "count": 5,
+                "sum": 10,
+                "min": 0,
+                "max": 4,
+            },
+            {
+                "operation": "add",
+                "bucket_start": BASE + FIVE_MINUTES,
+                "count": 5,
+                "sum": 35,
+                "min": 5,
+                "max": 9,
+            },
+        ]
+
+    def test_rollups_by_bucket_start(self, history):
+        """Test buckets are selected by where they start."""
+        later = history.get_rollups("add", since=BASE + timedelta(minutes=1))
+        assert [row["bucket_start"] for row in later] == [BASE + FIVE_MINUTES]
+        assert len(history.get_rollups(until=BASE + FIVE_MINUTES)) == 1
+        assert history.get_rollups("multiply") == []
+
+    def test_explicit_compact(self, history):
+        """Test compact() folds recent entries once they are old enough."""
+        assert history.compact() == 0
+        assert history.compact(now=datetime.now() + timedelta(hours=2)) == 1
+        assert history.get_history_count() == 0
+        assert history.get_rollups("multiply")[0]["sum"] == 6
+
+    def test_queries_see_detailed_entries_only(self):
+        """Test the query index drops rolled-up entries."""
+        history = RollupHistory(detail_age=timedelta(hours=1))
+        for i in range(5):
+            history.add_entry("add", [i, 0], i)
+        assert len(history.query().entries) == 5
+
+        history.compact(now=datetime.now() + timedelta(hours=2))
+        history.add_entry("add", [9, 0], 9)
+        assert [e["result"] for e in history.query().entries] == [9]
+        assert history.aggregate()["add"]["count"] == 6
+
+    def test_invalid_arguments(self):
+        """Test negative ages and empty buckets are rejected."""
+        with pytest.raises(ValueError, match="detail_age"):
+            RollupHistory(detail_age=timedelta(seconds=-1))
+        with pytest.raises(ValueError, match="bucket"):
+            RollupHistory(detail_age=timedelta(hours=1), bucket=timedelta(0))
+
+
+class TestCombinedResults:
+    """Test summaries and aggregates include rolled-up entries."""
+
+    def test_summary(self, history):
+        """Test the summary counts every calculation."""
+        summary = history.get_summary()
+        assert summary["total_calculations"] == 11
+        assert summary["rolled_up_calculations"] == 10
+        assert summary["operation_counts"] == {"add": 10, "multiply": 1}
+        assert summary["operation_stats"]["add"] == {
+            "count": 10,
+            "min": 0,
+            "max": 9,
+            "mean": 4.5,
+        }
+        assert summary["most_recent"] == "2 x 3 = 6"
+
+    def test_summary_with_everything_rolled_up(self, history):
+        """Test the summary still reports totals with no detailed entries."""
+        history.compact(now=datetime.now() + timedelta(hours=2))
+        summary = history.get_summary()
+        assert summary["total_calculations"] == 11
+        assert summary["most_recent"] is None
+
+    def test_aggregate(self, history):
+        """Test time-range aggregates merge rollups and detailed entries."""
+        assert history.aggregate(since=BASE + FIVE_MINUTES) == {
+            "add": {"count": 5, "sum": 35, "min": 5, "max": 9},
+            "multiply": {"count": 1, "sum": 6, "min": 6, "max": 6},
+        }
+        assert history.aggregate("add", until=BASE + FIVE_MINUTES) == {
+            "add": {"count": 5, "sum": 10, "min": 0, "max": 4}
+        }
+
+    def test_clear(self, history):
+        """Test clearing forgets rollups too."""
+        assert history.clear_history() == 11
+        assert history.get_rollups() == []
+        assert history.get_summary()["total_calculations"] == 0
+        assert history.aggregate() == {}
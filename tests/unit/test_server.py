@@ -0,0 +1,212 @@
+"""
+Test the JSON-lines calculator server and its client
+"""
+
+import asyncio
+import json
+
+import pytest
+
+from src.history import CalculatorHistory
+from src.server import CalculatorClient, CalculatorServer
+
+
+def run_with_client(scenario, **server_options):
+    """Run ``scenario(client)`` against a fresh localhost server.
+
+    Returns:
+        The scenario's return value and the (closed) server
+    """
+    server = CalculatorServer(CalculatorHistory(), **server_options)
+
+    async def main():
+        async with server, await CalculatorClient.connect(*server.address) as client:
+            return await scenario(client)
+
+    return asyncio.run(main()), server
+
+
+class TestOperations:
+    """Test operation requests over the wire."""
+
+    def test_scalar_results(self):
+        """Test each operation returns the same result as the calculator."""
+
+        async def scenario(client):
+            return [
+                await client.call("add", 2, 3),
+                await client.call("subtract", 2.5, 1),
+                await client.call("divide", 10, 4),
+                await client.call("power", 2, 10),
+                await client.call("power", 3, 4, 5),
+                await client.call("sqrt", 16),
+            ]
+
+        assert run_with_client(scenario)[0] == [5, 1.5, 2.5, 1024, 1, 4.0]
+
+    def test_errors_keep_type_and_message(self):
+        """Test failures raise the server-side exception type and message."""
+
+        async def scenario(client):
+            with pytest.raises(ValueError, match="Cannot divide 1 by zero"):
+                await client.call("divide", 1, 0)
+            with pytest.raises(ValueError, match="negative"):
+                await client.call("sqrt", -4)
+            with pytest.raises(TypeError):
+                await client.call("add", "2", 3)
+            with pytest.raises(ValueError, match="Unknown operation"):
+                await client.call("modulo", 5, 2)
+            return await client.call("add", 1, 1)
+
+        assert run_with_client(scenario)[0] == 2
+
+    def test_concurrent_requests_are_batched(self):
+        """Test pipelined requests share batches and keep their own results."""
+
+        async def scenario(client):
+            calls = [client.call("multiply", float(i), 2.0) for i in range(200)]
+            calls += [
+                client.call("divide", i, 0 if i % 10 == 0 else 2) for i in range(50)
+            ]
+            return await asyncio.gather(*calls, return_exceptions=True)
+
+        results, server = run_with_client(scenario, max_delay=0.01)
+        stats = server.stats()
+        assert results[:200] == [i * 2.0 for i in range(200)]
+        for i, result in enumerate(results[200:]):
+            if i % 10 == 0:
+                assert isinstance(result, ValueError)
+            else:
+                assert result == i / 2
+        assert stats["requests"] == 250
+        assert stats["batches"] < 250
+
+    def test_complex_root_keeps_batch_results_real(self):
+        """Test one complex power in a float batch leaves the others floats."""
+
+        async def scenario(client):
+            calls = [client.call("power", float(i), 2.0) for i in range(40)]
+            calls.append(client.call("power", -8.0, 0.5))
+            return await asyncio.gather(*calls)
+
+        results, server = run_with_client(scenario, max_delay=0.01)
+        assert results[:40] == [i**2.0 for i in range(40)]
+        assert all(type(result) is float for result in results[:40])
+        assert results[40] == str((-8.0) ** 0.5)
+        recorded = [e["result"] for e in server.history.get_history()]
+        assert sum(type(result) is complex for result in recorded) == 1
+
+    def test_max_batch_limits_batch_size(self):
+        """Test no batch holds more than ``max_batch`` requests."""
+
+        async def scenario(client):
+            await asyncio.gather(*(client.call("add", i, 1) for i in range(40)))
+
+        _, server = run_with_client(scenario, max_batch=4, max_delay=0.01)
+        stats = server.stats()
+        assert stats["requests"] == 40
+        assert stats["batches"] >= 10
+
+    def test_inflight_limit_still_answers_everything(self):
+        """Test a small in-flight limit slows a connection without losing replies."""
+
+        async def scenario(client):
+            return await asyncio.gather(*(client.call("add", i, i) for i in range(100)))
+
+        results, _ = run_with_client(scenario, max_inflight=2, max_pending=3)
+        assert results == [2 * i for i in range(100)]
+
+    def test_invalid_limits(self):
+        """Test non-positive limits are rejected."""
+        with pytest.raises(ValueError, match="positive"):
+            CalculatorServer(max_batch=0)
+        with pytest.raises(ValueError, match="positive"):
+            CalculatorServer(max_delay=-1)
+
+
+class TestHistoryRequests:
+    """Test history is recorded per request and can be queried."""
+
+    def test_each_request_is_recorded(self):
+        """Test batched requests are recorded as individual entries."""
+
+        async def scenario(client):
+            await asyncio.gather(*(client.call("add", i, 1) for i in range(5)))
+            await client.call("sqrt", 9)
+            with pytest.raises(ValueError):
+                await client.call("divide", 1, 0)
+
+        _, server = run_with_client(scenario)
+        history = server.history
+        assert history.get_history_count() == 6
+        assert [e["operation"] for e in history.get_history()].count("add") == 5
+
+    def test_query_and_summary(self):
+        """Test history pages and summaries are served as JSON."""
+
+        async def scenario(client):
+            for i in range(5):
+                await client.call("add", i, 1)
+            await client.call("multiply", 3, 3)
+            first = await client.query_history(operation="add", limit=2)
+            second = await client.query_history(
+                operation="add", limit=10, cursor=first["next_cursor"]
+            )
+            return first, second, await client.summary()
+
+        (first, second, summary), _ = run_with_client(scenario)
+        assert [e["result"] for e in first["entries"]] == [5, 4]
+        assert [e["result"] for e in second["entries"]] == [3, 2, 1]
+        assert second["next_cursor"] is None
+        assert first["entries"][0]["expression"] == "4 + 1 = 5"
+        assert "T" in first["entries"][0]["timestamp"]
+        assert summary["total_calculations"] == 6
+
+    def test_bad_query_is_an_error(self):
+        """Test an invalid history query reports an error."""
+
+        async def scenario(client):
+            with pytest.raises(ValueError, match="limit must be positive"):
+                await client.query_history(limit=0)
+            with pytest.raises(ValueError):
+                await client.query_history(since="yesterday")
+
+        run_with_client(scenario)
+
+
+class TestProtocol:
+    """Test the raw JSON-lines protocol."""
+
+    def test_malformed_lines_get_error_responses(self):
+        """Test invalid JSON and non-object requests are answered, not dropped."""
+
+        async def main():
+            async with CalculatorServer() as server:
+                reader, writer = await asyncio.open_connection(*server.address)
+                writer.write(
+                    b'not json\n[1, 2]\n{"id": 7, "op": "add", "args": [1, 2]}\n'
+                )
+                await writer.drain()
+                responses = [json.loads(await reader.readline()) for _ in range(3)]
+                writer.close()
+                await writer.wait_closed()
+                return responses
+
+        responses = asyncio.run(main())
+        errors = [r for r in responses if "error" in r]
+        assert len(errors) == 2
+        assert {"id": 7, "result": 3} in responses
+
+    def test_close_fails_pending_calls(self):
+        """Test calls waiting on a closed server raise ConnectionError."""
+
+        async def main():
+            server = CalculatorServer()
+            await server.start()
+            client = await CalculatorClient.connect(*server.address)
+            await server.close()
+            with pytest.raises(ConnectionError):
+                await client.call("add", 1, 2)
+            await client.close()
+
+        asyncio.run(main())
@@ -0,0 +1,157 @@
+"""
+Test independent calculator sessions and the session pool
+"""
+
+import threading
+
+import pytest
+
+from src.calculator import (
+    Calculator,
+    SessionPool,
+    add,
+    clear_calculation_history,
+    disable_operation_stats,
+    enable_operation_stats,
+    get_default_session,
+    get_history_count,
+    get_operation_stats,
+    reset_operation_stats,
+)
+from src.history import NullHistory, RingBufferHistory
+from src.instrumentation import BufferSink
+
+
+class TestCalculatorSession:
+    """Test sessions keep their own history and configuration."""
+
+    def setup_method(self):
+        """Clear the default session's history."""
+        clear_calculation_history()
+
+    def test_sessions_are_independent(self):
+        """Test calculations only land in the session that ran them."""
+        first, second = Calculator(), Calculator()
+        assert first.add(2, 3) == 5
+        assert second.power(2, 10) == 1024
+        second.sqrt_many([4, 9])
+
+        assert [e["expression"] for e in first.history.get_history()] == ["2 + 3 = 5"]
+        assert [e["operation"] for e in second.history.get_history()] == [
+            "sqrt_many",
+            "power",
+        ]
+        assert get_history_count() == 0
+
+    def test_module_functions_use_default_session(self):
+        """Test the module-level functions record into the default session."""
+        add(1, 1)
+        assert get_default_session().history.get_history_count() == 1
+
+    def test_history_options(self):
+        """Test history can be disabled or bounded."""
+        off = Calculator(record_history=False)
+        bounded = Calculator(history_limit=2)
+        for i in range(5):
+            off.add(i, i)
+            bounded.add(i, i)
+
+        assert isinstance(off.history, NullHistory)
+        assert off.history.get_history_count() == 0
+        assert isinstance(bounded.history, RingBufferHistory)
+        assert bounded.history.get_history_count() == 2
+
+        with pytest.raises(ValueError, match="cannot be combined"):
+            Calculator(RingBufferHistory(max_size=1), history_limit=5)
+
+    def test_logging_per_session(self, capsys):
+        """Test sessions log only to their own sink, and not by default."""
+        sink = BufferSink()
+        Calculator(log_sink=sink).multiply(4, 6)
+        Calculator().divide(10, 2)
+
+        assert list(sink.messages) == ["Multiplying 4 x 6", "Result: 24"]
+        assert capsys.readouterr().out == ""
+
+    def test_errors_match_module_functions(self):
+        """Test sessions validate input like the module-level functions."""
+        session = Calculator()
+        with pytest.raises(ValueError, match="Cannot divide 1 by zero"):
+            session.divide(1, 0)
+        with pytest.raises(TypeError, match="Both arguments must be numbers"):
+            session.add("1", 2)
+        assert session.history.get_history_count() == 0
+
+    def test_stats_count_session_calls(self):
+        """Test operation statistics include calls made through sessions."""
+        reset_operation_stats()
+        enable_operation_stats()
+        try:
+            Calculator().add(1, 2)
+            add(3, 4)
+        finally:
+            disable_operation_stats()
+        assert get_operation_stats()["add"]["calls"] == 2
+        reset_operation_stats()
+
+
+class TestSessionPool:
+    """Test reusing sessions through a pool."""
+
+    def test_sessions_reused_and_reset(self):
+        """Test released sessions come back empty and are handed out again."""
+        pool = SessionPool()
+        with pool.session() as session:
+            session.add(1, 2)
+        with pool.session() as again:
+            assert again is session
+            assert again.history.get_history_count() == 0
+
+        assert pool.stats() == {"created": 1, "reused": 1, "idle": 1, "max_idle": 64}
+
+    def test_settings_reset_on_release(self):
+        """Test precision and logging changes do not reach the next user."""
+        sink = BufferSink()
+        pool = SessionPool(lambda: Calculator(log_sink=sink, decimal_digits=5))
+        with pool.session() as session:
+            session.set_precision("decimal", decimal_digits=3)
+            session.log_sink = None
+        with pool.session() as again:
+            assert again is session
+            assert again.precision == "float"
+            assert again.decimal_context.prec == 5
+            assert again.log_sink is sink
+            assert again.divide(1, 4) == 0.25
+
+    def test_max_idle(self):
+        """Test sessions beyond max_idle are dropped on release."""
+        pool = SessionPool(max_idle=1)
+        sessions = [pool.acquire() for _ in range(3)]
+        for session in sessions:
+            pool.release(session)
+        assert pool.stats()["idle"] == 1
+
+    def test_factory(self):
+        """Test the pool builds sessions with the given factory."""
+        pool = SessionPool(lambda: Calculator(history_limit=10))
+        assert isinstance(pool.acquire().history, RingBufferHistory)
+
+    def test_concurrent_use(self):
+        """Test threads never share a session at the same time."""
+        pool = SessionPool()
+        counts = []
+
+        def work():
+            for i in range(200):
+                with pool.session() as session:
+                    session.add(i, 1)
+                    counts.append(session.history.get_history_count())
+
+        threads = [threading.Thread(target=work) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert counts == [1] * 800
+        assert pool.stats()["created"] <= 4
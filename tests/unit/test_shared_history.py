@@ -0,0 +1,160 @@
+"""
+Test the shared-memory history backend across processes
+"""
+
+import multiprocessing
+import os
+import sys
+import threading
+from datetime import datetime, timedelta
+
+import pytest
+
+from src.calculator import Calculator
+from src.shared_history import SharedMemoryHistory
+
+BASE = datetime(2024, 1, 1, 12, 0)
+
+
+@pytest.fixture
+def history():
+    """A small shared history, freed after the test."""
+    with SharedMemoryHistory(lanes=4, lane_capacity=8) as history:
+        yield history
+
+
+def record_adds(history, start, count):
+    """Worker: record ``count`` additions stamped a second apart."""
+    for i in range(start, start + count):
+        history.add_entry("add", [i, 1], i + 1, BASE + timedelta(seconds=i))
+
+
+def run_worker(context, history, start, count):
+    """Run record_adds in a child process; return its exit code."""
+    worker = context.Process(target=record_adds, args=(history, start, count))
+    worker.start()
+    worker.join()
+    return worker.exitcode
+
+
+class TestSingleProcess:
+    """Test recording and reading in one process."""
+
+    def test_records(self, history):
+        """Test entries read back like any other backend's."""
+        session = Calculator(history)
+        session.add(2, 3)
+        session.divide(1, 4)
+        assert history.get_history_count() == 2
+        assert history.get_last_result() == 0.25
+        assert [e["expression"] for e in history.get_history()] == [
+            "1 ÷ 4 = 0.25",
+            "2 + 3 = 5",
+        ]
+        assert history.get_summary()["first_calculation"] == "2 + 3 = 5"
+
+    def test_ring_keeps_newest_entries(self, history):
+        """Test a full lane overwrites its oldest entries."""
+        record_adds(history, 0, 20)
+        assert history.get_history_count() == 8
+        assert [e["result"] for e in history.get_history(3)] == [20, 19, 18]
+        assert history.get_summary()["first_calculation"] == "12 + 1 = 13"
+
+    def test_clear(self, history):
+        """Test clearing hides every entry written so far."""
+        record_adds(history, 0, 5)
+        assert history.clear_history() == 5
+        assert history.get_history() == []
+        assert history.get_last_result() is None
+        record_adds(history, 5, 1)
+        assert [e["result"] for e in history.get_history()] == [6]
+
+    def test_stored_values(self, history):
+        """Test ints round-trip exactly and other numbers become floats."""
+        history.add_entry("power", [2, 60], 2**60)
+        history.add_entry("sqrt", [1j], 1j)
+        last, first = history.get_history()
+        assert first["operands"] == [2, 60]
+        assert first["result"] == float(2**60)
+        assert type(first["result"]) is float
+        assert last["result"] != last["result"]  # NaN
+
+    def test_threads_share_the_lane_safely(self):
+        """Test concurrent threads in one process lose no entries."""
+        previous = sys.getswitchinterval()
+        sys.setswitchinterval(1e-6)  # switch threads as often as possible
+        try:
+            with SharedMemoryHistory(lanes=1, lane_capacity=20_000) as shared:
+                threads = [
+                    threading.Thread(target=record_adds, args=(shared, k, 5000))
+                    for k in range(0, 20_000, 5000)
+                ]
+                for thread in threads:
+                    thread.start()
+                for thread in threads:
+                    thread.join()
+                assert shared.get_history_count() == 20_000
+                results = {e["result"] for e in shared.get_history()}
+                assert results == set(range(1, 20_001))
+        finally:
+            sys.setswitchinterval(previous)
+
+    def test_limits(self, history):
+        """Test long names, invalid sizes and negative limits are rejected."""
+        with pytest.raises(ValueError, match="longer than 16 bytes"):
+            history.add_entry("x" * 17, [1], 1)
+        with pytest.raises(ValueError, match="limit cannot be negative"):
+            history.get_history(-1)
+        with pytest.raises(ValueError, match="positive"):
+            SharedMemoryHistory(lanes=0)
+
+
+class TestAcrossProcesses:
+    """Test workers record into the block the parent reads."""
+
+    def test_forked_workers(self, history):
+        """Test entries from several workers are merged by time."""
+        context = multiprocessing.get_context("fork")
+        history.add_entry("multiply", [2, 3], 6, BASE + timedelta(seconds=2.5))
+        assert run_worker(context, history, 0, 2) == 0
+        assert run_worker(context, history, 3, 2) == 0
+        assert history.get_history_count() == 5
+        assert [e["result"] for e in history.get_history()] == [5, 4, 6, 2, 1]
+        assert [e["result"] for e in history.get_history(2)] == [5, 4]
+        summary = history.get_summary()
+        assert summary["operation_counts"] == {"multiply": 1, "add": 4}
+        assert summary["most_recent"] == "4 + 1 = 5"
+
+    def test_spawned_worker(self):
+        """Test a spawned worker attaches to the block by name."""
+        context = multiprocessing.get_context("spawn")
+        with SharedMemoryHistory(lanes=2, lane_capacity=4, context=context) as shared:
+            assert run_worker(context, shared, 0, 3) == 0
+            assert shared.get_last_result() == 3
+
+    def test_lanes_of_exited_workers_are_reused(self):
+        """Test finished workers free their lane for the next ones."""
+        context = multiprocessing.get_context("fork")
+        with SharedMemoryHistory(lanes=1, lane_capacity=4) as shared:
+            assert run_worker(context, shared, 0, 1) == 0
+            assert run_worker(context, shared, 1, 1) == 0
+            shared.add_entry("add", [2, 1], 3)
+            assert shared.get_history_count() == 3
+            # The parent is alive and holds the only lane now
+            assert run_worker(context, shared, 3, 1) != 0
+            assert shared.get_history_count() == 3
+
+    def test_lanes_of_unreaped_workers_are_reused(self):
+        """Test a worker that exited but was not yet reaped frees its lane."""
+        with SharedMemoryHistory(lanes=1, lane_capacity=4) as shared:
+            pid = os.fork()
+            if pid == 0:
+                record_adds(shared, 0, 1)
+                os._exit(0)
+            # Wait for the exit without reaping, leaving a zombie
+            os.waitid(os.P_PID, pid, os.WEXITED | os.WNOWAIT)
+            try:
+                shared.add_entry("add", [1, 1], 2)
+            finally:
+                os.waitpid(pid, 0)
+            assert shared.get_history_count() == 2
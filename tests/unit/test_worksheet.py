@@ -0,0 +1,166 @@
+"""
+Test worksheets: dependency tracking and incremental recomputation
+"""
+
+import pytest
+
+from src.calculator import Calculator
+from src.worksheet import Worksheet
+
+
+@pytest.fixture
+def sheet():
+    """A worksheet with its own session: a + b -> doubled -> root, plus c."""
+    sheet = Worksheet(Calculator())
+    sheet.update({"a": 6, "b": 10, "c": 5})
+    sheet.define("total", "add", "a", "b")
+    sheet.define("doubled", "multiply", "total", 2)
+    sheet.define("root", "sqrt", "doubled")
+    sheet.define("scaled", "multiply", "c", 3)
+    sheet.session.history.clear_history()
+    return sheet
+
+
+def history_operations(sheet):
+    """Operations recorded by the sheet's session, oldest first."""
+    return [e["operation"] for e in reversed(sheet.session.history.get_history())]
+
+
+class TestWorksheet:
+    """Test defining cells and reading values."""
+
+    def test_values(self, sheet):
+        """Test formula cells are computed when defined."""
+        assert sheet["total"] == 16
+        assert sheet.value("doubled") == 32
+        assert sheet["root"] == pytest.approx(32**0.5)
+        assert sheet.values()["scaled"] == 15
+        assert len(sheet) == 7
+        assert "root" in sheet
+
+    def test_define_records_history(self):
+        """Test defining a cell computes it once, through the session."""
+        sheet = Worksheet(Calculator())
+        sheet.set_input("x", 3)
+        assert sheet.define("y", "power", "x", 2) == ["y"]
+        assert sheet["y"] == 9
+        assert history_operations(sheet) == ["power"]
+
+    def test_define_validation(self, sheet):
+        """Test unknown operations, missing cells and cycles are rejected."""
+        with pytest.raises(ValueError, match="Unknown operation"):
+            sheet.define("x", "modulo", "a", 2)
+        with pytest.raises(ValueError, match="missing cell 'nope'"):
+            sheet.define("x", "add", "nope", 2)
+        with pytest.raises(ValueError, match="depend on itself"):
+            sheet.define("total", "add", "root", 1)
+        with pytest.raises(ValueError, match="depend on itself"):
+            sheet.define("total", "add", "total", 1)
+        assert sheet["total"] == 16
+
+    def test_set_formula_cell_is_rejected(self, sheet):
+        """Test inputs and formulas are not mixed up by set_input()."""
+        with pytest.raises(ValueError, match="is a formula"):
+            sheet.set_input("total", 3)
+
+    def test_remove(self, sheet):
+        """Test only cells nothing reads can be removed."""
+        with pytest.raises(ValueError, match="used by total"):
+            sheet.remove("a")
+        sheet.remove("root")
+        assert "root" not in sheet
+        assert sheet.dependents("doubled") == set()
+
+    def test_dependents(self, sheet):
+        """Test transitive dependents of a cell."""
+        assert sheet.dependents("a") == {"total", "doubled", "root"}
+        with pytest.raises(KeyError):
+            sheet.dependents("nope")
+
+
+class TestIncrementalRecompute:
+    """Test only affected cells are recomputed and recorded."""
+
+    def test_only_downstream_cells_recompute(self, sheet):
+        """Test changing an input recomputes its dependents in order."""
+        assert sheet.set_input("a", 22) == ["total", "doubled", "root"]
+        assert sheet["root"] == 8.0
+        assert sheet["scaled"] == 15
+        assert history_operations(sheet) == ["add", "multiply", "sqrt"]
+
+    def test_unchanged_value_stops_propagation(self, sheet):
+        """Test paths whose value did not change are cut off."""
+        sheet.update({"a": 10, "b": 6})  # total is still 16
+        assert history_operations(sheet) == ["add"]
+        assert sheet.set_input("a", 10) == []
+
+    def test_update_recomputes_shared_dependents_once(self, sheet):
+        """Test several inputs changed together recompute a cell once."""
+        assert sheet.update({"a": 1, "b": 1, "c": 1}) == [
+            "scaled",
+            "total",
+            "doubled",
+            "root",
+        ]
+        assert sheet["scaled"] == 3
+        assert sheet["root"] == 2.0
+
+    def test_diamond_is_evaluated_after_both_inputs(self):
+        """Test a cell reading two paths is recomputed once, after both."""
+        sheet = Worksheet(Calculator())
+        sheet.set_input("x", 2)
+        sheet.define("left", "add", "x", 1)
+        sheet.define("right", "multiply", "x", 10)
+        sheet.define("deep", "add", "right", 0.5)
+        sheet.define("join", "add", "left", "deep")
+        assert sheet.set_input("x", 3) == ["left", "right", "deep", "join"]
+        assert sheet["join"] == 34.5
+
+    def test_redefine_updates_dependents(self, sheet):
+        """Test redefining a cell recomputes it and what reads it."""
+        assert sheet.define("total", "subtract", "b", "a") == [
+            "total",
+            "doubled",
+            "root",
+        ]
+        assert sheet["root"] == pytest.approx(8**0.5)
+        assert sheet.set_input("c", 7) == ["scaled"]
+        assert sheet.set_input("b", 7) == ["total", "doubled", "root"]
+
+    def test_redefine_can_deepen_the_graph(self):
+        """Test ranks are raised when a cell starts reading a deeper cell."""
+        sheet = Worksheet(Calculator())
+        sheet.set_input("x", 1)
+        sheet.define("top", "add", "x", 1)
+        sheet.define("chain1", "add", "x", 1)
+        sheet.define("chain2", "add", "chain1", 1)
+        sheet.define("top", "add", "chain2", 1)
+        assert sheet.set_input("x", 5) == ["chain1", "chain2", "top"]
+        assert sheet["top"] == 8
+
+
+class TestErrors:
+    """Test failed cells and how errors propagate."""
+
+    def test_errors_propagate_without_history(self, sheet):
+        """Test downstream cells of a failed cell fail without evaluating."""
+        sheet.define("ratio", "divide", "a", "c")
+        sheet.define("half", "divide", "ratio", 2)
+        sheet.session.history.clear_history()
+
+        sheet.set_input("c", 0)
+        with pytest.raises(ValueError, match="divide"):
+            sheet.value("ratio")
+        with pytest.raises(ValueError, match="divide"):
+            sheet["half"]
+        assert isinstance(sheet.values()["half"], ValueError)
+        assert history_operations(sheet) == ["multiply"]  # scaled = 0 * 3
+
+        sheet.set_input("c", 3)
+        assert sheet["half"] == 1.0
+
+    def test_type_error_in_input(self, sheet):
+        """Test a non-numeric input makes its dependents fail."""
+        sheet.set_input("a", "six")
+        with pytest.raises(TypeError):
+            sheet["root"]